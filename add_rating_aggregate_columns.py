@@ -0,0 +1,36 @@
+"""
+Migration script to add the rating aggregate columns to the restaurants table
+and backfill them from existing reviews.
+Run with: pipenv run python add_rating_aggregate_columns.py
+"""
+from sqlalchemy import inspect, text
+
+from database import engine, SessionLocal
+import models  # noqa: F401
+from models.restaurant import RestaurantModel
+from utils.ratings import rebuild_rating_aggregates
+
+existing = {column['name'] for column in inspect(engine).get_columns('restaurants')}
+new_columns = {
+    'review_count': 'INTEGER',
+    'rating_sum': 'INTEGER',
+    'avg_rating': 'FLOAT',
+    **{f'rating_{star}_count': 'INTEGER' for star in range(1, 6)},
+}
+
+with engine.begin() as connection:
+    for name, column_type in new_columns.items():
+        if name not in existing:
+            connection.execute(text(f'ALTER TABLE restaurants ADD COLUMN {name} {column_type} NOT NULL DEFAULT 0'))
+
+# Only the index this migration owns: the others may need columns later migrations add
+rating_index = next(index for index in RestaurantModel.__table__.indexes if index.name == 'ix_restaurants_avg_rating_id')
+rating_index.create(bind=engine, checkfirst=True)
+
+db = SessionLocal()
+try:
+    rebuilt = rebuild_rating_aggregates(db)
+finally:
+    db.close()
+
+print(f"OK Rating aggregate columns added, {len(rebuilt)} restaurants backfilled")
@@ -0,0 +1,58 @@
+"""
+Migration script to add the latitude/longitude/geohash columns and the geohash
+index used by GET /api/restaurants/nearby, backfilling geohashes for rows that
+already have coordinates. On PostgreSQL it also tries to enable the cube and
+earthdistance extensions and build the GiST index used with GEO_INDEX=earthdistance.
+Run with: pipenv run python add_restaurant_coordinates.py
+"""
+from sqlalchemy import bindparam, inspect, select, text, update
+
+from database import engine
+import models  # noqa: F401
+from models.restaurant import RestaurantModel
+from utils.geo import geohash_for
+
+existing = {column['name'] for column in inspect(engine).get_columns('restaurants')}
+new_columns = {
+    'latitude': 'FLOAT',
+    'longitude': 'FLOAT',
+    'geohash': 'VARCHAR(12)',
+}
+
+with engine.begin() as connection:
+    for name, column_type in new_columns.items():
+        if name not in existing:
+            connection.execute(text(f'ALTER TABLE restaurants ADD COLUMN {name} {column_type}'))
+
+geohash_index = next(index for index in RestaurantModel.__table__.indexes if index.name == 'ix_restaurants_geohash')
+geohash_index.create(bind=engine, checkfirst=True)
+
+with engine.begin() as connection:
+    rows = connection.execute(
+        select(RestaurantModel.id, RestaurantModel.latitude, RestaurantModel.longitude)
+        .where(RestaurantModel.latitude.is_not(None), RestaurantModel.longitude.is_not(None))
+    ).all()
+    if rows:
+        connection.execute(
+            update(RestaurantModel.__table__)
+            .where(RestaurantModel.__table__.c.id == bindparam('restaurant_id'))
+            .values(geohash=bindparam('new_geohash')),
+            [{"restaurant_id": row.id, "new_geohash": geohash_for(row.latitude, row.longitude)} for row in rows],
+        )
+
+earthdistance = ""
+if engine.dialect.name == 'postgresql':
+    try:
+        with engine.begin() as connection:
+            connection.execute(text('CREATE EXTENSION IF NOT EXISTS cube'))
+            connection.execute(text('CREATE EXTENSION IF NOT EXISTS earthdistance'))
+            connection.execute(text(
+                'CREATE INDEX IF NOT EXISTS ix_restaurants_earth ON restaurants '
+                'USING gist (ll_to_earth(latitude, longitude)) '
+                'WHERE latitude IS NOT NULL AND longitude IS NOT NULL'
+            ))
+        earthdistance = ", earthdistance index created (set GEO_INDEX=earthdistance to use it)"
+    except Exception as e:
+        earthdistance = f", earthdistance unavailable ({e.__class__.__name__}); staying on the geohash index"
+
+print(f"OK Restaurant coordinates added, {len(rows)} geohashes backfilled{earthdistance}")
@@ -0,0 +1,117 @@
+"""
+Side-by-side throughput of the sync and async (ASYNC_DB=true) app modes.
+
+Starts one uvicorn worker per mode against DATABASE_URL (seed it first, e.g.
+with seed.py) and drives read endpoints with 100/500/1000 concurrent clients. Only 2xx responses count towards rps and
+latency; other statuses and transport errors are reported in their own columns.
+Run with: pipenv run python -m benchmarks.async_vs_sync [--duration 10] [--concurrency 100 500 1000]
+"""
+import argparse
+import asyncio
+import os
+import socket
+import statistics
+import subprocess
+import sys
+import time
+
+import httpx
+
+PATHS = ["/api/restaurants", "/api/restaurants?sort=rating", "/api/categories"]
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def start_server(async_mode: bool, port: int):
+    # The response cache would serve these few URLs without touching the database in either mode;
+    # load shedding and the per-IP limits would refuse clients that all share one address
+    env = dict(os.environ, ASYNC_DB="true" if async_mode else "false", RESPONSE_CACHE_TTL="0",
+               MAX_CONCURRENT_REQUESTS="0", RATE_LIMIT="false")
+    process = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "main:app", "--port", str(port), "--log-level", "warning"],
+        env=env,
+    )
+    deadline = time.monotonic() + 30
+    while time.monotonic() < deadline:
+        try:
+            httpx.get(f"http://127.0.0.1:{port}/health", timeout=1)
+            return process
+        except httpx.TransportError:
+            time.sleep(0.2)
+    process.terminate()
+    raise RuntimeError("server did not start")
+
+
+async def drive(base_url: str, concurrency: int, duration: float):
+    latencies = []
+    non_2xx = 0
+    errors = 0
+    deadline = time.monotonic() + duration
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+
+    async with httpx.AsyncClient(base_url=base_url, limits=limits, timeout=30) as client:
+        async def worker(offset: int):
+            nonlocal non_2xx, errors
+            i = offset
+            while time.monotonic() < deadline:
+                start = time.perf_counter()
+                try:
+                    response = await client.get(PATHS[i % len(PATHS)])
+                except httpx.HTTPError:
+                    errors += 1
+                else:
+                    if response.is_success:
+                        latencies.append(time.perf_counter() - start)
+                    else:
+                        non_2xx += 1
+                i += 1
+
+        started = time.monotonic()
+        await asyncio.gather(*(worker(n) for n in range(concurrency)))
+        elapsed = time.monotonic() - started
+
+    latencies.sort()
+    return {
+        "rps": len(latencies) / elapsed,
+        "p50_ms": statistics.median(latencies) * 1000 if latencies else 0,
+        "p95_ms": latencies[int(len(latencies) * 0.95) - 1] * 1000 if latencies else 0,
+        "non_2xx": non_2xx,
+        "errors": errors,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--duration", type=float, default=10)
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[100, 500, 1000])
+    args = parser.parse_args()
+
+    results = {}
+    for mode in ("sync", "async"):
+        port = free_port()
+        server = start_server(mode == "async", port)
+        try:
+            for concurrency in args.concurrency:
+                results[(mode, concurrency)] = asyncio.run(
+                    drive(f"http://127.0.0.1:{port}", concurrency, args.duration)
+                )
+        finally:
+            server.terminate()
+            server.wait()
+
+    print(f"{'clients':>8} | {'sync rps':>9} {'p50 ms':>8} {'p95 ms':>8} {'!2xx':>5} {'err':>5}"
+          f" | {'async rps':>9} {'p50 ms':>8} {'p95 ms':>8} {'!2xx':>5} {'err':>5}")
+    for concurrency in args.concurrency:
+        row = [f"{concurrency:>8}"]
+        for mode in ("sync", "async"):
+            r = results[(mode, concurrency)]
+            row.append(f"{r['rps']:>9.1f} {r['p50_ms']:>8.1f} {r['p95_ms']:>8.1f} {r['non_2xx']:>5} {r['errors']:>5}")
+        print(" | ".join(row))
+
+
+if __name__ == "__main__":
+    main()
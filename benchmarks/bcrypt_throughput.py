@@ -0,0 +1,44 @@
+"""
+Micro-benchmark for password hashing: bcrypt hashes/sec on one core and
+through the configured process pool.
+Run with: pipenv run python -m benchmarks.bcrypt_throughput [--hashes 64]
+"""
+import argparse
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from config.environment import bcrypt_rounds, password_hash_workers
+from utils import passwords
+
+
+def measure(hash_fn, count: int, concurrency: int) -> float:
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        start = time.perf_counter()
+        list(executor.map(hash_fn, ["benchmark-password"] * count))
+        return count / (time.perf_counter() - start)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--hashes", type=int, default=64)
+    args = parser.parse_args()
+
+    workers = max(password_hash_workers, 1)
+    # Warm up the pool and the bcrypt backend so start-up is not counted
+    passwords._hash("warm-up")
+    measure(passwords.hash_password, workers, workers)
+
+    inline = measure(passwords._hash, max(args.hashes // 4, 1), 1)
+    pooled = measure(passwords.hash_password, args.hashes, workers)
+
+    print(f"bcrypt rounds:        {bcrypt_rounds}")
+    print(f"cpu cores:            {os.cpu_count()}")
+    print(f"pool workers:         {workers}")
+    print(f"inline hashes/sec:    {inline:.1f}")
+    print(f"pooled hashes/sec:    {pooled:.1f}")
+    print(f"pooled per core:      {pooled / workers:.1f}")
+
+
+if __name__ == "__main__":
+    main()
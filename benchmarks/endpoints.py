@@ -0,0 +1,400 @@
+"""
+Endpoint load benchmark with regression checks.
+
+Boots main.app in-process against a fixture database per scale (generated
+once with generate_data.py and reused), drives every router with concurrent
+authenticated clients and records p50/p95/p99 latency, throughput and SQL
+queries per request for each scenario. The response cache is off unless
+--response-cache is given, so list and detail scenarios measure their SQL
+rather than a handful of cached URLs. Results are written as JSON; with
+--baseline the run fails when a tracked metric is more than --threshold
+percent worse than the stored baseline.
+
+Run with: pipenv run python -m benchmarks.endpoints [--scale small medium] [--requests 200] [--concurrency 16]
+          pipenv run python -m benchmarks.endpoints --baseline benchmarks/baseline.json --threshold 20
+
+--database-url may contain {scale}, e.g. postgresql://localhost/rateorant_bench_{scale};
+it defaults to a SQLite file per scale in the temp directory.
+"""
+import argparse
+import asyncio
+import contextvars
+import json
+import os
+import platform
+import random
+import subprocess
+import sys
+import tempfile
+import time
+
+SCALES = {
+    "small": {"users": "1e3", "restaurants": "1e2", "reviews": "1e4", "favorites": "2e3"},
+    "medium": {"users": "2e4", "restaurants": "2e3", "reviews": "2e5", "favorites": "4e4"},
+    "large": {"users": "2e5", "restaurants": "2e4", "reviews": "2e6", "favorites": "4e5"},
+}
+SEED = 42
+# metric -> direction in which it gets worse
+TRACKED_METRICS = {"p95_ms": 1, "p99_ms": 1, "throughput": -1, "queries_per_request": 1}
+BENCH_PASSWORD = "password123"
+# Favorites each benchmark user starts with, so expanded favorites pages have rows to return
+BENCH_FAVORITES = 40
+
+# Per-operation SQL statement counter, set by each client before it calls the app
+query_counter = contextvars.ContextVar("query_counter", default=None)
+
+
+def percentile(sorted_values, fraction: float) -> float:
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, max(0, int(round(fraction * len(sorted_values))) - 1))
+    return sorted_values[index]
+
+
+def database_url(template: str, scale: str) -> str:
+    if template:
+        return template.format(scale=scale)
+    return f"sqlite:///{os.path.join(tempfile.gettempdir(), f'rateorant-bench-{scale}.db')}"
+
+
+def ensure_fixture(url: str, scale: str, regenerate: bool):
+    """Populate the fixture database with generate_data.py unless it already holds data"""
+    from sqlalchemy import create_engine, text
+    from sqlalchemy.exc import SQLAlchemyError
+
+    if not regenerate:
+        engine = create_engine(url)
+        try:
+            with engine.connect() as connection:
+                if connection.execute(text("SELECT count(*) FROM restaurants")).scalar():
+                    return
+        except SQLAlchemyError:
+            pass
+        finally:
+            engine.dispose()
+
+    args = [arg for name, value in SCALES[scale].items() for arg in (f"--{name}", value)]
+    print(f"Generating {scale} fixture in {url}")
+    subprocess.run(
+        [sys.executable, "generate_data.py", *args, "--seed", str(SEED)],
+        env=dict(os.environ, DATABASE_URL=url), check=True, stdout=subprocess.DEVNULL,
+    )
+
+
+class Context:
+    """Tokens and ids the scenarios draw from; hot restaurants are picked Zipf-style"""
+
+    def __init__(self, concurrency: int):
+        from sqlalchemy import func, select
+        from database import SessionLocal
+        from generate_data import CITY_CENTER, Zipf
+        from models.restaurant import RestaurantModel
+        from models.category import CategoryModel
+        from models.favorite import FavoriteModel
+        from models.user import UserModel, RoleEnum
+        from utils.passwords import hash_password
+
+        self.rng = random.Random(SEED)
+        self.city_center = CITY_CENTER
+        db = SessionLocal()
+        try:
+            self.restaurant_ids = list(db.execute(select(RestaurantModel.id).order_by(RestaurantModel.id)).scalars())
+            self.rng.shuffle(self.restaurant_ids)
+            self.category_ids = list(db.execute(select(CategoryModel.id)).scalars())
+            self.popularity = Zipf(len(self.restaurant_ids), 1.1, self.rng)
+
+            owner_id = db.execute(
+                select(RestaurantModel.owner_id).group_by(RestaurantModel.owner_id)
+                .order_by(func.count().desc()).limit(1)
+            ).scalar()
+            self.owner_token = db.get(UserModel, owner_id).generate_token()
+
+            # One dedicated user per client so write scenarios never collide
+            password_hash = hash_password(BENCH_PASSWORD)
+            users = []
+            for n in range(concurrency):
+                username = f"bench_{n}"
+                user = db.execute(select(UserModel).where(UserModel.username == username)).scalar()
+                if user is None:
+                    user = UserModel(username=username, email=f"{username}@example.com",
+                                     password_hash=password_hash, role=RoleEnum.user)
+                    db.add(user)
+                users.append(user)
+            db.commit()
+            self.users = [(user.username, {"Authorization": f"Bearer {user.generate_token()}"}) for user in users]
+
+            # Favorites come from the unpopular tail, which favorite_add_remove then steers clear of
+            tail = self.restaurant_ids[-min(BENCH_FAVORITES, len(self.restaurant_ids) // 2):]
+            self.favorites = []
+            for user in users:
+                favorites = set(db.execute(select(FavoriteModel.restaurant_id).where(FavoriteModel.user_id == user.id)).scalars())
+                db.add_all(FavoriteModel(user_id=user.id, restaurant_id=restaurant_id)
+                           for restaurant_id in tail if restaurant_id not in favorites)
+                self.favorites.append(favorites | set(tail))
+            db.commit()
+            # worker -> next_cursor of the last page it fetched, per paged scenario
+            self.cursors = {}
+        finally:
+            db.close()
+
+    def restaurant(self) -> int:
+        return self.restaurant_ids[self.popularity.draw(1)[0]]
+
+    def page_ids(self, count: int = 20) -> str:
+        """A comma-separated page of distinct popular restaurant ids"""
+        return ",".join(str(restaurant_id) for restaurant_id in dict.fromkeys(self.restaurant() for _ in range(count)))
+
+    def point(self) -> str:
+        """lat=&lng= query parameters somewhere in the generated city"""
+        latitude, longitude = self.city_center
+        return f"lat={latitude + self.rng.uniform(-0.1, 0.1):.5f}&lng={longitude + self.rng.uniform(-0.1, 0.1):.5f}"
+
+
+def _check(response, *expected):
+    if response.status_code not in (expected or (200,)):
+        raise RuntimeError(f"{response.request.method} {response.request.url.path} -> {response.status_code}")
+    return response
+
+
+def _headers(ctx, worker, auth, owner):
+    return {"Authorization": f"Bearer {ctx.owner_token}"} if owner else ctx.users[worker][1] if auth else None
+
+
+def _get(path_fn, auth=False, owner=False):
+    async def scenario(client, ctx, worker):
+        _check(await client.get(path_fn(ctx), headers=_headers(ctx, worker, auth, owner)))
+    return scenario
+
+
+def _pages(path, auth=False, owner=False):
+    """GET path, each worker following next_cursor page by page and starting over after the last"""
+    async def scenario(client, ctx, worker):
+        cursor = ctx.cursors.get((path, worker))
+        url = f"{path}&cursor={cursor}" if cursor else path
+        response = _check(await client.get(url, headers=_headers(ctx, worker, auth, owner)))
+        ctx.cursors[(path, worker)] = response.json()["next_cursor"]
+    return scenario
+
+
+async def review_create_delete(client, ctx, worker):
+    headers = ctx.users[worker][1]
+    restaurant_id = ctx.restaurant()
+    created = _check(await client.post(
+        f"/api/restaurants/{restaurant_id}/reviews", json={"rating": 4, "comment": "Benchmark"}, headers=headers
+    ))
+    _check(await client.delete(f"/api/restaurants/{restaurant_id}/reviews/{created.json()['id']}", headers=headers))
+
+
+async def favorite_add_remove(client, ctx, worker):
+    headers = ctx.users[worker][1]
+    restaurant_id = ctx.restaurant()
+    while restaurant_id in ctx.favorites[worker]:
+        restaurant_id = ctx.restaurant()
+    _check(await client.post(f"/api/restaurants/{restaurant_id}/favorite", headers=headers))
+    _check(await client.delete(f"/api/restaurants/{restaurant_id}/favorite", headers=headers))
+
+
+async def favorite_status(client, ctx, worker):
+    restaurant_ids = [int(restaurant_id) for restaurant_id in ctx.page_ids().split(",")]
+    _check(await client.post("/api/favorites/status", json={"restaurant_ids": restaurant_ids}, headers=ctx.users[worker][1]))
+
+
+async def login(client, ctx, worker):
+    _check(await client.post("/api/login", json={"username": ctx.users[worker][0], "password": BENCH_PASSWORD}))
+
+
+# name -> (scenario, HTTP requests per operation, share of --requests to run)
+SCENARIOS = {
+    "restaurants_list": (_pages("/api/restaurants?limit=20"), 1, 1),
+    "restaurants_list_sparse": (_pages("/api/restaurants?limit=20&fields=name,location,avg_rating"), 1, 1),
+    "restaurants_by_rating": (_pages("/api/restaurants?sort=rating&limit=20"), 1, 1),
+    "restaurant_detail": (_get(lambda ctx: f"/api/restaurants/{ctx.restaurant()}"), 1, 1),
+    "restaurants_batch": (_get(lambda ctx: f"/api/restaurants?ids={ctx.page_ids()}"), 1, 1),
+    "restaurant_similar": (_get(lambda ctx: f"/api/restaurants/{ctx.restaurant()}/similar"), 1, 1),
+    "restaurant_reviews": (_get(lambda ctx: f"/api/restaurants/{ctx.restaurant()}/reviews"), 1, 1),
+    "restaurant_search": (_get(lambda ctx: f"/api/restaurants/search?q={ctx.rng.choice(['golden', 'bistro', 'downtown grill'])}"), 1, 1),
+    "restaurants_faceted": (_get(lambda ctx: f"/api/restaurants?category={ctx.rng.choice(ctx.category_ids)}&facets=true&limit=20"), 1, 1),
+    "restaurants_nearby": (_get(lambda ctx: f"/api/restaurants/nearby?{ctx.point()}&radius=2"), 1, 1),
+    "categories": (_get(lambda ctx: "/api/categories"), 1, 1),
+    "category_restaurants": (_get(lambda ctx: f"/api/categories/{ctx.rng.choice(ctx.category_ids)}/restaurants"), 1, 1),
+    "review_create_delete": (review_create_delete, 2, 1),
+    "favorite_check": (_get(lambda ctx: f"/api/restaurants/{ctx.restaurant()}/favorite", auth=True), 1, 1),
+    "favorite_status": (favorite_status, 1, 1),
+    "favorite_add_remove": (favorite_add_remove, 2, 1),
+    "favorites_list": (_get(lambda ctx: "/api/favorites", auth=True), 1, 1),
+    "favorites_expanded": (_pages("/api/favorites?expand=true&limit=20", auth=True), 1, 1),
+    "notifications": (_pages("/api/notifications/?limit=20", owner=True), 1, 1),
+    # bcrypt-bound; fewer operations keep the run short
+    "login": (login, 1, 0.25),
+}
+
+
+async def run_scenario(client, ctx, scenario, requests_per_op: int, operations: int, concurrency: int):
+    latencies, queries = [], []
+    errors = 0
+    remaining = operations
+
+    async def worker(n: int):
+        nonlocal remaining, errors
+        while remaining > 0:
+            remaining -= 1
+            counter = [0]
+            token = query_counter.set(counter)
+            start = time.perf_counter()
+            try:
+                await scenario(client, ctx, n)
+            except Exception:
+                errors += 1
+            finally:
+                latencies.append(time.perf_counter() - start)
+                queries.append(counter[0])
+                query_counter.reset(token)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker(n) for n in range(concurrency)))
+    elapsed = time.perf_counter() - started
+
+    latencies.sort()
+    return {
+        "operations": len(latencies),
+        "errors": errors,
+        "throughput": len(latencies) / elapsed if elapsed else 0.0,
+        "p50_ms": percentile(latencies, 0.50) * 1000,
+        "p95_ms": percentile(latencies, 0.95) * 1000,
+        "p99_ms": percentile(latencies, 0.99) * 1000,
+        "queries_per_request": sum(queries) / (len(queries) * requests_per_op) if queries else 0.0,
+    }
+
+
+async def run_scale(args):
+    import httpx
+    from sqlalchemy import event
+    from database import engine, async_engine
+    from main import app
+
+    def count_query(*_):
+        counter = query_counter.get()
+        if counter is not None:
+            counter[0] += 1
+
+    for bound in filter(None, (engine, async_engine and async_engine.sync_engine)):
+        event.listen(bound, "before_cursor_execute", count_query)
+
+    ctx = Context(args.concurrency)
+    transport = httpx.ASGITransport(app=app)
+    results = {}
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        for name, (scenario, requests_per_op, share) in SCENARIOS.items():
+            if args.scenario and name not in args.scenario:
+                continue
+            operations = max(1, int(args.requests * share))
+            # Warm-up: first-hit costs (imports, caches, search index) are not what we track
+            await run_scenario(client, ctx, scenario, requests_per_op, min(operations, args.concurrency), args.concurrency)
+            results[name] = await run_scenario(client, ctx, scenario, requests_per_op, operations, args.concurrency)
+            r = results[name]
+            print(f"  {name:<24} {r['throughput']:>8.1f} ops/s  p50 {r['p50_ms']:>7.1f}  p95 {r['p95_ms']:>7.1f}"
+                  f"  p99 {r['p99_ms']:>7.1f} ms  {r['queries_per_request']:>5.1f} q/req  {r['errors']} err")
+    return results
+
+
+def compare(results: dict, baseline: dict, threshold: float):
+    """Return human-readable regressions of tracked metrics beyond threshold percent"""
+    regressions = []
+    for scale, scenarios in results.items():
+        for name, metrics in scenarios.items():
+            base = baseline.get(scale, {}).get(name)
+            if not base:
+                continue
+            if metrics["errors"] > base.get("errors", 0):
+                regressions.append(f"{scale}/{name}: errors {base.get('errors', 0)} -> {metrics['errors']}")
+            for metric, direction in TRACKED_METRICS.items():
+                old, new = base.get(metric), metrics[metric]
+                if old is None:
+                    continue
+                if old == 0:
+                    # e.g. a cached endpoint that starts hitting the database again
+                    if direction > 0 and new > 0:
+                        regressions.append(f"{scale}/{name}: {metric} 0 -> {new:.2f}")
+                    continue
+                change = (new - old) / old * 100 * direction
+                if change > threshold:
+                    regressions.append(f"{scale}/{name}: {metric} {old:.2f} -> {new:.2f} ({change:+.0f}% worse)")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Endpoint load benchmark")
+    parser.add_argument("--scale", nargs="+", choices=SCALES, default=["small"])
+    parser.add_argument("--database-url", help="fixture database, may contain {scale}")
+    parser.add_argument("--regenerate", action="store_true", help="rebuild the fixture databases")
+    parser.add_argument("--requests", type=int, default=200, help="operations per scenario")
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--scenario", nargs="+", choices=SCENARIOS, help="only run these scenarios")
+    parser.add_argument("--output", default="benchmark-results.json")
+    parser.add_argument("--baseline", help="results JSON to compare against")
+    parser.add_argument("--threshold", type=float, default=20, help="allowed regression in percent")
+    parser.add_argument("--response-cache", action="store_true", help="serve repeated GETs from the response cache")
+    parser.add_argument("--run-scale", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.run_scale:
+        # Child process: DATABASE_URL is read at import time, so each scale gets its own interpreter
+        results = asyncio.run(run_scale(args))
+        with open(args.output, "w") as f:
+            json.dump(results, f)
+        return
+
+    results = {}
+    for scale in args.scale:
+        url = database_url(args.database_url, scale)
+        ensure_fixture(url, scale, args.regenerate)
+        print(f"{scale}: {args.requests} operations per scenario, {args.concurrency} clients")
+        with tempfile.NamedTemporaryFile(suffix=".json", delete=False) as f:
+            child_output = f.name
+        try:
+            child_args = ["--run-scale", scale, "--output", child_output,
+                          "--requests", str(args.requests), "--concurrency", str(args.concurrency)]
+            if args.scenario:
+                child_args += ["--scenario", *args.scenario]
+            # Every benchmark client shares one address, so the per-IP login/register limits stay off;
+            # profiling is on so N+1 warnings and Server-Timing show up while the scenarios run
+            env = dict(os.environ, DATABASE_URL=url, RATE_LIMIT="false",
+                       REQUEST_PROFILING="true", SERVER_TIMING_HEADER="true")
+            if not args.response_cache:
+                env["RESPONSE_CACHE_TTL"] = "0"
+            subprocess.run([sys.executable, "-m", "benchmarks.endpoints", *child_args], env=env, check=True)
+            with open(child_output) as f:
+                results[scale] = json.load(f)
+        finally:
+            os.unlink(child_output)
+
+    report = {
+        "meta": {
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "async_db": os.getenv("ASYNC_DB", "false"),
+            "response_cache": args.response_cache,
+            "requests": args.requests,
+            "concurrency": args.concurrency,
+        },
+        "results": results,
+    }
+    with open(args.output, "w") as f:
+        json.dump(report, f, indent=2)
+    print(f"OK Results written to {args.output}")
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)["results"]
+        regressions = compare(results, baseline, args.threshold)
+        if regressions:
+            print(f"ERROR {len(regressions)} metrics regressed by more than {args.threshold:.0f}%:")
+            for regression in regressions:
+                print(f"  {regression}")
+            sys.exit(1)
+        print(f"OK No metric regressed by more than {args.threshold:.0f}% against {args.baseline}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,208 @@
+"""
+CPU per request of the response encoding settings (FAST_JSON, gzip compression).
+
+Boots main.app in a fresh interpreter per configuration against the endpoint
+benchmark's fixture database, with the response cache off so every request
+serializes, and records process CPU time and bytes on the wire per request for
+/api/restaurants and /api/notifications. CPU time includes the in-process
+client, which is the same in every configuration. On FastAPI 0.130+ FAST_JSON
+is ignored, so its configurations are skipped. A second table times the
+serialization step alone for the same payloads: json.dumps (what FastAPI
+< 0.130 does), orjson (FAST_JSON) and pydantic-core (FastAPI 0.130+).
+
+Run with: pipenv run python -m benchmarks.response_cpu [--scale small] [--requests 300]
+"""
+import argparse
+import asyncio
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+from benchmarks.endpoints import SCALES, database_url, ensure_fixture
+
+CONFIGS = {
+    "baseline": {"FAST_JSON": "false", "COMPRESSION_MIN_SIZE": "0"},
+    "fast_json": {"FAST_JSON": "true", "COMPRESSION_MIN_SIZE": "0"},
+    "gzip": {"FAST_JSON": "false", "COMPRESSION_MIN_SIZE": "1024"},
+    "fast_json+gzip": {"FAST_JSON": "true", "COMPRESSION_MIN_SIZE": "1024"},
+}
+PATHS = {
+    "restaurants": "/api/restaurants?limit=100",
+    "notifications": "/api/notifications/?limit=100",
+}
+# Notifications the fixture's busiest owner gets for the run; generate_data.py creates none
+NOTIFICATIONS = 100
+MARKER = "response_cpu benchmark"
+
+
+def seed_notifications():
+    """Give the busiest owner NOTIFICATIONS notifications and return a token for them"""
+    from sqlalchemy import func, select
+    from database import SessionLocal
+    from models.notification import NotificationModel
+    from models.restaurant import RestaurantModel
+    from models.user import UserModel
+
+    db = SessionLocal()
+    try:
+        owner_id, restaurant_id = db.execute(
+            select(RestaurantModel.owner_id, func.min(RestaurantModel.id))
+            .group_by(RestaurantModel.owner_id).order_by(func.count().desc()).limit(1)
+        ).one()
+        reviewer_id = db.execute(select(UserModel.id).where(UserModel.id != owner_id).limit(1)).scalar()
+        db.add_all(
+            NotificationModel(restaurant_id=restaurant_id, user_id=reviewer_id, rating=n % 5 + 1, message=MARKER)
+            for n in range(NOTIFICATIONS)
+        )
+        db.commit()
+        return db.get(UserModel, owner_id).generate_token()
+    finally:
+        db.close()
+
+
+def remove_notifications():
+    from sqlalchemy import delete
+    from database import SessionLocal
+    from models.notification import NotificationModel
+
+    db = SessionLocal()
+    try:
+        db.execute(delete(NotificationModel).where(NotificationModel.message == MARKER))
+        db.commit()
+    finally:
+        db.close()
+
+
+async def measure(requests: int):
+    """{path name: cpu_ms, wire_bytes} for this process's configuration"""
+    import httpx
+    from main import app
+
+    token = seed_notifications()
+    try:
+        transport = httpx.ASGITransport(app=app)
+        headers = {"Authorization": f"Bearer {token}", "Accept-Encoding": "gzip"}
+        results = {}
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench", headers=headers) as client:
+            for name, path in PATHS.items():
+                for _ in range(10):
+                    (await client.get(path)).raise_for_status()
+                wire_bytes = 0
+                start = time.process_time()
+                for _ in range(requests):
+                    response = await client.get(path)
+                    response.raise_for_status()
+                    wire_bytes += response.num_bytes_downloaded
+                results[name] = {
+                    "cpu_ms": (time.process_time() - start) / requests * 1000,
+                    "wire_bytes": wire_bytes / requests,
+                }
+        return results
+    finally:
+        remove_notifications()
+
+
+def serializer_costs(requests: int):
+    """CPU ms to encode each endpoint's validated payload, by encoder"""
+    import orjson
+    from database import SessionLocal
+    from controllers.notifications import notifications_page_statement, notifications_page
+    from controllers.restaurants import restaurant_filters, restaurants_page_statement, restaurants_page
+    from serializers.notification import NotificationPageSchema
+    from serializers.restaurant import RestaurantPageSchema
+    from utils.response_cache import _adapter
+    import jwt
+    from config.environment import secret
+
+    token = seed_notifications()
+    db = SessionLocal()
+    try:
+        owner_id = int(jwt.decode(token, secret, algorithms=["HS256"])["sub"])
+        payloads = {
+            "restaurants": (RestaurantPageSchema, restaurants_page(
+                db.execute(restaurants_page_statement(100, None, "created_at", "desc", restaurant_filters(None, None, None))).all(),
+                100, "created_at", "desc",
+            )),
+            "notifications": (NotificationPageSchema, notifications_page(
+                db.execute(notifications_page_statement(owner_id, 100, None, None)).all(), 100,
+            )),
+        }
+        encoders = {
+            "json.dumps": lambda adapter, value: json.dumps(
+                adapter.dump_python(value, mode="json"), ensure_ascii=False, separators=(",", ":")
+            ).encode(),
+            "orjson": lambda adapter, value: orjson.dumps(adapter.dump_python(value, mode="json")),
+            "pydantic-core": lambda adapter, value: adapter.dump_json(value),
+        }
+        results = {}
+        for name, (schema, payload) in payloads.items():
+            adapter = _adapter(schema)
+            value = adapter.validate_python(payload, from_attributes=True)
+            results[name] = {}
+            for encoder_name, encode in encoders.items():
+                encode(adapter, value)
+                start = time.process_time()
+                for _ in range(requests):
+                    encode(adapter, value)
+                results[name][encoder_name] = (time.process_time() - start) / requests * 1000
+        return results
+    finally:
+        db.close()
+        remove_notifications()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Response encoding CPU benchmark")
+    parser.add_argument("--scale", choices=SCALES, default="small")
+    parser.add_argument("--database-url", help="fixture database, may contain {scale}")
+    parser.add_argument("--requests", type=int, default=300, help="requests per endpoint and configuration")
+    parser.add_argument("--run-config", help=argparse.SUPPRESS)
+    parser.add_argument("--output", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.run_config:
+        # Child process: settings are read at import time, so each configuration gets its own interpreter
+        if args.run_config == "serializers":
+            results = serializer_costs(args.requests)
+        else:
+            results = asyncio.run(measure(args.requests))
+        with open(args.output, "w") as f:
+            json.dump(results, f)
+        return
+
+    from utils.responses import PYDANTIC_WRITES_JSON
+
+    # With FAST_JSON ignored its configurations would only re-measure baseline and gzip
+    configs = [name for name, env in CONFIGS.items() if not (PYDANTIC_WRITES_JSON and env["FAST_JSON"] == "true")]
+    url = database_url(args.database_url, args.scale)
+    ensure_fixture(url, args.scale, False)
+    results = {}
+    for name in [*configs, "serializers"]:
+        with tempfile.NamedTemporaryFile(suffix=".json", delete=False) as f:
+            child_output = f.name
+        try:
+            env = dict(os.environ, DATABASE_URL=url, RESPONSE_CACHE_TTL="0", RATE_LIMIT="false", **CONFIGS.get(name, {}))
+            subprocess.run([sys.executable, "-m", "benchmarks.response_cpu", "--run-config", name,
+                            "--output", child_output, "--requests", str(args.requests)], env=env, check=True)
+            with open(child_output) as f:
+                results[name] = json.load(f)
+        finally:
+            os.unlink(child_output)
+
+    serializer = "pydantic-core (FAST_JSON is ignored; its configs skipped)" if PYDANTIC_WRITES_JSON else "json.dumps"
+    print(f"{args.scale} fixture, {args.requests} requests each; this FastAPI encodes response models with {serializer}")
+    print(f"{'config':<16}" + "".join(f" | {name:>13} cpu ms {'bytes':>8}" for name in PATHS))
+    for name in configs:
+        row = "".join(f" | {r['cpu_ms']:>20.3f} {r['wire_bytes']:>8.0f}" for r in results[name].values())
+        print(f"{name:<16}{row}")
+    print(f"\n{'encode only':<16}" + "".join(f" | {name:>27}" for name in PATHS))
+    for encoder_name in ("json.dumps", "orjson", "pydantic-core"):
+        row = "".join(f" | {results['serializers'][name][encoder_name]:>24.3f} ms" for name in PATHS)
+        print(f"{encoder_name:<16}{row}")
+
+
+if __name__ == "__main__":
+    main()
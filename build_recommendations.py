@@ -0,0 +1,38 @@
+"""
+Build the item-item recommendation table (restaurant_similarities) from
+favorites and reviews: cosine similarity over the sparse restaurant x user
+interaction matrix, keeping the top K neighbours per restaurant.
+
+By default only restaurants whose interactions changed since the last run,
+and the restaurants whose neighbour lists they affect, are recomputed;
+--full rebuilds everything. The new lists replace the old ones in a single
+transaction, so the API never serves a half-written table.
+
+Needs numpy and scipy. Run from cron or by hand:
+Run with: pipenv run python build_recommendations.py [--full] [--top-k 20]
+"""
+import argparse
+
+from database import engine
+import models  # noqa: F401
+from models.recommendation import RestaurantSimilarityModel, RestaurantSimilarityStateModel
+from utils import recommendations
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--full", action="store_true", help="Recompute every restaurant instead of only what changed")
+    parser.add_argument("--top-k", type=int, default=recommendations.TOP_K, help="Neighbours kept per restaurant")
+    parser.add_argument("--block-size", type=int, default=recommendations.BLOCK_SIZE,
+                        help="Restaurants per sparse matrix product; lower it if memory runs short")
+    args = parser.parse_args()
+
+    RestaurantSimilarityModel.__table__.create(bind=engine, checkfirst=True)
+    RestaurantSimilarityStateModel.__table__.create(bind=engine, checkfirst=True)
+
+    with engine.begin() as connection:
+        recommendations.build_similarities(connection, top_k=args.top_k, full=args.full, block_size=args.block_size)
+
+
+if __name__ == "__main__":
+    main()
@@ -4,4 +4,71 @@ from dotenv import load_dotenv
 load_dotenv()
 
 db_URI = os.getenv('DATABASE_URL')
-secret = os.getenv('JWT_SECRET')
\ No newline at end of file
+secret = os.getenv('JWT_SECRET')
+
+# Authentication: trust verified token claims instead of re-reading the user row
+stateless_auth = os.getenv('STATELESS_AUTH', 'false').lower() in ('1', 'true', 'yes')
+user_cache_size = int(os.getenv('USER_CACHE_SIZE', '1024'))
+user_cache_ttl = float(os.getenv('USER_CACHE_TTL', '60'))
+
+# Password hashing: bcrypt cost and the process pool that runs it
+bcrypt_rounds = int(os.getenv('BCRYPT_ROUNDS', '12'))
+password_hash_workers = int(os.getenv('PASSWORD_HASH_WORKERS', str(os.cpu_count() or 1)))
+password_hash_queue = int(os.getenv('PASSWORD_HASH_QUEUE', str(max(password_hash_workers, 1) * 4)))
+password_hash_retry_after = int(os.getenv('PASSWORD_HASH_RETRY_AFTER', '1'))
+
+# Database driver mode: async handlers on asyncpg/aiosqlite instead of the sync Session
+async_db = os.getenv('ASYNC_DB', 'false').lower() in ('1', 'true', 'yes')
+
+# Connection pool (QueuePool) sizing and health
+db_pool_size = int(os.getenv('DB_POOL_SIZE', '5'))
+db_max_overflow = int(os.getenv('DB_MAX_OVERFLOW', '10'))
+db_pool_timeout = float(os.getenv('DB_POOL_TIMEOUT', '30'))
+db_pool_recycle = int(os.getenv('DB_POOL_RECYCLE', '1800'))
+db_pool_pre_ping = os.getenv('DB_POOL_PRE_PING', 'true').lower() in ('1', 'true', 'yes')
+
+# Read-through cache of serialized catalog responses (per worker process)
+response_cache_max_bytes = int(os.getenv('RESPONSE_CACHE_MAX_BYTES', str(64 * 1024 * 1024)))
+response_cache_ttl = float(os.getenv('RESPONSE_CACHE_TTL', '30'))
+
+# Per-request SQL profiling: Server-Timing header, one log line per request, N+1 warnings (opt-in)
+request_profiling = os.getenv('REQUEST_PROFILING', 'false').lower() in ('1', 'true', 'yes')
+server_timing_header = os.getenv('SERVER_TIMING_HEADER', 'false').lower() in ('1', 'true', 'yes')
+n_plus_one_threshold = int(os.getenv('N_PLUS_ONE_THRESHOLD', '10'))
+
+# Prometheus /metrics; set METRICS_MULTIPROC_DIR (cleared before start) when running several workers
+metrics_enabled = os.getenv('METRICS', 'true').lower() in ('1', 'true', 'yes')
+metrics_multiproc_dir = os.getenv('METRICS_MULTIPROC_DIR') or None
+metrics_snapshot_interval = float(os.getenv('METRICS_SNAPSHOT_INTERVAL', '1'))
+
+# Notification push (SSE): broker is memory (per worker), postgres (LISTEN/NOTIFY) or "module:factory"
+notification_broker = os.getenv('NOTIFICATION_BROKER', 'memory')
+notification_queue_size = int(os.getenv('NOTIFICATION_QUEUE_SIZE', '100'))
+notification_keepalive = float(os.getenv('NOTIFICATION_KEEPALIVE', '15'))
+notification_replay_limit = int(os.getenv('NOTIFICATION_REPLAY_LIMIT', '100'))
+
+# Background task queue for non-critical side effects (per worker process)
+task_queue_size = int(os.getenv('TASK_QUEUE_SIZE', '10000'))
+task_retries = int(os.getenv('TASK_RETRIES', '3'))
+task_retry_backoff = float(os.getenv('TASK_RETRY_BACKOFF', '0.5'))
+
+# Spatial index for nearby-restaurant queries: geohash (any database) or earthdistance (PostgreSQL cube/earthdistance)
+geo_index = os.getenv('GEO_INDEX', 'geohash')
+
+# Rate limiting: per-route token buckets (RATE_LIMIT_RULES is a JSON list overriding the defaults in
+# utils/rate_limit.py), store is memory (per worker), postgres (shared) or "module:factory"
+rate_limit_enabled = os.getenv('RATE_LIMIT', 'true').lower() in ('1', 'true', 'yes')
+rate_limit_store = os.getenv('RATE_LIMIT_STORE', 'memory')
+rate_limit_rules = os.getenv('RATE_LIMIT_RULES') or None
+trust_forwarded_for = os.getenv('TRUST_FORWARDED_FOR', 'false').lower() in ('1', 'true', 'yes')
+
+# Load shedding: requests in flight per worker beyond which new ones get 503 + Retry-After (0 disables)
+max_concurrent_requests = int(os.getenv('MAX_CONCURRENT_REQUESTS', '100'))
+load_shed_retry_after = int(os.getenv('LOAD_SHED_RETRY_AFTER', '1'))
+
+# Response encoding: FAST_JSON renders with orjson wherever FastAPI would use json.dumps (FastAPI < 0.130;
+# newer versions write response models with pydantic-core already and warn that it is ignored); gzip bodies of at least
+# COMPRESSION_MIN_SIZE bytes (0 disables) when the client accepts it
+fast_json = os.getenv('FAST_JSON', 'false').lower() in ('1', 'true', 'yes')
+compression_min_size = int(os.getenv('COMPRESSION_MIN_SIZE', '1024'))
+compression_level = int(os.getenv('COMPRESSION_LEVEL', '5'))
@@ -0,0 +1,24 @@
+from fastapi import APIRouter, Depends, Query
+from typing import Optional
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from serializers.notification import NotificationPageSchema
+
+from database import get_async_db
+from dependencies.get_current_user import get_current_principal_async, Principal
+from controllers.notifications import notifications_page_statement, notifications_page
+
+router = APIRouter(tags=["notifications"])
+
+@router.get("/", response_model=NotificationPageSchema)
+async def get_notifications(
+    limit: int = Query(20, ge=1, le=100),
+    cursor: Optional[str] = None,
+    read: Optional[bool] = None,
+    current_user: Principal = Depends(get_current_principal_async),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """Newest-first page of notifications for the current owner's restaurants, in one joined query"""
+    statement = notifications_page_statement(current_user.id, limit, cursor, read)
+    rows = (await db.execute(statement)).all()
+    return notifications_page(rows, limit)
@@ -0,0 +1,463 @@
+from fastapi import APIRouter, Depends, HTTPException, Query, Request
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import selectinload
+from models.restaurant import RestaurantModel
+from models.review import ReviewModel
+from models.favorite import FavoriteModel
+from models.category import CategoryModel
+from models.user import RoleEnum
+# Serializers
+from serializers.restaurant import RestaurantSchema, RestaurantCreateSchema, RestaurantUpdateSchema, RestaurantDetailSchema, RestaurantPageSchema, RestaurantBatchSchema, RestaurantNearbySchema, RestaurantRecommendationSchema, CategorySchema
+from serializers.review import ReviewSchema, ReviewCreateSchema
+from serializers.favorite import FavoriteSchema, FavoritePageSchema, FavoriteStatusRequestSchema, FavoriteStatusSchema
+from typing import List, Literal, Optional, Union
+# Database Connection
+from database import get_async_db
+# Middleware
+from dependencies.get_current_user import get_current_principal_async, Principal
+# Shared with the sync router
+from controllers.restaurants import (
+    restaurant_filters, restaurants_page_statement, restaurants_page, review_insert_statement,
+    notification_insert_statement, nearby_response, similar_restaurants_statement, recommendations_statement,
+    scored_response, parse_ids, restaurants_by_ids_statement, restaurants_batch, favorite_ids_statement,
+    favorites_page_statement, favorites_page,
+)
+from controllers.notifications import notification_event
+from utils.ratings import apply_review_rating
+from utils.geo import find_nearby, geohash_for
+from utils.fieldsets import parse_fields, category_restaurants_statement, project_restaurant, fieldset_schemas
+from utils.facets import facets_statement, facet_counts, facets_cache_key, get_cached_facets, cache_facets
+from utils.search import search_restaurants, refresh_search_document, index_restaurant, unindex_restaurant
+from utils.response_cache import response_cache, cache_key, render, json_response, restaurant_tags, invalidate_restaurant
+from utils.pubsub import publish_notification
+from utils.tasks import background_tasks
+
+router = APIRouter()
+
+
+async def _get_restaurant_or_404(db: AsyncSession, restaurant_id: int, *options):
+    restaurant = await db.get(RestaurantModel, restaurant_id, options=options)
+    if not restaurant:
+        raise HTTPException(status_code=404, detail="Restaurant not found")
+    return restaurant
+
+
+async def _get_favorite(db: AsyncSession, user_id: int, restaurant_id: int):
+    result = await db.execute(select(FavoriteModel).where(
+        FavoriteModel.user_id == user_id,
+        FavoriteModel.restaurant_id == restaurant_id
+    ))
+    return result.scalars().first()
+
+
+@router.get("/restaurants", response_model=Union[RestaurantPageSchema, RestaurantBatchSchema])
+async def get_restaurants(
+    request: Request,
+    limit: int = Query(20, ge=1, le=100),
+    cursor: Optional[str] = None,
+    sort: Literal["created_at", "name", "rating"] = "created_at",
+    order: Literal["asc", "desc"] = "desc",
+    location: Optional[str] = None,
+    owner_id: Optional[int] = None,
+    category: Optional[List[int]] = Query(None),
+    match: Literal["any", "all"] = Query("any", description="Restaurants in any (OR) or all (AND) of the categories"),
+    facets: bool = Query(False, description="Include counts by category, rating bucket and location"),
+    ids: Optional[str] = Query(None, description="Comma-separated ids: fetch these restaurants with their categories instead of a page"),
+    fields: Optional[str] = Query(None, description="Comma-separated fields to return, e.g. id,name,location; only their columns are read"),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """Get a page of restaurants, filtered and sorted, continuing from an opaque cursor.
+
+    With ids, get those restaurants (in the order given) with their
+    categories instead; ids that do not exist are listed in missing.
+    """
+    key = cache_key(request)
+    body = response_cache.get(key)
+    if body is not None:
+        return json_response(body, hit=True)
+
+    if ids is not None:
+        restaurant_ids = parse_ids(ids)
+        restaurants = (await db.execute(restaurants_by_ids_statement(restaurant_ids))).scalars().all()
+        batch, tags = restaurants_batch(restaurants, restaurant_ids)
+        body = render(RestaurantBatchSchema, batch)
+        response_cache.set(key, body, tags)
+        return json_response(body, hit=False)
+
+    fields = parse_fields(fields)
+    filters = restaurant_filters(location, owner_id, category, match)
+    statement = restaurants_page_statement(limit, cursor, sort, order, filters, fields)
+    rows = (await db.execute(statement)).all()
+    page = restaurants_page(rows, limit, sort, order, fields)
+
+    tags = ["restaurants", *restaurant_tags(page["items"])]
+    if facets:
+        facets_key = facets_cache_key(location, owner_id, category, match)
+        page["facets"] = get_cached_facets(facets_key)
+        if page["facets"] is None:
+            page["facets"] = facet_counts((await db.execute(facets_statement(filters))).all())
+            cache_facets(facets_key, page["facets"])
+        tags.append("categories")
+
+    body = render(fieldset_schemas(fields)[1] if fields else RestaurantPageSchema, page)
+    response_cache.set(key, body, tags)
+    return json_response(body, hit=False)
+
+
+@router.get("/categories", response_model=List[CategorySchema])
+async def get_categories(request: Request, db: AsyncSession = Depends(get_async_db)):
+    """Get all available categories"""
+    key = cache_key(request)
+    body = response_cache.get(key)
+    if body is not None:
+        return json_response(body, hit=True)
+
+    result = await db.execute(select(CategoryModel))
+
+    body = render(List[CategorySchema], result.scalars().all())
+    response_cache.set(key, body, ["categories"])
+    return json_response(body, hit=False)
+
+
+@router.get("/categories/{category_id}/restaurants", response_model=List[RestaurantSchema])
+async def get_restaurants_by_category(
+    category_id: int,
+    request: Request,
+    fields: Optional[str] = Query(None, description="Comma-separated fields to return, e.g. id,name,location; only their columns are read"),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """Get all restaurants for a specific category"""
+    key = cache_key(request)
+    body = response_cache.get(key)
+    if body is not None:
+        return json_response(body, hit=True)
+
+    fields = parse_fields(fields)
+    if fields:
+        if not await db.get(CategoryModel, category_id):
+            raise HTTPException(status_code=404, detail="Category not found")
+        rows = (await db.execute(category_restaurants_statement(category_id, fields))).all()
+        restaurants = [project_restaurant(row, fields) for row in rows]
+        body = render(List[fieldset_schemas(fields)[0]], restaurants)
+    else:
+        category = await db.get(CategoryModel, category_id, options=[selectinload(CategoryModel.restaurants)])
+        if not category:
+            raise HTTPException(status_code=404, detail="Category not found")
+        restaurants = category.restaurants
+        body = render(List[RestaurantSchema], restaurants)
+
+    response_cache.set(key, body, [f"category:{category_id}", *restaurant_tags(restaurants)])
+    return json_response(body, hit=False)
+
+
+@router.get("/restaurants/search", response_model=List[RestaurantSchema])
+async def search(
+    q: str = Query(..., min_length=1),
+    limit: int = Query(20, ge=1, le=100),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """Full-text search over name, description, location and categories, ranked by relevance"""
+    return await db.run_sync(search_restaurants, q, limit)
+
+
+@router.get("/restaurants/nearby", response_model=List[RestaurantNearbySchema])
+async def get_nearby_restaurants(
+    lat: float = Query(..., ge=-90, le=90),
+    lng: float = Query(..., ge=-180, le=180),
+    radius: float = Query(2, gt=0, le=50, description="Search radius in kilometres"),
+    limit: int = Query(20, ge=1, le=100),
+    category: Optional[List[int]] = Query(None),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """Restaurants within radius km of a point, closest first, optionally limited to any of the given categories"""
+    return nearby_response(await db.run_sync(find_nearby, lat, lng, radius, limit, category))
+
+
+@router.get("/restaurants/{restaurant_id}", response_model=RestaurantDetailSchema)
+async def get_single_restaurant(restaurant_id: int, request: Request, db: AsyncSession = Depends(get_async_db)):
+    """Get a single restaurant with details"""
+    key = cache_key(request)
+    body = response_cache.get(key)
+    if body is not None:
+        return json_response(body, hit=True)
+
+    restaurant = await _get_restaurant_or_404(db, restaurant_id, selectinload(RestaurantModel.categories))
+
+    body = render(RestaurantDetailSchema, restaurant)
+    tags = [f"restaurant:{restaurant_id}", *(f"category:{c.id}" for c in restaurant.categories)]
+    response_cache.set(key, body, tags)
+    return json_response(body, hit=False)
+
+
+@router.post('/restaurants', response_model=RestaurantSchema)
+async def create_restaurant(
+    restaurant: RestaurantCreateSchema,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: Principal = Depends(get_current_principal_async)
+):
+    """Create a new restaurant - only restaurant_owner or admin"""
+    if current_user.role not in [RoleEnum.restaurant_owner, RoleEnum.admin]:
+        raise HTTPException(status_code=403, detail="Only restaurant owners or admins can create restaurants")
+
+    restaurant_data = restaurant.dict(exclude={'category_ids'})
+    new_restaurant = RestaurantModel(
+        **restaurant_data,
+        owner_id=current_user.id,
+        geohash=geohash_for(restaurant.latitude, restaurant.longitude)
+    )
+
+    categories = []
+    if restaurant.category_ids:
+        result = await db.execute(select(CategoryModel).where(CategoryModel.id.in_(restaurant.category_ids)))
+        categories = result.scalars().all()
+    new_restaurant.categories = list(categories)
+
+    db.add(new_restaurant)
+    await db.flush()
+    await db.run_sync(refresh_search_document, new_restaurant.id)
+    await db.commit()
+    await db.refresh(new_restaurant)
+    await db.run_sync(index_restaurant, new_restaurant)
+    invalidate_restaurant(category_ids=restaurant.category_ids)
+
+    return new_restaurant
+
+
+@router.put('/restaurants/{restaurant_id}', response_model=RestaurantSchema)
+async def update_restaurant(
+    restaurant_id: int,
+    restaurant: RestaurantUpdateSchema,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: Principal = Depends(get_current_principal_async)
+):
+    """Update a restaurant - owner or admin only"""
+    db_restaurant = await _get_restaurant_or_404(db, restaurant_id, selectinload(RestaurantModel.categories))
+
+    if db_restaurant.owner_id != current_user.id and current_user.role != RoleEnum.admin:
+        raise HTTPException(status_code=403, detail="Permission Denied")
+
+    update_data = restaurant.dict(exclude_unset=True, exclude={'category_ids'})
+    for field, value in update_data.items():
+        if value is not None:
+            setattr(db_restaurant, field, value)
+    if 'latitude' in update_data or 'longitude' in update_data:
+        db_restaurant.geohash = geohash_for(db_restaurant.latitude, db_restaurant.longitude)
+
+    if restaurant.category_ids is not None:
+        result = await db.execute(select(CategoryModel).where(CategoryModel.id.in_(restaurant.category_ids)))
+        db_restaurant.categories = list(result.scalars().all())
+
+    await db.run_sync(refresh_search_document, db_restaurant.id)
+    await db.commit()
+    await db.refresh(db_restaurant)
+    await db.run_sync(index_restaurant, db_restaurant)
+    invalidate_restaurant(restaurant_id, category_ids=restaurant.category_ids or ())
+
+    return db_restaurant
+
+
+@router.delete('/restaurants/{restaurant_id}')
+async def delete_restaurant(
+    restaurant_id: int,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: Principal = Depends(get_current_principal_async)
+):
+    """Delete a restaurant - owner or admin only"""
+    db_restaurant = await _get_restaurant_or_404(db, restaurant_id)
+
+    if db_restaurant.owner_id != current_user.id and current_user.role != RoleEnum.admin:
+        raise HTTPException(status_code=403, detail="Permission Denied")
+
+    await db.delete(db_restaurant)
+    await db.commit()
+    await db.run_sync(unindex_restaurant, restaurant_id)
+    invalidate_restaurant(restaurant_id)
+
+    return {"message": "Restaurant deleted successfully"}
+
+
+@router.get("/restaurants/{restaurant_id}/reviews", response_model=List[ReviewSchema])
+async def get_restaurant_reviews(restaurant_id: int, db: AsyncSession = Depends(get_async_db)):
+    """Get all reviews for a specific restaurant"""
+    await _get_restaurant_or_404(db, restaurant_id)
+
+    result = await db.execute(select(ReviewModel).where(ReviewModel.restaurant_id == restaurant_id))
+    return result.scalars().all()
+
+
+@router.get("/restaurants/{restaurant_id}/similar", response_model=List[RestaurantRecommendationSchema])
+async def get_similar_restaurants(
+    restaurant_id: int,
+    request: Request,
+    limit: int = Query(10, ge=1, le=50),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """Restaurants liked by the same people, read from the table build_recommendations.py maintains"""
+    key = cache_key(request)
+    body = response_cache.get(key)
+    if body is not None:
+        return json_response(body, hit=True)
+
+    rows = (await db.execute(similar_restaurants_statement(restaurant_id, limit))).all()
+    if not rows:
+        await _get_restaurant_or_404(db, restaurant_id)
+
+    body = render(List[RestaurantRecommendationSchema], scored_response(rows))
+    response_cache.set(key, body, [f"restaurant:{restaurant_id}", *restaurant_tags(restaurant for restaurant, _ in rows)])
+    return json_response(body, hit=False)
+
+
+@router.get("/recommendations", response_model=List[RestaurantRecommendationSchema])
+async def get_recommendations(
+    limit: int = Query(20, ge=1, le=100),
+    db: AsyncSession = Depends(get_async_db),
+    current_user: Principal = Depends(get_current_principal_async)
+):
+    """Restaurants you may like, from the neighbours of the ones you favorited or reviewed"""
+    return scored_response((await db.execute(recommendations_statement(current_user.id, limit))).all())
+
+
+@router.post('/restaurants/{restaurant_id}/reviews', response_model=ReviewSchema)
+async def create_review(
+    restaurant_id: int,
+    review: ReviewCreateSchema,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: Principal = Depends(get_current_principal_async)
+):
+    """Create a review for a restaurant, with its side effects in one transaction"""
+    result = await db.execute(
+        select(RestaurantModel.owner_id, RestaurantModel.name).where(RestaurantModel.id == restaurant_id)
+    )
+    restaurant = result.first()
+    if not restaurant:
+        raise HTTPException(status_code=404, detail="Restaurant not found")
+
+    new_review = (await db.execute(review_insert_statement(db, restaurant_id, current_user.id, review))).first()
+    if new_review is None:
+        await db.rollback()
+        raise HTTPException(status_code=400, detail="You have already reviewed this restaurant")
+
+    await db.run_sync(apply_review_rating, restaurant_id, review.rating)
+    notification = (await db.execute(
+        notification_insert_statement(restaurant_id, current_user.id, review, current_user.username)
+    )).first()
+    await db.commit()
+
+    invalidate_restaurant(restaurant_id)
+    background_tasks.submit(
+        publish_notification, restaurant.owner_id, notification_event(notification, restaurant.name, current_user.username)
+    )
+
+    return new_review._asdict()
+
+
+@router.delete('/restaurants/{restaurant_id}/reviews/{review_id}')
+async def delete_review(
+    restaurant_id: int,
+    review_id: int,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: Principal = Depends(get_current_principal_async)
+):
+    """Delete a review - only the review author or admin can delete"""
+    result = await db.execute(select(ReviewModel).where(
+        ReviewModel.id == review_id,
+        ReviewModel.restaurant_id == restaurant_id
+    ))
+    review = result.scalars().first()
+
+    if not review:
+        raise HTTPException(status_code=404, detail="Review not found")
+
+    if review.user_id != current_user.id and current_user.role != RoleEnum.admin:
+        raise HTTPException(status_code=403, detail="Permission Denied")
+
+    await db.delete(review)
+    await db.run_sync(apply_review_rating, restaurant_id, review.rating, -1)
+    await db.commit()
+    invalidate_restaurant(restaurant_id)
+
+    return {"message": "Review deleted successfully"}
+
+
+@router.get("/restaurants/{restaurant_id}/favorite")
+async def check_favorite(
+    restaurant_id: int,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: Principal = Depends(get_current_principal_async)
+):
+    """Check if restaurant is marked as favorite"""
+    favorite = await _get_favorite(db, current_user.id, restaurant_id)
+
+    return {"is_favorite": favorite is not None}
+
+
+@router.post('/restaurants/{restaurant_id}/favorite', response_model=FavoriteSchema)
+async def add_favorite(
+    restaurant_id: int,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: Principal = Depends(get_current_principal_async)
+):
+    """Add restaurant to favorites"""
+    await _get_restaurant_or_404(db, restaurant_id)
+
+    if await _get_favorite(db, current_user.id, restaurant_id):
+        raise HTTPException(status_code=400, detail="Restaurant already in favorites")
+
+    new_favorite = FavoriteModel(user_id=current_user.id, restaurant_id=restaurant_id)
+    db.add(new_favorite)
+    await db.commit()
+    await db.refresh(new_favorite)
+
+    return new_favorite
+
+
+@router.delete('/restaurants/{restaurant_id}/favorite')
+async def remove_favorite(
+    restaurant_id: int,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: Principal = Depends(get_current_principal_async)
+):
+    """Remove restaurant from favorites"""
+    favorite = await _get_favorite(db, current_user.id, restaurant_id)
+
+    if not favorite:
+        raise HTTPException(status_code=404, detail="Favorite not found")
+
+    await db.delete(favorite)
+    await db.commit()
+
+    return {"message": "Restaurant removed from favorites"}
+
+
+@router.post("/favorites/status", response_model=FavoriteStatusSchema)
+async def get_favorite_status(
+    data: FavoriteStatusRequestSchema,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: Principal = Depends(get_current_principal_async)
+):
+    """Check many restaurants at once: a map of restaurant id to whether it is a favorite"""
+    result = await db.execute(favorite_ids_statement(current_user.id, set(data.restaurant_ids)))
+    favorited = set(result.scalars())
+    return {"favorites": {restaurant_id: restaurant_id in favorited for restaurant_id in data.restaurant_ids}}
+
+
+@router.get("/favorites", response_model=Union[List[FavoriteSchema], FavoritePageSchema])
+async def get_my_favorites(
+    expand: bool = Query(False, description="Page through favorites with their restaurants and categories"),
+    limit: int = Query(20, ge=1, le=100),
+    cursor: Optional[str] = None,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: Principal = Depends(get_current_principal_async)
+):
+    """Get all favorite restaurants for current user.
+
+    With expand, get a newest-first page of favorites, each with its
+    restaurant and categories, continuing from an opaque cursor.
+    """
+    if expand:
+        result = await db.execute(favorites_page_statement(current_user.id, limit, cursor))
+        return favorites_page(result.all(), limit)
+
+    result = await db.execute(select(FavoriteModel).where(FavoriteModel.user_id == current_user.id))
+    return result.scalars().all()
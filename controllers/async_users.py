@@ -0,0 +1,66 @@
+
+from fastapi import APIRouter, Depends, HTTPException
+from sqlalchemy import select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+from models.user import UserModel, RoleEnum
+from serializers.user import UserRegistrationSchema, UserLoginSchema, UserTokenSchema
+from database import get_async_db
+from utils.passwords import hash_password_async, verify_password_async
+
+router = APIRouter()
+
+@router.post("/register", response_model=UserTokenSchema)
+async def create_user(user: UserRegistrationSchema, db: AsyncSession = Depends(get_async_db)):
+    # Check if the username or email already exists
+    result = await db.execute(select(UserModel.id).where(
+        (UserModel.username == user.username) | (UserModel.email == user.email)
+    ))
+
+    if result.first():
+        raise HTTPException(status_code=409, detail="Username or email already exists")
+
+    # Map role string to RoleEnum
+    role_enum = RoleEnum.user if user.role == "user" else RoleEnum.restaurant_owner
+
+    new_user = UserModel(username=user.username, email=user.email, role=role_enum)
+    # Hash in the bcrypt pool without holding the event loop or a connection
+    await db.close()
+    new_user.password_hash = await hash_password_async(user.password)
+
+    db.add(new_user)
+    await db.commit()
+    await db.refresh(new_user)
+
+    # Generate JWT token
+    token = new_user.generate_token()
+
+    # Return token and a success message
+    return {"token": token, "message": "Registration successful"}
+
+@router.post("/login", response_model=UserTokenSchema)
+async def login(user: UserLoginSchema, db: AsyncSession = Depends(get_async_db)):
+
+    # Find the user by username
+    result = await db.execute(select(UserModel).where(UserModel.username == user.username))
+    db_user = result.scalars().first()
+
+    if not db_user:
+        raise HTTPException(status_code=400, detail="Invalid username or password")
+
+    # Release the connection while bcrypt runs; db_user stays loaded, detached
+    await db.close()
+
+    # Check the password, upgrading the stored hash if the bcrypt cost changed
+    is_valid, new_hash = await verify_password_async(user.password, db_user.password_hash)
+    if not is_valid:
+        raise HTTPException(status_code=400, detail="Invalid username or password")
+
+    if new_hash:
+        await db.execute(update(UserModel).where(UserModel.id == db_user.id).values(password_hash=new_hash))
+        await db.commit()
+
+    # Generate JWT token
+    token = db_user.generate_token()
+
+    # Return token and a success message
+    return {"token": token, "message": "Login successful"}
@@ -0,0 +1,99 @@
+import csv
+import io
+import json
+from datetime import datetime
+from typing import Literal, Optional
+
+from fastapi import APIRouter, Depends, HTTPException
+from fastapi.responses import StreamingResponse
+from sqlalchemy import select
+
+from models.restaurant import RestaurantModel
+from models.review import ReviewModel
+from models.user import RoleEnum
+from database import engine
+from dependencies.get_current_user import get_current_principal, Principal
+from utils.pagination import timestamp_key
+
+router = APIRouter(tags=["export"])
+
+# Rows fetched per round-trip from the server-side cursor
+EXPORT_BATCH_SIZE = 1000
+
+EXPORTS = {
+    "reviews": (
+        ReviewModel,
+        [ReviewModel.id, ReviewModel.restaurant_id, ReviewModel.user_id, ReviewModel.rating,
+         ReviewModel.comment, ReviewModel.created_at],
+    ),
+    "restaurants": (
+        RestaurantModel,
+        [RestaurantModel.id, RestaurantModel.name, RestaurantModel.description, RestaurantModel.location,
+         RestaurantModel.latitude, RestaurantModel.longitude, RestaurantModel.image_url, RestaurantModel.owner_id,
+         RestaurantModel.created_at, RestaurantModel.review_count, RestaurantModel.rating_sum, RestaurantModel.avg_rating],
+    ),
+}
+
+MEDIA_TYPES = {"ndjson": "application/x-ndjson", "csv": "text/csv"}
+
+
+def _encode_value(value):
+    return value.isoformat() if isinstance(value, datetime) else value
+
+
+def stream_rows(statement, columns, fmt: str):
+    """Yield encoded chunks one cursor batch at a time, so memory stays flat whatever the row count"""
+    names = [column.key for column in columns]
+
+    with engine.connect() as connection:
+        result = connection.execution_options(yield_per=EXPORT_BATCH_SIZE).execute(statement)
+
+        if fmt == "csv":
+            buffer = io.StringIO()
+            writer = csv.writer(buffer)
+            writer.writerow(names)
+            for partition in result.partitions():
+                writer.writerows([_encode_value(value) for value in row] for row in partition)
+                yield buffer.getvalue()
+                buffer.seek(0)
+                buffer.truncate()
+            if buffer.tell():
+                yield buffer.getvalue()
+        else:
+            for partition in result.partitions():
+                yield "".join(
+                    json.dumps(dict(zip(names, map(_encode_value, row)))) + "\n" for row in partition
+                )
+
+
+@router.get("/export/{kind}")
+def export(
+    kind: Literal["reviews", "restaurants"],
+    format: Literal["ndjson", "csv"] = "ndjson",
+    since: Optional[datetime] = None,
+    restaurant_id: Optional[int] = None,
+    current_user: Principal = Depends(get_current_principal)
+):
+    """Stream every review or restaurant as NDJSON/CSV, oldest first - admin only.
+
+    since (inclusive, on created_at) allows incremental pulls; rows are
+    ordered by (created_at, id) so consumers can dedupe the boundary by id.
+    """
+    if current_user.role != RoleEnum.admin:
+        raise HTTPException(status_code=403, detail="Only admins can export data")
+
+    model, columns = EXPORTS[kind]
+    statement = select(*columns).order_by(model.created_at, model.id)
+    if since is not None:
+        # Bound in the stored format: SQLite compares DATETIME as text
+        statement = statement.where(timestamp_key(model.created_at) >= since)
+    if restaurant_id is not None:
+        if kind != "reviews":
+            raise HTTPException(status_code=400, detail="restaurant_id only applies to review exports")
+        statement = statement.where(ReviewModel.restaurant_id == restaurant_id)
+
+    return StreamingResponse(
+        stream_rows(statement, columns, format),
+        media_type=MEDIA_TYPES[format],
+        headers={"Content-Disposition": f'attachment; filename="{kind}.{format}"'},
+    )
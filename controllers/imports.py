@@ -0,0 +1,71 @@
+import codecs
+import time
+from typing import Literal
+
+import anyio
+from anyio.from_thread import run as run_from_thread
+from fastapi import APIRouter, Depends, HTTPException, Request
+from fastapi.concurrency import run_in_threadpool
+
+from models.user import RoleEnum
+from database import SessionLocal
+from dependencies.get_current_user import get_current_principal, Principal
+from utils.bulk_import import StreamImporter
+
+router = APIRouter(tags=["import"])
+
+# Decoded body chunks read ahead of the importer before the upload is paused
+BODY_CHUNKS_BUFFERED = 16
+
+
+def _body_lines(receive):
+    """Lines, with their line endings, from the text chunks the event loop sends; runs in the threadpool"""
+    buffer = ""
+    while True:
+        try:
+            buffer += run_from_thread(receive.receive)
+        except anyio.EndOfStream:
+            break
+        *lines, buffer = buffer.split("\n")
+        for line in lines:
+            yield line + "\n"
+    if buffer:
+        yield buffer
+
+
+@router.post("/import/{kind}")
+async def bulk_import(
+    kind: Literal["restaurants", "categories", "reviews"],
+    request: Request,
+    format: Literal["ndjson", "csv"] = "ndjson",
+    current_user: Principal = Depends(get_current_principal)
+):
+    """Stream CSV/NDJSON rows into the catalog in batches - restaurants: owner or admin, otherwise admin only"""
+    is_admin = current_user.role == RoleEnum.admin
+    if kind != "restaurants" and not is_admin:
+        raise HTTPException(status_code=403, detail="Only admins can import categories or reviews")
+    if kind == "restaurants" and current_user.role not in [RoleEnum.restaurant_owner, RoleEnum.admin]:
+        raise HTTPException(status_code=403, detail="Only restaurant owners or admins can import restaurants")
+
+    importer = StreamImporter(kind, format, owner_id=current_user.id, allow_owner_override=is_admin)
+    send, receive = anyio.create_memory_object_stream(max_buffer_size=BODY_CHUNKS_BUFFERED)
+    start = time.perf_counter()
+
+    async def read_body():
+        decoder = codecs.getincrementaldecoder("utf-8")(errors="replace")
+        async with send:
+            async for chunk in request.stream():
+                await send.send(decoder.decode(chunk))
+            await send.send(decoder.decode(b"", final=True))
+
+    # The body is read as it arrives while the threadpool parses it, as one stream, and writes each full batch
+    db = SessionLocal()
+    try:
+        async with anyio.create_task_group() as tasks:
+            tasks.start_soon(read_body)
+            report = await run_in_threadpool(importer.run, db, _body_lines(receive))
+    finally:
+        db.close()
+
+    elapsed = time.perf_counter() - start
+    return {**report.as_dict(), "seconds": round(elapsed, 3), "rows_per_second": round(report.rows / elapsed, 1) if elapsed else None}
@@ -0,0 +1,114 @@
+import asyncio
+import json
+from typing import Optional
+
+from fastapi import APIRouter, Depends, Header, HTTPException, Query, Request, status
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import StreamingResponse
+from fastapi.security import HTTPAuthorizationCredentials
+
+from serializers.notification import NotificationSchema
+
+from config.environment import stateless_auth, notification_keepalive, notification_replay_limit
+from database import SessionLocal
+from dependencies.get_current_user import decode_token, get_current_user, _principal_from_claims, Principal
+from controllers.notifications import notifications_after_statement
+from utils.pubsub import get_broker, owner_channel
+
+router = APIRouter(tags=["notifications"])
+
+
+def _load_principal(payload: dict) -> Principal:
+    # A short-lived session: the stream itself must not hold a pooled connection
+    db = SessionLocal()
+    try:
+        user = get_current_user(db, payload)
+        return Principal(id=user.id, username=user.username, role=user.role)
+    finally:
+        db.close()
+
+
+async def get_stream_principal(
+    request: Request,
+    token: Optional[str] = Query(None, description="JWT, for clients such as EventSource that cannot send headers")
+):
+    """Authenticate with the usual Bearer header or, failing that, a ?token= query parameter"""
+    if token is None:
+        scheme, _, credentials = request.headers.get("authorization", "").partition(" ")
+        if scheme.lower() == "bearer" and credentials:
+            token = credentials
+    if not token:
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Not authenticated")
+
+    payload = decode_token(HTTPAuthorizationCredentials(scheme="Bearer", credentials=token))
+    if stateless_auth:
+        return _principal_from_claims(payload)
+    return await run_in_threadpool(_load_principal, payload)
+
+
+def _missed_notifications(owner_id: int, last_id: int):
+    db = SessionLocal()
+    try:
+        rows = db.execute(notifications_after_statement(owner_id, last_id, notification_replay_limit + 1)).all()
+        # Oldest first, to be sent in order
+        return [NotificationSchema.model_validate(row).model_dump(mode="json") for row in reversed(rows)]
+    finally:
+        db.close()
+
+
+def _event(notification: dict) -> str:
+    return f"id: {notification['id']}\nevent: notification\ndata: {json.dumps(notification)}\n\n"
+
+
+async def _notification_events(owner_id: int, last_event_id: Optional[int]):
+    # Subscribe before replaying so nothing committed in between is lost; ids dedupe the overlap
+    subscription = get_broker().subscribe(owner_channel(owner_id))
+    try:
+        yield "retry: 3000\n\n"
+        last_sent = last_event_id
+
+        if last_event_id is not None:
+            missed = await run_in_threadpool(_missed_notifications, owner_id, last_event_id)
+            if len(missed) > notification_replay_limit:
+                # Too far behind to replay everything; the client should reload the notifications
+                # list, and gets the newest notification_replay_limit of them pushed after the reset
+                yield "event: reset\ndata: {}\n\n"
+                missed = missed[-notification_replay_limit:]
+            for notification in missed:
+                yield _event(notification)
+                last_sent = notification["id"]
+
+        while True:
+            try:
+                notification = await asyncio.wait_for(subscription.get(), timeout=notification_keepalive)
+            except asyncio.TimeoutError:
+                yield ": keep-alive\n\n"
+                continue
+            if notification is None:
+                # Fell too far behind; end the stream so the client resumes from its last id
+                return
+            if last_sent is not None and notification["id"] <= last_sent:
+                continue
+            yield _event(notification)
+            last_sent = notification["id"]
+    finally:
+        subscription.close()
+
+
+@router.get("/stream")
+async def stream_notifications(
+    after: Optional[int] = Query(None, description="Resume after this notification id"),
+    last_event_id: Optional[int] = Header(None, alias="Last-Event-ID"),
+    current_user: Principal = Depends(get_stream_principal)
+):
+    """Server-Sent Events stream of new notifications for the current owner's restaurants.
+
+    Reconnecting with Last-Event-ID (sent automatically by EventSource) or
+    ?after= replays only what was missed.
+    """
+    resume_from = last_event_id if last_event_id is not None else after
+    return StreamingResponse(
+        _notification_events(current_user.id, resume_from),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
@@ -1,45 +1,102 @@
-from fastapi import APIRouter, Depends
-from typing import List
+from fastapi import APIRouter, Depends, HTTPException, Query
+from typing import Optional
+from sqlalchemy import select
 from sqlalchemy.orm import Session
 
 from models.restaurant import RestaurantModel
 from models.notification import NotificationModel
 from models.user import UserModel
 
-from serializers.notification import NotificationSchema
+from serializers.notification import NotificationSchema, NotificationPageSchema
 
 from database import get_db
-from dependencies.get_current_user import get_current_user
+from dependencies.get_current_user import get_current_principal, Principal
+from utils.pagination import encode_cursor, decode_cursor, keyset_after, timestamp_key, timestamp_cursor_value, cursor_id
 
 router = APIRouter(tags=["notifications"]) 
 
-@router.get("/", response_model=List[dict])
-def get_notifications(current_user: UserModel = Depends(get_current_user), db: Session = Depends(get_db)):
-    owner_restaurants = db.query(RestaurantModel).filter(RestaurantModel.owner_id == current_user.id).all()
-    if not owner_restaurants:
-        return []
-    restaurant_ids = [r.id for r in owner_restaurants]
-
-    notifications = (
-        db.query(NotificationModel)
-        .filter(NotificationModel.restaurant_id.in_(restaurant_ids))
-        .order_by(NotificationModel.created_at.desc())
-        .all()
+def notifications_statement(owner_id):
+    """An owner's notifications joined with restaurant and reviewer names, as NotificationSchema rows"""
+    return (
+        select(
+            NotificationModel.id,
+            NotificationModel.restaurant_id,
+            RestaurantModel.name.label("restaurant_name"),
+            UserModel.username.label("user_name"),
+            NotificationModel.rating,
+            NotificationModel.message,
+            NotificationModel.created_at,
+            NotificationModel.read,
+        )
+        .join(RestaurantModel, RestaurantModel.id == NotificationModel.restaurant_id)
+        .join(UserModel, UserModel.id == NotificationModel.user_id)
+        .where(RestaurantModel.owner_id == owner_id)
     )
 
-    result = []
-    for n in notifications:
-        restaurant = next((r for r in owner_restaurants if r.id == n.restaurant_id), None)
-        user = db.query(UserModel).filter(UserModel.id == n.user_id).first()
-        result.append({
-            "id": n.id,
-            "restaurant_id": n.restaurant_id,
-            "restaurant_name": restaurant.name if restaurant else "",
-            "user_name": user.username if user else "",
-            "rating": n.rating,
-            "message": n.message,
-            "created_at": n.created_at.isoformat() if n.created_at else None,
-            "read": n.read,
-        })
-
-    return result
+
+def notifications_page_statement(owner_id, limit, cursor, read):
+    """One joined SELECT for a page of an owner's notifications and their sort keys (shared with the async router)"""
+    sort_key = timestamp_key(NotificationModel.created_at)
+    statement = notifications_statement(owner_id).add_columns(sort_key.label("sort_key"))
+
+    if read is not None:
+        statement = statement.where(NotificationModel.read == read)
+
+    if cursor:
+        values = decode_cursor(cursor)
+        if len(values) != 2:
+            raise HTTPException(status_code=400, detail="Invalid cursor")
+        created_at, last_id = timestamp_cursor_value(values[0]), cursor_id(values[1])
+        statement = statement.where(keyset_after(sort_key, NotificationModel.id, created_at, last_id, descending=True))
+
+    return (
+        statement.order_by(NotificationModel.created_at.desc(), NotificationModel.id.desc())
+        .limit(limit + 1)
+    )
+
+
+def notifications_after_statement(owner_id, last_id, limit):
+    """The newest limit notifications after last_id, newest first, for resuming a push stream"""
+    return (
+        notifications_statement(owner_id)
+        .where(NotificationModel.id > last_id)
+        .order_by(NotificationModel.id.desc())
+        .limit(limit)
+    )
+
+
+def notification_event(notification, restaurant_name, user_name):
+    """A committed NotificationModel as the JSON-ready payload pushed to the owner's stream"""
+    return NotificationSchema(
+        id=notification.id,
+        restaurant_id=notification.restaurant_id,
+        restaurant_name=restaurant_name,
+        user_name=user_name,
+        rating=notification.rating,
+        message=notification.message,
+        created_at=notification.created_at,
+        read=notification.read,
+    ).model_dump(mode="json")
+
+
+def notifications_page(rows, limit):
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        next_cursor = encode_cursor([rows[-1].sort_key, rows[-1].id])
+
+    return {"items": rows, "next_cursor": next_cursor}
+
+
+@router.get("/", response_model=NotificationPageSchema)
+def get_notifications(
+    limit: int = Query(20, ge=1, le=100),
+    cursor: Optional[str] = None,
+    read: Optional[bool] = None,
+    current_user: Principal = Depends(get_current_principal),
+    db: Session = Depends(get_db)
+):
+    """Newest-first page of notifications for the current owner's restaurants, in one joined query"""
+    statement = notifications_page_statement(current_user.id, limit, cursor, read)
+    rows = db.execute(statement).all()
+    return notifications_page(rows, limit)
@@ -1,82 +1,316 @@
-from fastapi import APIRouter, Depends, HTTPException
-from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, Depends, HTTPException, Query, Request
+from fastapi.security import HTTPBearer
+from sqlalchemy import func, insert, select, union
+from sqlalchemy.orm import Session, joinedload, selectinload
 from models.restaurant import RestaurantModel
 from models.review import ReviewModel
 from models.favorite import FavoriteModel
 from models.notification import NotificationModel
 from models.category import CategoryModel
-from models.user import UserModel, RoleEnum
+from models.recommendation import RestaurantSimilarityModel
+from models.user import RoleEnum
 # Serializers
-from serializers.restaurant import RestaurantSchema, RestaurantCreateSchema, RestaurantUpdateSchema, RestaurantDetailSchema, CategorySchema
+from serializers.restaurant import RestaurantSchema, RestaurantCreateSchema, RestaurantUpdateSchema, RestaurantDetailSchema, RestaurantPageSchema, RestaurantBatchSchema, RestaurantNearbySchema, RestaurantRecommendationSchema, CategorySchema
 from serializers.review import ReviewSchema, ReviewCreateSchema
-from serializers.favorite import FavoriteSchema
-from typing import List
+from serializers.favorite import FavoriteSchema, FavoritePageSchema, FavoriteStatusRequestSchema, FavoriteStatusSchema
+from typing import List, Literal, Optional, Union
 # Database Connection
 from database import get_db
 # Middleware
-from dependencies.get_current_user import get_current_user
+from dependencies.get_current_user import get_current_principal, Principal
+# Rating aggregates
+from utils.ratings import apply_review_rating
+# Nearby
+from utils.geo import find_nearby, geohash_for
+# Search
+from utils.search import search_restaurants, refresh_search_document, index_restaurant, unindex_restaurant
+# Response cache
+from utils.response_cache import response_cache, cache_key, render, json_response, restaurant_tags, invalidate_restaurant
+# Category filters and facets
+from utils.facets import category_filter, facets_statement, facet_counts, facets_cache_key, get_cached_facets, cache_facets
+# Sparse fieldsets
+from utils.fieldsets import parse_fields, restaurant_columns, category_restaurants_statement, project_restaurant, fieldset_schemas
+# Pagination
+from utils.pagination import encode_cursor, decode_cursor, keyset_after, timestamp_key, timestamp_cursor_value, cursor_id, typed_cursor_value
+# Notification push
+from utils.pubsub import publish_notification
+from utils.tasks import background_tasks
+from utils.sql import dialect_insert
+from controllers.notifications import notification_event
 
 security = HTTPBearer()
 
 router = APIRouter()
 
-@router.get("/restaurants", response_model=List[RestaurantSchema])
-def get_restaurants(db: Session = Depends(get_db)):
-    """Get all restaurants"""
-    restaurants = db.query(RestaurantModel).all()
-    return restaurants
+# Most ids one GET /restaurants?ids= call may fetch
+MAX_BATCH_IDS = 100
+
+
+def restaurant_filters(location, owner_id, category, match="any"):
+    """WHERE clauses shared by the listing, its facets and the async router"""
+    clauses = []
+    if location is not None:
+        clauses.append(RestaurantModel.location == location)
+    if owner_id is not None:
+        clauses.append(RestaurantModel.owner_id == owner_id)
+    if category:
+        clauses.append(category_filter(category, match))
+    return clauses
+
+
+def restaurants_page_statement(limit, cursor, sort, order, filters, fields=None):
+    """SELECT for one page of restaurants plus each row's sort key (shared with the async router).
+
+    With fields, only the columns behind them are selected, as plain rows.
+    """
+    columns = restaurant_columns(fields) if fields else [RestaurantModel]
+    statement = select(*columns).where(*filters)
+
+    sort_column = RestaurantModel.avg_rating if sort == "rating" else getattr(RestaurantModel, sort)
+    # created_at cursors hold the stored value, compared without reformatting (see CursorTimestamp)
+    key_column = timestamp_key(sort_column) if sort == "created_at" else sort_column
+
+    descending = order == "desc"
+
+    if cursor:
+        values = decode_cursor(cursor)
+        if len(values) != 4 or values[:2] != [sort, order]:
+            raise HTTPException(status_code=400, detail="Cursor does not match sort order")
+        value, last_id = values[2], cursor_id(values[3])
+        if sort == "created_at":
+            value = timestamp_cursor_value(value)
+        elif sort == "name":
+            value = typed_cursor_value(value, str)
+        else:
+            # avg_rating is NOT NULL, so None never comes from a real page
+            value = typed_cursor_value(value, int, float)
+        statement = statement.where(keyset_after(key_column, RestaurantModel.id, value, last_id, descending))
+
+    if descending:
+        statement = statement.order_by(sort_column.desc(), RestaurantModel.id.desc())
+    else:
+        statement = statement.order_by(sort_column.asc(), RestaurantModel.id.asc())
+
+    return statement.add_columns(key_column.label("sort_key")).limit(limit + 1)
+
+
+def restaurants_page(rows, limit, sort, order, fields=None):
+    """Trim the look-ahead row and build the next cursor from the last row kept"""
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        last_id = rows[-1].id if fields else rows[-1][0].id
+        next_cursor = encode_cursor([sort, order, rows[-1].sort_key, last_id])
+
+    if fields:
+        return {"items": [project_restaurant(row, fields) for row in rows], "next_cursor": next_cursor}
+    return {"items": [restaurant for restaurant, _ in rows], "next_cursor": next_cursor}
+
+
+def parse_ids(ids: str):
+    """Distinct ids from a comma-separated list, in the order given"""
+    try:
+        values = list(dict.fromkeys(int(value) for value in ids.split(",") if value.strip()))
+    except ValueError:
+        raise HTTPException(status_code=400, detail="ids must be comma-separated integers")
+    if not values or len(values) > MAX_BATCH_IDS:
+        raise HTTPException(status_code=400, detail=f"ids must list between 1 and {MAX_BATCH_IDS} restaurants")
+    return values
+
+
+def restaurants_by_ids_statement(ids):
+    """The restaurants with these ids and, in one more query, all of their categories"""
+    return select(RestaurantModel).where(RestaurantModel.id.in_(ids)).options(selectinload(RestaurantModel.categories))
+
+
+def restaurants_batch(restaurants, ids):
+    """RestaurantBatchSchema data in request order, and the cache tags it depends on"""
+    found = {restaurant.id: restaurant for restaurant in restaurants}
+    items = [found[restaurant_id] for restaurant_id in ids if restaurant_id in found]
+    batch = {"items": items, "missing": [restaurant_id for restaurant_id in ids if restaurant_id not in found]}
+    category_tags = {f"category:{category.id}" for restaurant in items for category in restaurant.categories}
+    # "restaurants" also covers a missing id being created later
+    return batch, ["restaurants", *restaurant_tags(items), *category_tags]
+
+
+@router.get("/restaurants", response_model=Union[RestaurantPageSchema, RestaurantBatchSchema])
+def get_restaurants(
+    request: Request,
+    limit: int = Query(20, ge=1, le=100),
+    cursor: Optional[str] = None,
+    sort: Literal["created_at", "name", "rating"] = "created_at",
+    order: Literal["asc", "desc"] = "desc",
+    location: Optional[str] = None,
+    owner_id: Optional[int] = None,
+    category: Optional[List[int]] = Query(None),
+    match: Literal["any", "all"] = Query("any", description="Restaurants in any (OR) or all (AND) of the categories"),
+    facets: bool = Query(False, description="Include counts by category, rating bucket and location"),
+    ids: Optional[str] = Query(None, description="Comma-separated ids: fetch these restaurants with their categories instead of a page"),
+    fields: Optional[str] = Query(None, description="Comma-separated fields to return, e.g. id,name,location; only their columns are read"),
+    db: Session = Depends(get_db)
+):
+    """Get a page of restaurants, filtered and sorted, continuing from an opaque cursor.
+
+    With ids, get those restaurants (in the order given) with their
+    categories instead; ids that do not exist are listed in missing.
+    """
+    key = cache_key(request)
+    body = response_cache.get(key)
+    if body is not None:
+        return json_response(body, hit=True)
+
+    if ids is not None:
+        restaurant_ids = parse_ids(ids)
+        restaurants = db.execute(restaurants_by_ids_statement(restaurant_ids)).scalars().all()
+        batch, tags = restaurants_batch(restaurants, restaurant_ids)
+        body = render(RestaurantBatchSchema, batch)
+        response_cache.set(key, body, tags)
+        return json_response(body, hit=False)
+
+    fields = parse_fields(fields)
+    filters = restaurant_filters(location, owner_id, category, match)
+    statement = restaurants_page_statement(limit, cursor, sort, order, filters, fields)
+    rows = db.execute(statement).all()
+    page = restaurants_page(rows, limit, sort, order, fields)
+
+    tags = ["restaurants", *restaurant_tags(page["items"])]
+    if facets:
+        facets_key = facets_cache_key(location, owner_id, category, match)
+        page["facets"] = get_cached_facets(facets_key)
+        if page["facets"] is None:
+            page["facets"] = facet_counts(db.execute(facets_statement(filters)).all())
+            cache_facets(facets_key, page["facets"])
+        tags.append("categories")
+
+    body = render(fieldset_schemas(fields)[1] if fields else RestaurantPageSchema, page)
+    response_cache.set(key, body, tags)
+    return json_response(body, hit=False)
+
+
+def nearby_response(nearby):
+    """RestaurantNearbySchema rows from find_nearby's (restaurant, distance_km) pairs"""
+    return [
+        {**RestaurantSchema.model_validate(restaurant).model_dump(), "distance_km": round(distance, 3)}
+        for restaurant, distance in nearby
+    ]
 
 
 @router.get("/categories", response_model=List[CategorySchema])
-def get_categories(db: Session = Depends(get_db)):
+def get_categories(request: Request, db: Session = Depends(get_db)):
     """Get all available categories"""
+    key = cache_key(request)
+    body = response_cache.get(key)
+    if body is not None:
+        return json_response(body, hit=True)
+
     categories = db.query(CategoryModel).all()
-    return categories
+
+    body = render(List[CategorySchema], categories)
+    response_cache.set(key, body, ["categories"])
+    return json_response(body, hit=False)
 
 
 @router.get("/categories/{category_id}/restaurants", response_model=List[RestaurantSchema])
-def get_restaurants_by_category(category_id: int, db: Session = Depends(get_db)):
+def get_restaurants_by_category(
+    category_id: int,
+    request: Request,
+    fields: Optional[str] = Query(None, description="Comma-separated fields to return, e.g. id,name,location; only their columns are read"),
+    db: Session = Depends(get_db)
+):
     """Get all restaurants for a specific category"""
+    key = cache_key(request)
+    body = response_cache.get(key)
+    if body is not None:
+        return json_response(body, hit=True)
+
+    fields = parse_fields(fields)
     category = db.query(CategoryModel).filter(CategoryModel.id == category_id).first()
     if not category:
         raise HTTPException(status_code=404, detail="Category not found")
 
-    # The relationship on CategoryModel returns associated restaurants
-    return category.restaurants
+    if fields:
+        rows = db.execute(category_restaurants_statement(category_id, fields)).all()
+        restaurants = [project_restaurant(row, fields) for row in rows]
+        body = render(List[fieldset_schemas(fields)[0]], restaurants)
+    else:
+        # The relationship on CategoryModel returns associated restaurants
+        restaurants = category.restaurants
+        body = render(List[RestaurantSchema], restaurants)
+
+    response_cache.set(key, body, [f"category:{category_id}", *restaurant_tags(restaurants)])
+    return json_response(body, hit=False)
+
+
+@router.get("/restaurants/search", response_model=List[RestaurantSchema])
+def search(
+    q: str = Query(..., min_length=1),
+    limit: int = Query(20, ge=1, le=100),
+    db: Session = Depends(get_db)
+):
+    """Full-text search over name, description, location and categories, ranked by relevance"""
+    return search_restaurants(db, q, limit)
+
+
+@router.get("/restaurants/nearby", response_model=List[RestaurantNearbySchema])
+def get_nearby_restaurants(
+    lat: float = Query(..., ge=-90, le=90),
+    lng: float = Query(..., ge=-180, le=180),
+    radius: float = Query(2, gt=0, le=50, description="Search radius in kilometres"),
+    limit: int = Query(20, ge=1, le=100),
+    category: Optional[List[int]] = Query(None),
+    db: Session = Depends(get_db)
+):
+    """Restaurants within radius km of a point, closest first, optionally limited to any of the given categories"""
+    return nearby_response(find_nearby(db, lat, lng, radius, limit, category))
 
 
 @router.get("/restaurants/{restaurant_id}", response_model=RestaurantDetailSchema)
-def get_single_restaurant(restaurant_id: int, db: Session = Depends(get_db)):
+def get_single_restaurant(restaurant_id: int, request: Request, db: Session = Depends(get_db)):
     """Get a single restaurant with details"""
+    key = cache_key(request)
+    body = response_cache.get(key)
+    if body is not None:
+        return json_response(body, hit=True)
+
     restaurant = db.query(RestaurantModel).filter(RestaurantModel.id == restaurant_id).first()
 
     if not restaurant:
         raise HTTPException(status_code=404, detail="Restaurant not found")
 
-    return restaurant
+    body = render(RestaurantDetailSchema, restaurant)
+    tags = [f"restaurant:{restaurant_id}", *(f"category:{c.id}" for c in restaurant.categories)]
+    response_cache.set(key, body, tags)
+    return json_response(body, hit=False)
 
 
 @router.post('/restaurants', response_model=RestaurantSchema)
 def create_restaurant(
     restaurant: RestaurantCreateSchema,
     db: Session = Depends(get_db),
-    current_user: UserModel = Depends(get_current_user)
+    current_user: Principal = Depends(get_current_principal)
 ):
     """Create a new restaurant - only restaurant_owner or admin"""
     if current_user.role not in [RoleEnum.restaurant_owner, RoleEnum.admin]:
         raise HTTPException(status_code=403, detail="Only restaurant owners or admins can create restaurants")
 
     restaurant_data = restaurant.dict(exclude={'category_ids'})
-    new_restaurant = RestaurantModel(**restaurant_data, owner_id=current_user.id)
-    db.add(new_restaurant)
-    db.commit()
-    db.refresh(new_restaurant)
+    new_restaurant = RestaurantModel(
+        **restaurant_data,
+        owner_id=current_user.id,
+        geohash=geohash_for(restaurant.latitude, restaurant.longitude)
+    )
 
     if restaurant.category_ids:
         categories = db.query(CategoryModel).filter(CategoryModel.id.in_(restaurant.category_ids)).all()
         new_restaurant.categories.extend(categories)
-        db.commit()
+
+    db.add(new_restaurant)
+    db.flush()
+    refresh_search_document(db, new_restaurant.id)
+    db.commit()
+    db.refresh(new_restaurant)
+    index_restaurant(db, new_restaurant)
+    invalidate_restaurant(category_ids=restaurant.category_ids)
 
     return new_restaurant
 
@@ -86,7 +320,7 @@ def update_restaurant(
     restaurant_id: int,
     restaurant: RestaurantUpdateSchema,
     db: Session = Depends(get_db),
-    current_user: UserModel = Depends(get_current_user)
+    current_user: Principal = Depends(get_current_principal)
 ):
     """Update a restaurant - owner or admin only"""
     db_restaurant = db.query(RestaurantModel).filter(RestaurantModel.id == restaurant_id).first()
@@ -102,14 +336,19 @@ def update_restaurant(
     for field, value in update_data.items():
         if value is not None:
             setattr(db_restaurant, field, value)
+    if 'latitude' in update_data or 'longitude' in update_data:
+        db_restaurant.geohash = geohash_for(db_restaurant.latitude, db_restaurant.longitude)
 
     if restaurant.category_ids is not None:
         categories = db.query(CategoryModel).filter(CategoryModel.id.in_(restaurant.category_ids)).all()
         db_restaurant.categories = categories
 
     db.add(db_restaurant)
+    refresh_search_document(db, db_restaurant.id)
     db.commit()
     db.refresh(db_restaurant)
+    index_restaurant(db, db_restaurant)
+    invalidate_restaurant(restaurant_id, category_ids=restaurant.category_ids or ())
 
     return db_restaurant
 
@@ -118,7 +357,7 @@ def update_restaurant(
 def delete_restaurant(
     restaurant_id: int,
     db: Session = Depends(get_db),
-    current_user: UserModel = Depends(get_current_user)
+    current_user: Principal = Depends(get_current_principal)
 ):
     """Delete a restaurant - owner or admin only"""
     db_restaurant = db.query(RestaurantModel).filter(RestaurantModel.id == restaurant_id).first()
@@ -131,6 +370,8 @@ def delete_restaurant(
 
     db.delete(db_restaurant)
     db.commit()
+    unindex_restaurant(db, restaurant_id)
+    invalidate_restaurant(restaurant_id)
 
     return {"message": "Restaurant deleted successfully"}
 
@@ -147,46 +388,143 @@ def get_restaurant_reviews(restaurant_id: int, db: Session = Depends(get_db)):
     return reviews
 
 
+def similar_restaurants_statement(restaurant_id, limit):
+    """Precomputed neighbours of one restaurant, most similar first (shared with the async router)"""
+    return (
+        select(RestaurantModel, RestaurantSimilarityModel.score)
+        .join(RestaurantSimilarityModel, RestaurantSimilarityModel.similar_restaurant_id == RestaurantModel.id)
+        .where(RestaurantSimilarityModel.restaurant_id == restaurant_id)
+        .order_by(RestaurantSimilarityModel.rank)
+        .limit(limit)
+    )
+
+
+def recommendations_statement(user_id, limit):
+    """Neighbours of everything the user favorited or reviewed, scored by summed similarity, excluding those seeds"""
+    seeds = union(
+        select(FavoriteModel.restaurant_id).where(FavoriteModel.user_id == user_id),
+        select(ReviewModel.restaurant_id).where(ReviewModel.user_id == user_id),
+    )
+    scores = (
+        select(
+            RestaurantSimilarityModel.similar_restaurant_id.label("restaurant_id"),
+            func.sum(RestaurantSimilarityModel.score).label("score"),
+        )
+        .where(
+            RestaurantSimilarityModel.restaurant_id.in_(seeds),
+            RestaurantSimilarityModel.similar_restaurant_id.not_in(seeds),
+        )
+        .group_by(RestaurantSimilarityModel.similar_restaurant_id)
+        .subquery()
+    )
+    return (
+        select(RestaurantModel, scores.c.score)
+        .join(scores, scores.c.restaurant_id == RestaurantModel.id)
+        .order_by(scores.c.score.desc(), RestaurantModel.id)
+        .limit(limit)
+    )
+
+
+def scored_response(rows):
+    """RestaurantRecommendationSchema rows from (restaurant, score) pairs"""
+    return [{**RestaurantSchema.model_validate(restaurant).model_dump(), "score": score} for restaurant, score in rows]
+
+
+@router.get("/restaurants/{restaurant_id}/similar", response_model=List[RestaurantRecommendationSchema])
+def get_similar_restaurants(
+    restaurant_id: int,
+    request: Request,
+    limit: int = Query(10, ge=1, le=50),
+    db: Session = Depends(get_db)
+):
+    """Restaurants liked by the same people, read from the table build_recommendations.py maintains"""
+    key = cache_key(request)
+    body = response_cache.get(key)
+    if body is not None:
+        return json_response(body, hit=True)
+
+    rows = db.execute(similar_restaurants_statement(restaurant_id, limit)).all()
+    if not rows and db.get(RestaurantModel, restaurant_id) is None:
+        raise HTTPException(status_code=404, detail="Restaurant not found")
+
+    body = render(List[RestaurantRecommendationSchema], scored_response(rows))
+    response_cache.set(key, body, [f"restaurant:{restaurant_id}", *restaurant_tags(restaurant for restaurant, _ in rows)])
+    return json_response(body, hit=False)
+
+
+@router.get("/recommendations", response_model=List[RestaurantRecommendationSchema])
+def get_recommendations(
+    limit: int = Query(20, ge=1, le=100),
+    db: Session = Depends(get_db),
+    current_user: Principal = Depends(get_current_principal)
+):
+    """Restaurants you may like, from the neighbours of the ones you favorited or reviewed"""
+    return scored_response(db.execute(recommendations_statement(current_user.id, limit)).all())
+
+
+def review_insert_statement(db, restaurant_id, user_id, review):
+    """INSERT returning the new review, or no row when uq_user_restaurant_review says it already exists"""
+    return (
+        dialect_insert(db, ReviewModel.__table__)
+        .values(**review.dict(), user_id=user_id, restaurant_id=restaurant_id)
+        .on_conflict_do_nothing(index_elements=["user_id", "restaurant_id"])
+        .returning(
+            ReviewModel.id, ReviewModel.rating, ReviewModel.comment,
+            ReviewModel.user_id, ReviewModel.restaurant_id, ReviewModel.created_at,
+        )
+    )
+
+
+def notification_insert_statement(restaurant_id, user_id, review, username):
+    """INSERT of the owner's notification for a new review, returning what notification_event needs"""
+    return (
+        insert(NotificationModel.__table__)
+        .values(
+            restaurant_id=restaurant_id,
+            user_id=user_id,
+            rating=review.rating,
+            message=review.comment or f"{username} left a {review.rating}-star review",
+            read=False,
+        )
+        .returning(
+            NotificationModel.id, NotificationModel.restaurant_id, NotificationModel.rating,
+            NotificationModel.message, NotificationModel.created_at, NotificationModel.read,
+        )
+    )
+
+
 @router.post('/restaurants/{restaurant_id}/reviews', response_model=ReviewSchema)
 def create_review(
     restaurant_id: int,
     review: ReviewCreateSchema,
     db: Session = Depends(get_db),
-    current_user: UserModel = Depends(get_current_user)
+    current_user: Principal = Depends(get_current_principal)
 ):
-    """Create a review for a restaurant"""
-    restaurant = db.query(RestaurantModel).filter(RestaurantModel.id == restaurant_id).first()
+    """Create a review for a restaurant.
+
+    The review, the rating aggregates and the owner's notification are
+    written in one transaction; pushing the notification happens afterwards
+    on the background task queue.
+    """
+    restaurant = db.query(RestaurantModel.owner_id, RestaurantModel.name).filter(RestaurantModel.id == restaurant_id).first()
     if not restaurant:
         raise HTTPException(status_code=404, detail="Restaurant not found")
 
-    existing_review = db.query(ReviewModel).filter(
-        ReviewModel.user_id == current_user.id,
-        ReviewModel.restaurant_id == restaurant_id
-    ).first()
-
-    if existing_review:
+    new_review = db.execute(review_insert_statement(db, restaurant_id, current_user.id, review)).first()
+    if new_review is None:
+        db.rollback()
         raise HTTPException(status_code=400, detail="You have already reviewed this restaurant")
 
-    new_review = ReviewModel(
-        **review.dict(),
-        user_id=current_user.id,
-        restaurant_id=restaurant_id
-    )
-    db.add(new_review)
+    apply_review_rating(db, restaurant_id, review.rating)
+    notification = db.execute(notification_insert_statement(restaurant_id, current_user.id, review, current_user.username)).first()
     db.commit()
-    db.refresh(new_review)
-
-    notification = NotificationModel(
-        restaurant_id=restaurant_id,
-        user_id=current_user.id,
-        rating=review.rating,
-        message=review.comment,
-        read=False
+
+    invalidate_restaurant(restaurant_id)
+    background_tasks.submit(
+        publish_notification, restaurant.owner_id, notification_event(notification, restaurant.name, current_user.username)
     )
-    db.add(notification)
-    db.commit()
 
-    return new_review
+    return new_review._asdict()
 
 
 @router.delete('/restaurants/{restaurant_id}/reviews/{review_id}')
@@ -194,7 +532,7 @@ def delete_review(
     restaurant_id: int,
     review_id: int,
     db: Session = Depends(get_db),
-    current_user: UserModel = Depends(get_current_user)
+    current_user: Principal = Depends(get_current_principal)
 ):
     """Delete a review - only the review author or admin can delete"""
     review = db.query(ReviewModel).filter(
@@ -209,7 +547,9 @@ def delete_review(
         raise HTTPException(status_code=403, detail="Permission Denied")
 
     db.delete(review)
+    apply_review_rating(db, restaurant_id, review.rating, delta=-1)
     db.commit()
+    invalidate_restaurant(restaurant_id)
 
     return {"message": "Review deleted successfully"}
 
@@ -218,7 +558,7 @@ def delete_review(
 def check_favorite(
     restaurant_id: int,
     db: Session = Depends(get_db),
-    current_user: UserModel = Depends(get_current_user)
+    current_user: Principal = Depends(get_current_principal)
 ):
     """Check if restaurant is marked as favorite"""
     favorite = db.query(FavoriteModel).filter(
@@ -233,7 +573,7 @@ def check_favorite(
 def add_favorite(
     restaurant_id: int,
     db: Session = Depends(get_db),
-    current_user: UserModel = Depends(get_current_user)
+    current_user: Principal = Depends(get_current_principal)
 ):
     """Add restaurant to favorites"""
     restaurant = db.query(RestaurantModel).filter(RestaurantModel.id == restaurant_id).first()
@@ -260,7 +600,7 @@ def add_favorite(
 def remove_favorite(
     restaurant_id: int,
     db: Session = Depends(get_db),
-    current_user: UserModel = Depends(get_current_user)
+    current_user: Principal = Depends(get_current_principal)
 ):
     """Remove restaurant from favorites"""
     favorite = db.query(FavoriteModel).filter(
@@ -277,11 +617,71 @@ def remove_favorite(
     return {"message": "Restaurant removed from favorites"}
 
 
-@router.get("/favorites", response_model=List[FavoriteSchema])
+def favorite_ids_statement(user_id, restaurant_ids):
+    return select(FavoriteModel.restaurant_id).where(
+        FavoriteModel.user_id == user_id,
+        FavoriteModel.restaurant_id.in_(restaurant_ids)
+    )
+
+
+@router.post("/favorites/status", response_model=FavoriteStatusSchema)
+def get_favorite_status(
+    data: FavoriteStatusRequestSchema,
+    db: Session = Depends(get_db),
+    current_user: Principal = Depends(get_current_principal)
+):
+    """Check many restaurants at once: a map of restaurant id to whether it is a favorite"""
+    favorited = set(db.execute(favorite_ids_statement(current_user.id, set(data.restaurant_ids))).scalars())
+    return {"favorites": {restaurant_id: restaurant_id in favorited for restaurant_id in data.restaurant_ids}}
+
+
+def favorites_page_statement(user_id, limit, cursor):
+    """Newest-first page of a user's favorites and their sort keys, each joined to its restaurant, with the categories in one more query"""
+    sort_key = timestamp_key(FavoriteModel.created_at)
+    statement = (
+        select(FavoriteModel, sort_key.label("sort_key"))
+        .where(FavoriteModel.user_id == user_id)
+        .options(joinedload(FavoriteModel.restaurant).selectinload(RestaurantModel.categories))
+    )
+
+    if cursor:
+        values = decode_cursor(cursor)
+        if len(values) != 2:
+            raise HTTPException(status_code=400, detail="Invalid cursor")
+        created_at, last_id = timestamp_cursor_value(values[0]), cursor_id(values[1])
+        statement = statement.where(keyset_after(sort_key, FavoriteModel.id, created_at, last_id, descending=True))
+
+    return (
+        statement.order_by(FavoriteModel.created_at.desc(), FavoriteModel.id.desc())
+        .limit(limit + 1)
+    )
+
+
+def favorites_page(rows, limit):
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        next_cursor = encode_cursor([rows[-1].sort_key, rows[-1][0].id])
+
+    return {"items": [favorite for favorite, _ in rows], "next_cursor": next_cursor}
+
+
+@router.get("/favorites", response_model=Union[List[FavoriteSchema], FavoritePageSchema])
 def get_my_favorites(
+    expand: bool = Query(False, description="Page through favorites with their restaurants and categories"),
+    limit: int = Query(20, ge=1, le=100),
+    cursor: Optional[str] = None,
     db: Session = Depends(get_db),
-    current_user: UserModel = Depends(get_current_user)
+    current_user: Principal = Depends(get_current_principal)
 ):
-    """Get all favorite restaurants for current user"""
+    """Get all favorite restaurants for current user.
+
+    With expand, get a newest-first page of favorites, each with its
+    restaurant and categories, continuing from an opaque cursor.
+    """
+    if expand:
+        rows = db.execute(favorites_page_statement(current_user.id, limit, cursor)).all()
+        return favorites_page(rows, limit)
+
     favorites = db.query(FavoriteModel).filter(FavoriteModel.user_id == current_user.id).all()
     return favorites
@@ -1,18 +1,25 @@
 
 from fastapi import APIRouter, Depends, HTTPException
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy import update
 from sqlalchemy.orm import Session
 from models.user import UserModel, RoleEnum
 from serializers.user import UserSchema, UserRegistrationSchema, UserLoginSchema, UserTokenSchema
 from database import get_db
+from utils.passwords import hash_password_async, verify_password_async
 
 router = APIRouter()
 
+# Handlers are async so no threadpool thread sits waiting on the bcrypt pool; the
+# blocking database calls are handed to the threadpool one at a time instead, and
+# the session is closed before bcrypt runs so no pooled connection waits on it either
+
 @router.post("/register", response_model=UserTokenSchema)
-def create_user(user: UserRegistrationSchema, db: Session = Depends(get_db)):
+async def create_user(user: UserRegistrationSchema, db: Session = Depends(get_db)):
     # Check if the username or email already exists
-    existing_user = db.query(UserModel).filter(
+    existing_user = await run_in_threadpool(db.query(UserModel).filter(
         (UserModel.username == user.username) | (UserModel.email == user.email)
-    ).first()
+    ).first)
 
     if existing_user:
         raise HTTPException(status_code=409, detail="Username or email already exists")
@@ -21,12 +28,13 @@ def create_user(user: UserRegistrationSchema, db: Session = Depends(get_db)):
     role_enum = RoleEnum.user if user.role == "user" else RoleEnum.restaurant_owner
     
     new_user = UserModel(username=user.username, email=user.email, role=role_enum)
-    # Use the set_password method to hash the password
-    new_user.set_password(user.password)
+    # Hash in the bcrypt pool without holding a thread or a connection
+    await run_in_threadpool(db.close)
+    new_user.password_hash = await hash_password_async(user.password)
 
     db.add(new_user)
-    db.commit()
-    db.refresh(new_user)
+    await run_in_threadpool(db.commit)
+    await run_in_threadpool(db.refresh, new_user)
 
     # Generate JWT token
     token = new_user.generate_token()
@@ -35,17 +43,29 @@ def create_user(user: UserRegistrationSchema, db: Session = Depends(get_db)):
     return {"token": token, "message": "Registration successful"}
 
 @router.post("/login", response_model=UserTokenSchema)
-def login(user: UserLoginSchema, db: Session = Depends(get_db)):
+async def login(user: UserLoginSchema, db: Session = Depends(get_db)):
 
     # Find the user by username
-    db_user = db.query(UserModel).filter(UserModel.username == user.username).first()
+    db_user = await run_in_threadpool(db.query(UserModel).filter(UserModel.username == user.username).first)
 
-    # Check if the user exists and if the password is correct
-    if not db_user or not db_user.verify_password(user.password):
+    if not db_user:
+        raise HTTPException(status_code=400, detail="Invalid username or password")
+
+    # Release the connection while bcrypt runs; db_user stays loaded, detached
+    await run_in_threadpool(db.close)
+
+    # Check the password, upgrading the stored hash if the bcrypt cost changed
+    is_valid, new_hash = await verify_password_async(user.password, db_user.password_hash)
+    if not is_valid:
         raise HTTPException(status_code=400, detail="Invalid username or password")
 
     # Generate JWT token
     token = db_user.generate_token()
 
+    # Persist a rehash made because the bcrypt cost changed
+    if new_hash:
+        await run_in_threadpool(db.execute, update(UserModel).where(UserModel.id == db_user.id).values(password_hash=new_hash))
+        await run_in_threadpool(db.commit)
+
     # Return token and a success message
-    return {"token": token, "message": "Login successful"}
\ No newline at end of file
+    return {"token": token, "message": "Login successful"}
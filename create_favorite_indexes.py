@@ -0,0 +1,12 @@
+"""
+Migration script to add the (user_id, created_at, id) index behind the
+paginated GET /api/favorites?expand=true to an existing database.
+Run with: pipenv run python create_favorite_indexes.py
+"""
+from database import engine
+from models.favorite import FavoriteModel
+
+for index in FavoriteModel.__table__.indexes:
+    index.create(bind=engine, checkfirst=True)
+
+print("OK Favorite indexes created successfully!")
@@ -0,0 +1,11 @@
+"""
+Migration script to add the notification feed index to an existing database.
+Run with: pipenv run python create_notification_indexes.py
+"""
+from database import engine
+from models.notification import NotificationModel
+
+for index in NotificationModel.__table__.indexes:
+    index.create(bind=engine, checkfirst=True)
+
+print("OK Notification indexes created successfully!")
@@ -0,0 +1,14 @@
+"""
+Migration script to create the restaurant_similarities and
+restaurant_similarity_state tables read by the recommendation endpoints.
+Fill them with build_recommendations.py.
+Run with: pipenv run python create_recommendation_tables.py
+"""
+from database import engine
+import models  # noqa: F401
+from models.recommendation import RestaurantSimilarityModel, RestaurantSimilarityStateModel
+
+RestaurantSimilarityModel.__table__.create(bind=engine, checkfirst=True)
+RestaurantSimilarityStateModel.__table__.create(bind=engine, checkfirst=True)
+
+print("OK Recommendation tables created successfully!")
@@ -0,0 +1,21 @@
+"""
+Migration script to add the restaurant listing indexes to an existing database.
+Run with: pipenv run python create_restaurant_indexes.py
+"""
+from database import engine
+from models.restaurant import RestaurantModel
+from models.category import restaurant_categories
+
+# Only the listing indexes: the others need columns that later migrations add
+LISTING_INDEXES = {
+    'ix_restaurants_created_at_id',
+    'ix_restaurants_owner_created_at_id',
+    'ix_restaurants_location_created_at_id',
+    'ix_restaurant_categories_category_restaurant',
+}
+
+for index in [*RestaurantModel.__table__.indexes, *restaurant_categories.indexes]:
+    if index.name in LISTING_INDEXES:
+        index.create(bind=engine, checkfirst=True)
+
+print("OK Restaurant indexes created successfully!")
@@ -0,0 +1,34 @@
+"""
+Migration script to add the full-text search column and GIN index (PostgreSQL),
+then backfill it for existing restaurants. SQLite deployments need nothing:
+they build an in-process index on first search.
+Run with: pipenv run python create_restaurant_search_index.py
+"""
+from sqlalchemy import inspect, text
+
+from database import engine, SessionLocal
+import models  # noqa: F401
+from models.restaurant import RestaurantModel
+from utils.search import SEARCH_VECTOR_SQL
+
+if engine.dialect.name != 'postgresql':
+    print("OK Nothing to do: search falls back to the in-process index")
+else:
+    existing = {column['name'] for column in inspect(engine).get_columns('restaurants')}
+    with engine.begin() as connection:
+        if 'search_vector' not in existing:
+            connection.execute(text('ALTER TABLE restaurants ADD COLUMN search_vector TSVECTOR'))
+
+    for index in RestaurantModel.__table__.indexes:
+        index.create(bind=engine, checkfirst=True)
+
+    db = SessionLocal()
+    try:
+        restaurant_ids = [row[0] for row in db.query(RestaurantModel.id)]
+        if restaurant_ids:
+            db.execute(SEARCH_VECTOR_SQL, [{"restaurant_id": restaurant_id} for restaurant_id in restaurant_ids])
+        db.commit()
+    finally:
+        db.close()
+
+    print(f"OK Search index created, {len(restaurant_ids)} restaurants indexed")
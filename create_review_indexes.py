@@ -0,0 +1,11 @@
+"""
+Migration script to add the review export index to an existing database.
+Run with: pipenv run python create_review_indexes.py
+"""
+from database import engine
+from models.review import ReviewModel
+
+for index in ReviewModel.__table__.indexes:
+    index.create(bind=engine, checkfirst=True)
+
+print("OK Review indexes created successfully!")
@@ -1,13 +1,41 @@
 # database.py
 
 from sqlalchemy import create_engine
+from sqlalchemy.engine import make_url
 from sqlalchemy.orm import sessionmaker, Session
-from config.environment import db_URI
+from sqlalchemy.pool import QueuePool, AsyncAdaptedQueuePool
+from config.environment import (
+    db_URI, async_db, request_profiling,
+    db_pool_size, db_max_overflow, db_pool_timeout, db_pool_recycle, db_pool_pre_ping,
+)
+from utils.db_pool import instrument_engine
+from utils.profiling import install_query_hooks
+
+
+def pool_options(url: str, poolclass):
+    """Engine pool arguments from config; in-memory SQLite keeps its single-connection pool"""
+    parsed = make_url(url)
+    if parsed.get_backend_name() == 'sqlite' and parsed.database in (None, '', ':memory:'):
+        return {}
+    return {
+        'poolclass': poolclass,
+        'pool_size': db_pool_size,
+        'max_overflow': db_max_overflow,
+        'pool_timeout': db_pool_timeout,
+        'pool_recycle': db_pool_recycle,
+        'pool_pre_ping': db_pool_pre_ping,
+    }
+
 
 # Connect FastAPI with SQLAlchemy
 engine = create_engine(
-    db_URI
+    db_URI,
+    **pool_options(db_URI, QueuePool)
 )
+instrument_engine(engine)
+
+if request_profiling:
+    install_query_hooks(engine)
 
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
@@ -17,3 +45,39 @@ def get_db():
         yield db
     finally:
         db.close()
+
+
+# Async drivers for the same databases, used when ASYNC_DB is enabled
+ASYNC_DRIVERS = {
+    'postgresql': 'postgresql+asyncpg',
+    'postgres': 'postgresql+asyncpg',
+    'sqlite': 'sqlite+aiosqlite',
+}
+
+
+def async_database_url(url: str):
+    parsed = make_url(url)
+    backend = parsed.drivername.split('+')[0]
+    return parsed.set(drivername=ASYNC_DRIVERS.get(backend, parsed.drivername))
+
+
+async_engine = None
+AsyncSessionLocal = None
+
+if async_db:
+    from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker
+
+    async_engine = create_async_engine(
+        async_database_url(db_URI),
+        **pool_options(db_URI, AsyncAdaptedQueuePool)
+    )
+    instrument_engine(async_engine.sync_engine)
+    if request_profiling:
+        install_query_hooks(async_engine.sync_engine)
+    # Nothing may lazy-load after a commit in async code, so keep loaded state
+    AsyncSessionLocal = async_sessionmaker(async_engine, autoflush=False, expire_on_commit=False)
+
+
+async def get_async_db():
+    async with AsyncSessionLocal() as db:
+        yield db
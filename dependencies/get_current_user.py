@@ -1,30 +1,55 @@
 
 # dependencies/get_current_user.py
 
+from dataclasses import dataclass
 from fastapi import Depends, HTTPException, status
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
+from sqlalchemy import event
 from sqlalchemy.orm import Session
-from models.user import UserModel
-from database import get_db
+from sqlalchemy.ext.asyncio import AsyncSession
+from models.user import UserModel, RoleEnum
+from database import get_db, get_async_db
 import jwt
 from jwt import DecodeError, ExpiredSignatureError # We import specific exceptions to handle them explicitly
-from config.environment import secret
+from config.environment import secret, stateless_auth, user_cache_size, user_cache_ttl
+from utils.cache import TTLCache
 
 http_bearer = HTTPBearer()
 
+# Detached UserModel instances keyed by id; merged back into the request session on a hit
+user_cache = TTLCache(maxsize=user_cache_size, ttl=user_cache_ttl)
 
-def get_current_user(db: Session = Depends(get_db), token: HTTPAuthorizationCredentials = Depends(http_bearer)):
 
-    try:
+@dataclass(frozen=True)
+class Principal:
+    """The authenticated caller as described by verified token claims"""
+    id: int
+    username: str
+    role: RoleEnum
+
+
+def invalidate_user(user_id):
+    user_cache.invalidate(int(user_id))
+
 
-        payload = jwt.decode(token.credentials, secret, algorithms=["HS256"])
+# Users changed by a session are dropped from the cache once its transaction commits:
+# dropping them at flush time lets another request re-cache the old row before the commit
+@event.listens_for(Session, 'after_flush')
+def _track_changed_users(session, flush_context):
+    changed = {target.id for target in (*session.dirty, *session.deleted) if isinstance(target, UserModel)}
+    if changed:
+        session.info.setdefault('changed_user_ids', set()).update(changed)
 
 
-        user = db.query(UserModel).filter(UserModel.id == payload.get("sub")).first()
+@event.listens_for(Session, 'after_commit')
+def _invalidate_committed_users(session):
+    for user_id in session.info.pop('changed_user_ids', ()):
+        invalidate_user(user_id)
 
-        if not user:
-            raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED,
-                                 detail="Invalid username or password")
+
+def decode_token(token: HTTPAuthorizationCredentials = Depends(http_bearer)):
+    try:
+        return jwt.decode(token.credentials, secret, algorithms=["HS256"])
 
     except DecodeError as e:
         raise HTTPException(status_code=status.HTTP_403_FORBIDDEN,
@@ -33,4 +58,78 @@ def get_current_user(db: Session = Depends(get_db), token: HTTPAuthorizationCred
     except ExpiredSignatureError:
         raise HTTPException(status_code=status.HTTP_403_FORBIDDEN,
                              detail='Token has expired')
-    return user
+
+
+def _user_id(payload: dict) -> int:
+    try:
+        return int(payload.get("sub"))
+    except (TypeError, ValueError):
+        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED,
+                             detail="Invalid username or password")
+
+
+def _principal_from_claims(payload: dict) -> Principal:
+    try:
+        return Principal(id=int(payload["sub"]), username=payload["username"], role=RoleEnum(payload["role"]))
+    except (KeyError, TypeError, ValueError):
+        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED,
+                             detail="Invalid username or password")
+
+
+def get_current_user(db: Session = Depends(get_db), payload: dict = Depends(decode_token)):
+
+    user_id = _user_id(payload)
+
+    cached = user_cache.get(user_id)
+    if cached is not None:
+        # load=False attaches a copy of the cached state without a SELECT
+        return db.merge(cached, load=False)
+
+    user = db.query(UserModel).filter(UserModel.id == user_id).first()
+
+    if not user:
+        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED,
+                             detail="Invalid username or password")
+
+    db.expunge(user)
+    user_cache.set(user_id, user)
+    return db.merge(user, load=False)
+
+
+def get_current_principal(db: Session = Depends(get_db), payload: dict = Depends(decode_token)):
+    """Who is calling, for handlers that only need id and role.
+
+    With STATELESS_AUTH enabled this is built from the token alone, so role
+    changes and deletions take effect when the token expires. Otherwise it
+    is the (cached) user row.
+    """
+    if not stateless_auth:
+        return get_current_user(db, payload)
+
+    return _principal_from_claims(payload)
+
+
+async def get_current_user_async(db: AsyncSession = Depends(get_async_db), payload: dict = Depends(decode_token)):
+    """get_current_user for the async routers, sharing the same user cache"""
+    user_id = _user_id(payload)
+
+    cached = user_cache.get(user_id)
+    if cached is not None:
+        return await db.merge(cached, load=False)
+
+    user = await db.get(UserModel, user_id)
+
+    if not user:
+        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED,
+                             detail="Invalid username or password")
+
+    db.expunge(user)
+    user_cache.set(user_id, user)
+    return await db.merge(user, load=False)
+
+
+async def get_current_principal_async(db: AsyncSession = Depends(get_async_db), payload: dict = Depends(decode_token)):
+    if not stateless_auth:
+        return await get_current_user_async(db, payload)
+
+    return _principal_from_claims(payload)
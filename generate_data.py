@@ -0,0 +1,322 @@
+"""
+Generate a large synthetic dataset for reproducing performance problems.
+Where seed.py builds a handful of hand-written rows, this writes users,
+restaurants, reviews and favorites in bulk (COPY on PostgreSQL, Core
+executemany elsewhere) with Zipf-distributed restaurant popularity and a
+seeded RNG, so the same arguments always produce the same data.
+
+Reviews and favorites are written for the users created in the same run,
+which keeps the (user, restaurant) uniqueness checks in memory. Every
+generated user has the password "password123"; in a fresh database the
+first one (user_1) is an admin.
+
+Run with: pipenv run python generate_data.py --users 1e6 --restaurants 1e5 --reviews 1e7 --favorites 2e6
+          pipenv run python generate_data.py --append --restaurants 1000 --users 1000 --reviews 20000
+"""
+import argparse
+import csv
+import io
+import math
+import random
+import time
+from datetime import datetime, timedelta
+from itertools import accumulate
+
+from sqlalchemy import func, select
+from sqlalchemy.orm import Session
+
+from database import SessionLocal
+from models.category import restaurant_categories
+from models.favorite import FavoriteModel
+from models.restaurant import RestaurantModel
+from models.review import ReviewModel
+from models.user import UserModel, RoleEnum
+from seed import create_tables
+from utils.bulk_import import ensure_categories
+from utils.geo import KM_PER_DEGREE, geohash_for
+from utils.passwords import hash_password
+from utils.ratings import rebuild_rating_aggregates
+from utils.search import refresh_search_documents
+
+CATEGORIES = [
+    "Italian", "Japanese", "Mexican", "Chinese", "French", "Indian", "Thai", "American", "Mediterranean",
+    "Korean", "Vietnamese", "Greek", "Spanish", "Turkish", "Lebanese", "Fast Food", "Seafood", "Vegetarian",
+    "Vegan", "Barbecue",
+]
+LOCATIONS = [
+    "Downtown", "Midtown", "Uptown", "Westside", "Eastside", "Old Town", "Harbor", "University District",
+    "Riverside", "Market Square", "Northgate", "Southpark", "Hillcrest", "Lakeside", "Chinatown", "Arts District",
+    "Financial District", "Airport", "Suburbs", "Waterfront",
+]
+# Generated restaurants cluster around their neighbourhood, neighbourhoods within ~10 km of this point
+CITY_CENTER = (40.7128, -74.0060)
+NEIGHBOURHOOD_SPREAD_KM = 10
+RESTAURANT_SPREAD_KM = 1
+ADJECTIVES = ["Golden", "Little", "Blue", "Rustic", "Urban", "Happy", "Royal", "Spicy", "Green", "Hidden"]
+NOUNS = ["Kitchen", "Table", "Spoon", "Garden", "Bistro", "Grill", "House", "Corner", "Oven", "Diner"]
+COMMENTS = {
+    1: ["Terrible experience.", "Would not come back.", "Cold food and rude service."],
+    2: ["Disappointing.", "Overpriced for what you get.", "Slow service, bland food."],
+    3: ["It was fine.", "Decent but nothing special.", "Good food, long wait."],
+    4: ["Really good!", "Tasty food and friendly staff.", "Would recommend."],
+    5: ["Absolutely delicious!", "Best meal in town.", "Perfect in every way."],
+}
+# Skewed towards good ratings, like most review sites
+RATING_WEIGHTS = [5, 8, 17, 35, 35]
+PASSWORD = "password123"
+
+
+def count(value: str) -> int:
+    """Accept row counts in scientific notation (1e6)"""
+    return int(float(value))
+
+
+class Zipf:
+    """Draws indexes 0..n-1 with probability proportional to 1 / (rank + 1) ** s"""
+
+    def __init__(self, n: int, s: float, rng: random.Random):
+        self.rng = rng
+        self.population = range(n)
+        self.cum_weights = list(accumulate(1 / (rank ** s) for rank in range(1, n + 1)))
+
+    def draw(self, k: int):
+        return self.rng.choices(self.population, cum_weights=self.cum_weights, k=k)
+
+    def distinct(self, k: int):
+        """k distinct indexes, still favouring the popular ones"""
+        if k * 2 > len(self.population):
+            return self.rng.sample(self.population, k)
+        chosen = set(self.draw(k))
+        while len(chosen) < k:
+            chosen.update(self.draw(k - len(chosen)))
+        return chosen
+
+
+class BulkWriter:
+    """Buffers rows for one table and writes them batch_size at a time, timing the whole run"""
+
+    def __init__(self, db: Session, table, batch_size: int):
+        self.db = db
+        self.table = table
+        self.batch_size = batch_size
+        self.copy = db.get_bind().dialect.name == "postgresql"
+        self.rows = []
+        self.written = 0
+        self.start = time.perf_counter()
+
+    def add(self, row: dict):
+        self.rows.append(row)
+        if len(self.rows) >= self.batch_size:
+            self.flush()
+
+    def flush(self):
+        if not self.rows:
+            return
+        if self.copy:
+            self._copy()
+        else:
+            self.db.execute(self.table.insert(), self.rows)
+        self.db.commit()
+        self.written += len(self.rows)
+        self.rows = []
+        print(f"... {self.table.name}: {self.written} rows", end="\r")
+
+    def _copy(self):
+        columns = list(self.rows[0])
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        for row in self.rows:
+            writer.writerow([value.value if isinstance(value, RoleEnum) else value for value in row.values()])
+        buffer.seek(0)
+        cursor = self.db.connection().connection.cursor()
+        try:
+            cursor.copy_expert(f"COPY {self.table.name} ({', '.join(columns)}) FROM STDIN WITH (FORMAT csv)", buffer)
+        finally:
+            cursor.close()
+
+    def finish(self):
+        self.flush()
+        elapsed = time.perf_counter() - self.start
+        rate = self.written / elapsed if elapsed else 0
+        print(f"OK Inserted {self.written} {self.table.name} in {elapsed:.1f}s ({rate:.0f} rows/sec)")
+        return self.written
+
+
+def _new_ids(db: Session, column, after: int):
+    return list(db.execute(select(column).where(column > after).order_by(column)).scalars())
+
+
+def _offset(rng: random.Random, latitude: float, longitude: float, spread_km: float):
+    """A point normally distributed around (latitude, longitude) with spread_km standard deviation"""
+    latitude += rng.gauss(0, spread_km) / KM_PER_DEGREE
+    longitude += rng.gauss(0, spread_km) / (KM_PER_DEGREE * math.cos(math.radians(latitude)))
+    return round(latitude, 6), round(longitude, 6)
+
+
+def _timestamp(rng: random.Random, now: datetime, days: int):
+    return now - timedelta(seconds=rng.randrange(days * 86400))
+
+
+def generate_users(db: Session, rng, args, now, fresh: bool):
+    """Returns (owner_ids, reviewer_ids) for the users created in this run"""
+    first_id = db.execute(select(func.coalesce(func.max(UserModel.id), 0))).scalar()
+    owner_count = min(args.users, max(1, args.restaurants // 10)) if args.restaurants else 0
+    password_hash = hash_password(PASSWORD)
+
+    writer = BulkWriter(db, UserModel.__table__, args.batch_size)
+    for n in range(first_id + 1, first_id + args.users + 1):
+        index = n - first_id
+        if fresh and index == 1:
+            role = RoleEnum.admin
+        elif index <= owner_count + (1 if fresh else 0):
+            role = RoleEnum.restaurant_owner
+        else:
+            role = RoleEnum.user
+        created_at = _timestamp(rng, now, args.days)
+        writer.add({
+            "username": f"user_{n}",
+            "email": f"user_{n}@example.com",
+            "password_hash": password_hash,
+            "role": role,
+            "created_at": created_at,
+            "updated_at": created_at,
+        })
+    writer.finish()
+
+    rows = db.execute(select(UserModel.id, UserModel.role).where(UserModel.id > first_id)).all()
+    owner_ids = [user_id for user_id, role in rows if role == RoleEnum.restaurant_owner]
+    reviewer_ids = [user_id for user_id, role in rows if role == RoleEnum.user]
+    return owner_ids, reviewer_ids
+
+
+def generate_restaurants(db: Session, rng, args, now, owner_ids):
+    if not args.restaurants:
+        return []
+    if not owner_ids:
+        owner_ids = list(db.execute(select(UserModel.id).where(UserModel.role == RoleEnum.restaurant_owner)).scalars())
+    if not owner_ids:
+        raise SystemExit("ERROR No restaurant owners to attach restaurants to; generate some --users as well")
+
+    first_id = db.execute(select(func.coalesce(func.max(RestaurantModel.id), 0))).scalar()
+    locations = Zipf(len(LOCATIONS), args.zipf, rng)
+    centers = [_offset(rng, *CITY_CENTER, NEIGHBOURHOOD_SPREAD_KM) for _ in LOCATIONS]
+
+    writer = BulkWriter(db, RestaurantModel.__table__, args.batch_size)
+    for n in range(first_id + 1, first_id + args.restaurants + 1):
+        adjective, noun = rng.choice(ADJECTIVES), rng.choice(NOUNS)
+        neighbourhood = locations.draw(1)[0]
+        location = LOCATIONS[neighbourhood]
+        latitude, longitude = _offset(rng, *centers[neighbourhood], RESTAURANT_SPREAD_KM)
+        created_at = _timestamp(rng, now, args.days)
+        writer.add({
+            "name": f"{adjective} {noun} {n}",
+            "description": f"A {adjective.lower()} {noun.lower()} serving the {location} neighbourhood",
+            "location": f"{rng.randrange(1, 999)} Main St, {location}",
+            "latitude": latitude,
+            "longitude": longitude,
+            "geohash": geohash_for(latitude, longitude),
+            "owner_id": rng.choice(owner_ids),
+            "created_at": created_at,
+            "updated_at": created_at,
+        })
+    writer.finish()
+
+    restaurant_ids = _new_ids(db, RestaurantModel.id, first_id)
+
+    category_ids = list(ensure_categories(db, CATEGORIES).values())
+    db.commit()
+    categories = Zipf(len(category_ids), args.zipf, rng)
+    links = BulkWriter(db, restaurant_categories, args.batch_size)
+    for restaurant_id in restaurant_ids:
+        for index in categories.distinct(rng.randint(1, 3)):
+            links.add({"restaurant_id": restaurant_id, "category_id": category_ids[index]})
+    links.finish()
+
+    for start in range(0, len(restaurant_ids), args.batch_size):
+        refresh_search_documents(db, restaurant_ids[start:start + args.batch_size])
+        db.commit()
+
+    return restaurant_ids
+
+
+def generate_pairs(db: Session, rng, args, total: int, table, reviewer_ids, make_row):
+    """Spread total rows evenly over reviewer_ids, each user picking distinct restaurants by popularity"""
+    if not total:
+        return
+    if not reviewer_ids:
+        raise SystemExit(f"ERROR {table.name} are only generated for new users; generate some --users as well")
+
+    # Popularity rank is shuffled so the most popular restaurants are not simply the oldest
+    restaurant_ids = list(db.execute(select(RestaurantModel.id)).scalars())
+    if not restaurant_ids:
+        raise SystemExit(f"ERROR No restaurants to attach {table.name} to")
+    rng.shuffle(restaurant_ids)
+    popularity = Zipf(len(restaurant_ids), args.zipf, rng)
+
+    per_user = total / len(reviewer_ids)
+    writer = BulkWriter(db, table, args.batch_size)
+    for position, user_id in enumerate(reviewer_ids):
+        k = int((position + 1) * per_user) - int(position * per_user)
+        for index in popularity.distinct(min(k, len(restaurant_ids))):
+            writer.add(make_row(user_id, restaurant_ids[index]))
+    writer.finish()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Generate a large synthetic dataset")
+    parser.add_argument("--users", type=count, default=1000)
+    parser.add_argument("--restaurants", type=count, default=100)
+    parser.add_argument("--reviews", type=count, default=10000)
+    parser.add_argument("--favorites", type=count, default=2000)
+    parser.add_argument("--seed", type=int, default=42, help="RNG seed; the same seed gives the same data")
+    parser.add_argument("--zipf", type=float, default=1.1, help="Zipf exponent for restaurant popularity")
+    parser.add_argument("--days", type=int, default=730, help="spread created_at over this many past days")
+    parser.add_argument("--batch-size", type=count, default=10000)
+    parser.add_argument("--append", action="store_true", help="keep existing data instead of recreating the tables")
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    now = datetime.now().replace(microsecond=0)
+
+    if not args.append:
+        create_tables()
+
+    db = SessionLocal()
+    start = time.perf_counter()
+    try:
+        owner_ids, reviewer_ids = generate_users(db, rng, args, now, fresh=not args.append)
+        generate_restaurants(db, rng, args, now, owner_ids)
+
+        def review_row(user_id, restaurant_id):
+            rating = rng.choices(range(1, 6), weights=RATING_WEIGHTS)[0]
+            created_at = _timestamp(rng, now, args.days)
+            return {
+                "rating": rating,
+                "comment": rng.choice(COMMENTS[rating]),
+                "user_id": user_id,
+                "restaurant_id": restaurant_id,
+                "created_at": created_at,
+                "updated_at": created_at,
+            }
+
+        def favorite_row(user_id, restaurant_id):
+            created_at = _timestamp(rng, now, args.days)
+            return {"user_id": user_id, "restaurant_id": restaurant_id, "created_at": created_at, "updated_at": created_at}
+
+        generate_pairs(db, rng, args, args.reviews, ReviewModel.__table__, reviewer_ids, review_row)
+        generate_pairs(db, rng, args, args.favorites, FavoriteModel.__table__, reviewer_ids, favorite_row)
+
+        aggregates_start = time.perf_counter()
+        drifted = rebuild_rating_aggregates(db)
+        print(f"OK Rebuilt rating aggregates for {len(drifted)} restaurants in {time.perf_counter() - aggregates_start:.1f}s")
+    except Exception:
+        db.rollback()
+        raise
+    finally:
+        db.close()
+
+    print(f"\nOK Generated data in {time.perf_counter() - start:.1f}s (seed {args.seed}, password '{PASSWORD}')")
+
+
+if __name__ == "__main__":
+    main()
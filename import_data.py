@@ -0,0 +1,51 @@
+"""
+Bulk import restaurants, categories or reviews from a CSV or NDJSON file.
+Companion to seed.py for onboarding real catalogs; rows are validated and
+inserted in batches and bad rows are reported without stopping the import.
+
+Run with: pipenv run python import_data.py restaurants partner.ndjson --owner-id 4
+          pipenv run python import_data.py reviews reviews.csv
+"""
+import argparse
+import sys
+import time
+
+from database import SessionLocal
+import models  # noqa: F401
+from utils.bulk_import import StreamImporter, KINDS, FORMATS, BATCH_SIZE
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Bulk import catalog data")
+    parser.add_argument("kind", choices=KINDS)
+    parser.add_argument("path", help="input file, or - for stdin")
+    parser.add_argument("--format", choices=FORMATS, help="defaults to the file extension, else ndjson")
+    parser.add_argument("--owner-id", type=int, help="owner for restaurant rows without an owner_id column")
+    parser.add_argument("--batch-size", type=int, default=BATCH_SIZE)
+    args = parser.parse_args()
+
+    fmt = args.format or ("csv" if args.path.endswith(".csv") else "ndjson")
+    importer = StreamImporter(args.kind, fmt, owner_id=args.owner_id, allow_owner_override=True, batch_size=args.batch_size)
+
+    source = sys.stdin if args.path == "-" else open(args.path, encoding="utf-8", newline="")
+    db = SessionLocal()
+    start = time.perf_counter()
+    try:
+        report = importer.run(db, source, on_batch=lambda report: print(
+            f"... {report.rows} rows, {report.inserted} inserted", end="\r"
+        ))
+    finally:
+        db.close()
+        if source is not sys.stdin:
+            source.close()
+
+    elapsed = time.perf_counter() - start
+    print(f"OK Imported {report.inserted}/{report.rows} {args.kind} in {elapsed:.1f}s ({report.rows / elapsed:.0f} rows/sec)")
+    for error in report.errors:
+        print(f"  row {error['row']}: {error['error']}")
+    if report.failed > len(report.errors):
+        print(f"  ... and {report.failed - len(report.errors)} more errors")
+
+
+if __name__ == "__main__":
+    main()
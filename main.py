@@ -1,14 +1,59 @@
-from fastapi import FastAPI, Depends
+import logging
+import time
+from contextlib import asynccontextmanager
+
+from fastapi import FastAPI, Depends, HTTPException
+from fastapi.responses import PlainTextResponse
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.middleware.gzip import GZipMiddleware
 from fastapi.openapi.utils import get_openapi
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 
+from config.environment import (
+    async_db, request_profiling, server_timing_header, n_plus_one_threshold,
+    metrics_enabled, metrics_multiproc_dir, metrics_snapshot_interval,
+    rate_limit_enabled, trust_forwarded_for, max_concurrent_requests, load_shed_retry_after,
+    fast_json, compression_min_size, compression_level,
+)
+from database import engine, async_engine
+from utils.db_pool import describe_pool
+from utils.response_cache import response_cache
+from utils.profiling import ProfilingMiddleware
+from utils.pubsub import get_broker
+from utils.metrics import MetricsMiddleware, register_collector, render_metrics, start_snapshot_writer
+from utils.passwords import queue_depth
+from utils.rate_limit import RateLimitMiddleware, configured_rules, get_store, rate_limit_stats
+from utils.responses import default_response_class
+from utils.tasks import background_tasks
+from dependencies.get_current_user import get_current_principal, user_cache, Principal
+from sqlalchemy import text
+from models.user import RoleEnum
+
 # Controllers
-from controllers.restaurants import router as RestaurantsRouter
-from controllers.users import router as UserRouter
-from controllers.notifications import router as NotificationsRouter
+if async_db:
+    from controllers.async_restaurants import router as RestaurantsRouter
+    from controllers.async_users import router as UserRouter
+    from controllers.async_notifications import router as NotificationsRouter
+else:
+    from controllers.restaurants import router as RestaurantsRouter
+    from controllers.users import router as UserRouter
+    from controllers.notifications import router as NotificationsRouter
+from controllers.imports import router as ImportsRouter
+from controllers.exports import router as ExportsRouter
+from controllers.notification_stream import router as NotificationStreamRouter
+
+logger = logging.getLogger(__name__)
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Started per worker process, after any fork
+    if metrics_enabled and metrics_multiproc_dir:
+        start_snapshot_writer(metrics_multiproc_dir, metrics_snapshot_interval)
+    yield
+
 
-app = FastAPI()
+app = FastAPI(lifespan=lifespan, default_response_class=default_response_class(fast_json))
 
 # CORS ✅ Allow your React dev server(s) to call the API
 origins = [
@@ -18,6 +63,17 @@ origins = [
     # "https://your-frontend.example.com"
 ]
 
+# Added before CORS so 429/503 responses still carry the CORS headers the frontend needs to read them
+if rate_limit_enabled or max_concurrent_requests:
+    app.add_middleware(
+        RateLimitMiddleware,
+        rules=configured_rules() if rate_limit_enabled else (),
+        store=get_store() if rate_limit_enabled else None,
+        max_concurrent=max_concurrent_requests,
+        shed_retry_after=load_shed_retry_after,
+        trust_forwarded_for=trust_forwarded_for,
+    )
+
 app.add_middleware(
     CORSMiddleware,
     allow_origins=origins,     # Which sites can call this API
@@ -26,12 +82,25 @@ app.add_middleware(
     allow_credentials=True,
 )
 
+# Inside metrics and profiling, so their timings include compression; SSE streams are never compressed
+if compression_min_size:
+    app.add_middleware(GZipMiddleware, minimum_size=compression_min_size, compresslevel=compression_level)
+
+if metrics_enabled:
+    app.add_middleware(MetricsMiddleware)
+
+if request_profiling:
+    app.add_middleware(ProfilingMiddleware, n_plus_one_threshold=n_plus_one_threshold, server_timing=server_timing_header)
+
 
 # ROUTES
 
 app.include_router(RestaurantsRouter, prefix="/api")
 app.include_router(UserRouter, prefix="/api")
 app.include_router(NotificationsRouter, prefix="/api/notifications")
+app.include_router(NotificationStreamRouter, prefix="/api/notifications")
+app.include_router(ImportsRouter, prefix="/api")
+app.include_router(ExportsRouter, prefix="/api")
 
 @app.get("/")
 def home():
@@ -41,4 +110,93 @@ def home():
 
 @app.get("/health")
 def health_check():
-    return {"status": "ok", "message": "Server is running"}
\ No newline at end of file
+    return {"status": "ok", "message": "Server is running"}
+
+
+@app.get("/health/db", include_in_schema=False)
+def db_health_check(current_user: Principal = Depends(get_current_principal)):
+    """Internal: connection pool occupancy, checkout wait times and a live ping - admin only"""
+    if current_user.role != RoleEnum.admin:
+        raise HTTPException(status_code=403, detail="Only admins can view database health")
+
+    start = time.perf_counter()
+    try:
+        with engine.connect() as connection:
+            connection.execute(text("SELECT 1"))
+        ping = {"ok": True, "latency_ms": (time.perf_counter() - start) * 1000}
+    except Exception:
+        # Driver errors can carry hosts and credentials; keep them in the server log
+        logger.exception("Database health check failed")
+        ping = {"ok": False, "error": "Database unavailable"}
+
+    pools = {"sync": describe_pool(engine)}
+    if async_engine is not None:
+        pools["async"] = describe_pool(async_engine.sync_engine)
+
+    return {"status": "ok" if ping["ok"] else "error", "ping": ping, "pools": pools}
+
+
+@app.get("/health/cache", include_in_schema=False)
+def cache_health_check():
+    """Internal: hit ratios and memory use of this worker's in-process caches"""
+    return {"responses": response_cache.stats(), "users": user_cache.stats()}
+
+
+def app_metric_samples():
+    """Pool, cache, bcrypt queue, background task and rate limit samples for /metrics"""
+    engines = {"sync": engine}
+    if async_engine is not None:
+        engines["async"] = async_engine.sync_engine
+
+    samples = []
+    for name, pool_engine in engines.items():
+        stats = describe_pool(pool_engine)
+        labels = {"engine": name}
+        for metric, field in (
+            ("db_pool_size", "size"),
+            ("db_pool_checked_out", "in_use"),
+            ("db_pool_overflow", "overflow"),
+            ("db_pool_checkouts_total", "checkouts"),
+            ("db_pool_timeouts_total", "timeouts"),
+            ("db_pool_connections_opened_total", "connections_opened"),
+        ):
+            if field in stats:
+                samples.append((metric, labels, stats[field]))
+
+    for name, cache in (("responses", response_cache), ("users", user_cache)):
+        stats = cache.stats()
+        labels = {"cache": name}
+        samples += [
+            ("cache_hits_total", labels, stats["hits"]),
+            ("cache_misses_total", labels, stats["misses"]),
+            ("cache_entries", labels, stats.get("entries", stats.get("size"))),
+        ]
+        if "bytes" in stats:
+            samples += [("cache_bytes", labels, stats["bytes"]), ("cache_evictions_total", labels, stats["evictions"])]
+
+    samples.append(("password_hash_queue_depth", {}, queue_depth()))
+
+    tasks = background_tasks.stats()
+    samples += [
+        ("background_tasks_pending", {}, tasks["pending"]),
+        ("background_tasks_failed_total", {}, tasks["failed"]),
+        ("background_tasks_dropped_total", {}, tasks["dropped"]),
+        ("requests_shed_total", {}, rate_limit_stats.shed),
+    ]
+    broker = get_broker().stats()
+    if broker:
+        samples += [
+            ("notification_push_pending", {}, broker["pending"]),
+            ("notification_push_failed_total", {}, broker["failed"]),
+        ]
+    samples += [("rate_limited_total", {"rule": rule}, count) for rule, count in rate_limit_stats.limited.items()]
+    return samples
+
+
+if metrics_enabled:
+    register_collector(app_metric_samples)
+
+    @app.get("/metrics", include_in_schema=False)
+    def metrics():
+        """Prometheus scrape target, aggregated over all workers when METRICS_MULTIPROC_DIR is set"""
+        return PlainTextResponse(render_metrics(metrics_multiproc_dir), media_type="text/plain; version=0.0.4")
@@ -5,6 +5,7 @@ from .category import CategoryModel, restaurant_categories
 from .review import ReviewModel
 from .favorite import FavoriteModel
 from .notification import NotificationModel
+from .recommendation import RestaurantSimilarityModel, RestaurantSimilarityStateModel
 
 __all__ = [
     'BaseModel',
@@ -16,4 +17,6 @@ __all__ = [
     'ReviewModel',
     'FavoriteModel',
     'NotificationModel',
+    'RestaurantSimilarityModel',
+    'RestaurantSimilarityStateModel',
 ]
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Table, ForeignKey
+from sqlalchemy import Column, Integer, String, Table, ForeignKey, Index
 from sqlalchemy.orm import relationship
 from .base import BaseModel
 
@@ -7,7 +7,9 @@ restaurant_categories = Table(
     'restaurant_categories',
     BaseModel.metadata,
     Column('restaurant_id', Integer, ForeignKey('restaurants.id', ondelete='CASCADE'), primary_key=True),
-    Column('category_id', Integer, ForeignKey('categories.id', ondelete='CASCADE'), primary_key=True)
+    Column('category_id', Integer, ForeignKey('categories.id', ondelete='CASCADE'), primary_key=True),
+    # The primary key covers restaurant -> categories; this covers category -> restaurants
+    Index('ix_restaurant_categories_category_restaurant', 'category_id', 'restaurant_id'),
 )
 
 
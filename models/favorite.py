@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, DateTime, ForeignKey, func, UniqueConstraint
+from sqlalchemy import Column, Integer, DateTime, ForeignKey, Index, func, UniqueConstraint
 from sqlalchemy.orm import relationship
 from .base import BaseModel
 
@@ -12,7 +12,11 @@ class FavoriteModel(BaseModel):
     restaurant_id = Column(Integer, ForeignKey("restaurants.id"), nullable=False)
     created_at = Column(DateTime, default=func.now(), nullable=False)
 
-    __table_args__ = (UniqueConstraint('user_id', 'restaurant_id', name='uq_user_restaurant_favorite'),)
+    __table_args__ = (
+        UniqueConstraint('user_id', 'restaurant_id', name='uq_user_restaurant_favorite'),
+        # A user's favorites are paged newest first by (created_at, id)
+        Index('ix_favorites_user_created_at_id', 'user_id', 'created_at', 'id'),
+    )
 
     user = relationship('UserModel', back_populates='favorites')
     restaurant = relationship('RestaurantModel', back_populates='favorites')
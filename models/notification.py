@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, DateTime, Boolean, ForeignKey, func
+from sqlalchemy import Column, Integer, String, DateTime, Boolean, ForeignKey, Index, func
 from sqlalchemy.orm import relationship
 from .base import BaseModel
 
@@ -14,6 +14,11 @@ class NotificationModel(BaseModel):
     read = Column(Boolean, default=False, nullable=False)
     created_at = Column(DateTime, default=func.now(), nullable=False)
 
+    # Backs the owner's notification feed: newest first per restaurant, id as tie-breaker
+    __table_args__ = (
+        Index('ix_notifications_restaurant_created_at_id', 'restaurant_id', 'created_at', 'id'),
+    )
+
     restaurant = relationship('RestaurantModel', back_populates='notifications')
     user = relationship('UserModel')
 
@@ -0,0 +1,34 @@
+from sqlalchemy import Column, Integer, BigInteger, Float, ForeignKey, Index, UniqueConstraint
+from .base import BaseModel
+
+
+class RestaurantSimilarityModel(BaseModel):
+    """Top-K item-item neighbours per restaurant, written by build_recommendations.py"""
+
+    __tablename__ = "restaurant_similarities"
+
+    restaurant_id = Column(Integer, ForeignKey("restaurants.id", ondelete="CASCADE"), nullable=False)
+    similar_restaurant_id = Column(Integer, ForeignKey("restaurants.id", ondelete="CASCADE"), nullable=False)
+    score = Column(Float, nullable=False)
+    rank = Column(Integer, nullable=False)
+
+    __table_args__ = (
+        UniqueConstraint('restaurant_id', 'similar_restaurant_id', name='uq_restaurant_similarity'),
+        # Serves /restaurants/{id}/similar in rank order and the per-seed lookups of /recommendations
+        Index('ix_restaurant_similarities_restaurant_rank', 'restaurant_id', 'rank'),
+    )
+
+    def __repr__(self):
+        return f"<RestaurantSimilarityModel(restaurant_id={self.restaurant_id}, similar_restaurant_id={self.similar_restaurant_id}, score={self.score})>"
+
+
+class RestaurantSimilarityStateModel(BaseModel):
+    """Fingerprint of each restaurant's interactions at the last build, so refreshes only redo what changed"""
+
+    __tablename__ = "restaurant_similarity_state"
+
+    restaurant_id = Column(Integer, ForeignKey("restaurants.id", ondelete="CASCADE"), nullable=False, unique=True)
+    fingerprint = Column(BigInteger, nullable=False)
+
+    def __repr__(self):
+        return f"<RestaurantSimilarityStateModel(restaurant_id={self.restaurant_id}, fingerprint={self.fingerprint})>"
@@ -1,5 +1,6 @@
-from sqlalchemy import Column, Integer, String, Text, DateTime, ForeignKey, func
-from sqlalchemy.orm import relationship
+from sqlalchemy import Column, Integer, String, Text, Float, DateTime, ForeignKey, Index, func
+from sqlalchemy.dialects.postgresql import TSVECTOR
+from sqlalchemy.orm import relationship, deferred
 from .base import BaseModel
 
 
@@ -15,11 +16,43 @@ class RestaurantModel(BaseModel):
     owner_id = Column(Integer, ForeignKey("users.id"), nullable=False)
     created_at = Column(DateTime, default=func.now(), nullable=False)
 
+    # Denormalized review aggregates, maintained in the same transaction as review writes
+    review_count = Column(Integer, default=0, server_default='0', nullable=False)
+    rating_sum = Column(Integer, default=0, server_default='0', nullable=False)
+    avg_rating = Column(Float, default=0, server_default='0', nullable=False)
+    rating_1_count = Column(Integer, default=0, server_default='0', nullable=False)
+    rating_2_count = Column(Integer, default=0, server_default='0', nullable=False)
+    rating_3_count = Column(Integer, default=0, server_default='0', nullable=False)
+    rating_4_count = Column(Integer, default=0, server_default='0', nullable=False)
+    rating_5_count = Column(Integer, default=0, server_default='0', nullable=False)
+
+    # WGS84 coordinates and their geohash, which backs the nearby-restaurants index
+    latitude = Column(Float, nullable=True)
+    longitude = Column(Float, nullable=True)
+    geohash = Column(String(12), nullable=True)
+
+    # Full-text document over name, categories, location and description (PostgreSQL only)
+    search_vector = deferred(Column(Text().with_variant(TSVECTOR(), 'postgresql'), nullable=True))
+
+    # Composite indexes backing the keyset-paginated listing (sort key + id tie-breaker)
+    __table_args__ = (
+        Index('ix_restaurants_created_at_id', 'created_at', 'id'),
+        Index('ix_restaurants_owner_created_at_id', 'owner_id', 'created_at', 'id'),
+        Index('ix_restaurants_location_created_at_id', 'location', 'created_at', 'id'),
+        Index('ix_restaurants_avg_rating_id', 'avg_rating', 'id'),
+        Index('ix_restaurants_geohash', 'geohash'),
+        Index('ix_restaurants_search_vector', 'search_vector', postgresql_using='gin').ddl_if(dialect='postgresql'),
+    )
+
     owner = relationship('UserModel', back_populates='owned_restaurants')
     reviews = relationship('ReviewModel', back_populates='restaurant', cascade="all, delete-orphan")
     favorites = relationship('FavoriteModel', back_populates='restaurant', cascade="all, delete-orphan")
     categories = relationship('CategoryModel', secondary='restaurant_categories', back_populates='restaurants')
     notifications = relationship('NotificationModel', back_populates='restaurant', cascade="all, delete-orphan")
 
+    @property
+    def rating_histogram(self):
+        return {star: getattr(self, f'rating_{star}_count') or 0 for star in range(1, 6)}
+
     def __repr__(self):
         return f"<RestaurantModel(id={self.id}, name={self.name}, owner_id={self.owner_id})>"
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Text, DateTime, ForeignKey, func, UniqueConstraint
+from sqlalchemy import Column, Integer, String, Text, DateTime, ForeignKey, Index, func, UniqueConstraint
 from sqlalchemy.orm import relationship
 from .base import BaseModel
 
@@ -14,7 +14,11 @@ class ReviewModel(BaseModel):
     restaurant_id = Column(Integer, ForeignKey("restaurants.id"), nullable=False)
     created_at = Column(DateTime, default=func.now(), nullable=False)
 
-    __table_args__ = (UniqueConstraint('user_id', 'restaurant_id', name='uq_user_restaurant_review'),)
+    __table_args__ = (
+        UniqueConstraint('user_id', 'restaurant_id', name='uq_user_restaurant_review'),
+        # Incremental exports walk reviews in (created_at, id) order
+        Index('ix_reviews_created_at_id', 'created_at', 'id'),
+    )
 
     user = relationship('UserModel', back_populates='reviews')
     restaurant = relationship('RestaurantModel', back_populates='reviews')
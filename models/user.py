@@ -1,14 +1,12 @@
 from sqlalchemy import Column, Integer, String, Enum as SQLEnum, DateTime, func
 from .base import BaseModel
-from passlib.context import CryptContext
 import jwt
 from datetime import datetime, timedelta, timezone
 from sqlalchemy.orm import relationship
 from config.environment import secret
+from utils.passwords import hash_password, verify_password
 import enum
 
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
-
 class RoleEnum(str, enum.Enum):
     admin = "admin"
     user = "user"
@@ -30,10 +28,14 @@ class UserModel(BaseModel):
     owned_restaurants = relationship('RestaurantModel', back_populates='owner', cascade="all, delete-orphan")
 
     def set_password(self, password: str):
-        self.password_hash = pwd_context.hash(password)
+        self.password_hash = hash_password(password)
 
     def verify_password(self, password: str) -> bool:
-        return pwd_context.verify(password, self.password_hash)
+        # Upgrades the stored hash in place when the configured bcrypt cost has changed
+        is_valid, new_hash = verify_password(password, self.password_hash)
+        if is_valid and new_hash:
+            self.password_hash = new_hash
+        return is_valid
 
     def generate_token(self):
         payload = {
@@ -0,0 +1,25 @@
+"""
+Rebuild (or just verify) the denormalized rating aggregates on restaurants.
+Run with: pipenv run python rebuild_rating_aggregates.py [--verify]
+"""
+import sys
+
+from database import SessionLocal
+import models  # noqa: F401
+from utils.ratings import rebuild_rating_aggregates
+
+verify_only = '--verify' in sys.argv[1:]
+
+db = SessionLocal()
+try:
+    drifted = rebuild_rating_aggregates(db, verify_only=verify_only)
+finally:
+    db.close()
+
+if not drifted:
+    print("OK Rating aggregates are consistent")
+elif verify_only:
+    print(f"ERROR Rating aggregates drifted for {len(drifted)} restaurants: {drifted}")
+    sys.exit(1)
+else:
+    print(f"OK Rebuilt rating aggregates for {len(drifted)} restaurants")
@@ -8,6 +8,7 @@ from models.category import CategoryModel
 from models.review import ReviewModel
 from models.favorite import FavoriteModel
 from models.notification import NotificationModel
+from models.recommendation import RestaurantSimilarityModel, RestaurantSimilarityStateModel
 
 
 def create_tables():
@@ -27,6 +28,8 @@ def seed_database():
 
     try:
         # Clear existing data
+        db.query(RestaurantSimilarityModel).delete()
+        db.query(RestaurantSimilarityStateModel).delete()
         db.query(FavoriteModel).delete()
         db.query(NotificationModel).delete()
         db.query(ReviewModel).delete()
@@ -1,5 +1,7 @@
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
+from typing import Dict, List, Optional
 from datetime import datetime
+from serializers.restaurant import RestaurantDetailSchema
 
 
 class FavoriteCreateSchema(BaseModel):
@@ -14,3 +16,20 @@ class FavoriteSchema(BaseModel):
 
     class Config:
         from_attributes = True
+
+
+class FavoriteRestaurantSchema(FavoriteSchema):
+    restaurant: RestaurantDetailSchema
+
+
+class FavoritePageSchema(BaseModel):
+    items: List[FavoriteRestaurantSchema]
+    next_cursor: Optional[str] = None
+
+
+class FavoriteStatusRequestSchema(BaseModel):
+    restaurant_ids: List[int] = Field(..., min_length=1, max_length=500)
+
+
+class FavoriteStatusSchema(BaseModel):
+    favorites: Dict[int, bool]
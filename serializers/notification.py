@@ -1,5 +1,6 @@
 from pydantic import BaseModel
 from datetime import datetime
+from typing import List, Optional
 
 class NotificationSchema(BaseModel):
     id: int
@@ -13,3 +14,8 @@ class NotificationSchema(BaseModel):
 
     class Config:
         from_attributes = True
+
+
+class NotificationPageSchema(BaseModel):
+    items: List[NotificationSchema]
+    next_cursor: Optional[str] = None
@@ -1,5 +1,5 @@
-from pydantic import BaseModel
-from typing import Optional, List
+from pydantic import BaseModel, Field
+from typing import Optional, List, Dict
 from datetime import datetime
 
 
@@ -16,6 +16,8 @@ class RestaurantCreateSchema(BaseModel):
     description: Optional[str] = None
     location: str
     image_url: Optional[str] = None
+    latitude: Optional[float] = Field(None, ge=-90, le=90)
+    longitude: Optional[float] = Field(None, ge=-180, le=180)
     category_ids: List[int] = []
 
 
@@ -24,6 +26,8 @@ class RestaurantUpdateSchema(BaseModel):
     description: Optional[str] = None
     location: Optional[str] = None
     image_url: Optional[str] = None
+    latitude: Optional[float] = Field(None, ge=-90, le=90)
+    longitude: Optional[float] = Field(None, ge=-180, le=180)
     category_ids: Optional[List[int]] = None
 
 
@@ -33,8 +37,14 @@ class RestaurantSchema(BaseModel):
     description: Optional[str] = None
     location: str
     image_url: Optional[str] = None
+    latitude: Optional[float] = None
+    longitude: Optional[float] = None
     owner_id: int
     created_at: datetime
+    review_count: int = 0
+    rating_sum: int = 0
+    avg_rating: float = 0
+    rating_histogram: Dict[int, int] = {}
 
     class Config:
         from_attributes = True
@@ -46,9 +56,52 @@ class RestaurantDetailSchema(BaseModel):
     description: Optional[str] = None
     location: str
     image_url: Optional[str] = None
+    latitude: Optional[float] = None
+    longitude: Optional[float] = None
     owner_id: int
     created_at: datetime
+    review_count: int = 0
+    rating_sum: int = 0
+    avg_rating: float = 0
+    rating_histogram: Dict[int, int] = {}
     categories: List[CategorySchema] = []
 
     class Config:
         from_attributes = True
+
+
+class RestaurantNearbySchema(RestaurantSchema):
+    distance_km: float
+
+
+class RestaurantRecommendationSchema(RestaurantSchema):
+    score: float
+
+
+class CategoryFacetSchema(BaseModel):
+    id: int
+    category: str
+    count: int
+
+
+class LocationFacetSchema(BaseModel):
+    location: str
+    count: int
+
+
+class RestaurantFacetsSchema(BaseModel):
+    total: int
+    categories: List[CategoryFacetSchema]
+    ratings: Dict[str, int]
+    locations: List[LocationFacetSchema]
+
+
+class RestaurantPageSchema(BaseModel):
+    items: List[RestaurantSchema]
+    next_cursor: Optional[str] = None
+    facets: Optional[RestaurantFacetsSchema] = None
+
+
+class RestaurantBatchSchema(BaseModel):
+    items: List[RestaurantDetailSchema]
+    missing: List[int] = []
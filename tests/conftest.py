@@ -0,0 +1,61 @@
+import os
+import tempfile
+
+import pytest
+
+# Settings are read at import time, so the app is pointed at a throwaway database before it loads
+_database = os.path.join(tempfile.mkdtemp(prefix="rateorant-tests-"), "test.db")
+os.environ["DATABASE_URL"] = f"sqlite:///{_database}"
+os.environ["ASYNC_DB"] = "false"
+os.environ["RATE_LIMIT"] = "false"
+os.environ.setdefault("BCRYPT_ROUNDS", "4")
+os.environ.setdefault("JWT_SECRET", "test-secret")
+
+from fastapi.testclient import TestClient  # noqa: E402
+
+from database import SessionLocal, engine  # noqa: E402
+from dependencies.get_current_user import user_cache  # noqa: E402
+from main import app  # noqa: E402
+from models import RoleEnum, UserModel  # noqa: E402
+from models.base import Base  # noqa: E402
+from utils.response_cache import response_cache  # noqa: E402
+
+
+@pytest.fixture(scope="session", autouse=True)
+def tables():
+    Base.metadata.create_all(engine)
+    yield
+    engine.dispose()
+
+
+@pytest.fixture
+def db():
+    session = SessionLocal()
+    yield session
+    session.close()
+    with engine.begin() as connection:
+        for table in reversed(Base.metadata.sorted_tables):
+            connection.execute(table.delete())
+    response_cache.clear()
+    user_cache.clear()
+
+
+@pytest.fixture
+def client():
+    with TestClient(app) as test_client:
+        yield test_client
+
+
+@pytest.fixture
+def make_user(db):
+    def make(username, role=RoleEnum.user):
+        user = UserModel(username=username, email=f"{username}@example.com", password_hash="x", role=role)
+        db.add(user)
+        db.commit()
+        return user
+    return make
+
+
+@pytest.fixture
+def auth():
+    return lambda user: {"Authorization": f"Bearer {user.generate_token()}"}
@@ -0,0 +1,41 @@
+from database import SessionLocal
+from dependencies.get_current_user import user_cache
+from models import UserModel
+
+
+def test_user_cache_drops_a_changed_user_on_commit_not_flush(client, db, make_user, auth):
+    user = make_user("diner")
+    headers = auth(user)
+    assert client.get("/api/notifications/", headers=headers).status_code == 200
+    assert user_cache.get(user.id) is not None
+
+    editor = SessionLocal()
+    try:
+        editor.get(UserModel, user.id).email = "renamed@example.com"
+        editor.flush()
+        # A request between the flush and the commit still caches the committed row
+        assert client.get("/api/notifications/", headers=headers).status_code == 200
+        assert user_cache.get(user.id).email == "diner@example.com"
+
+        editor.commit()
+    finally:
+        editor.close()
+
+    assert user_cache.get(user.id) is None
+    assert client.get("/api/notifications/", headers=headers).status_code == 200
+    assert user_cache.get(user.id).email == "renamed@example.com"
+
+
+def test_rolled_back_changes_leave_the_cache_alone(client, make_user, auth):
+    user = make_user("diner")
+    client.get("/api/notifications/", headers=auth(user))
+
+    editor = SessionLocal()
+    try:
+        editor.get(UserModel, user.id).email = "renamed@example.com"
+        editor.flush()
+        editor.rollback()
+    finally:
+        editor.close()
+
+    assert user_cache.get(user.id).email == "diner@example.com"
@@ -0,0 +1,64 @@
+import json
+from datetime import datetime, timedelta
+
+import pytest
+from sqlalchemy import literal, update
+
+from models import RestaurantModel, ReviewModel, RoleEnum
+
+# SQLite stores CURRENT_TIMESTAMP defaults like this, without fractional seconds
+SHARED_TIMESTAMP = "2026-10-18 13:49:13"
+
+
+@pytest.fixture
+def admin(make_user):
+    return make_user("admin", RoleEnum.admin)
+
+
+@pytest.fixture
+def reviews(db, make_user):
+    owner = make_user("owner", RoleEnum.restaurant_owner)
+    restaurant = RestaurantModel(name="Restaurant", location="Leeds", owner_id=owner.id, latitude=53.8, longitude=-1.55)
+    db.add(restaurant)
+    db.commit()
+    reviewers = [make_user(f"reviewer{n}") for n in range(6)]
+    reviews = [ReviewModel(restaurant_id=restaurant.id, user_id=reviewer.id, rating=4) for reviewer in reviewers]
+    db.add_all(reviews)
+    db.commit()
+    db.execute(update(ReviewModel).values(created_at=literal(SHARED_TIMESTAMP)))
+    db.commit()
+    return [review.id for review in reviews]
+
+
+def exported(client, admin, auth, kind, **params):
+    response = client.get(f"/api/export/{kind}", params=params, headers=auth(admin))
+    assert response.status_code == 200, response.text
+    return [json.loads(line) for line in response.text.splitlines()]
+
+
+@pytest.mark.parametrize("since, expected", [
+    ("2026-10-18T13:49:13", 6),
+    ("2026-10-18T13:49:12.999999", 6),
+    ("2026-10-18T13:49:13.000001", 0),
+    # Aware bounds compare in UTC, the zone the timestamps are stored in
+    ("2026-10-18T15:49:13+02:00", 6),
+    ("2026-10-18T15:49:13.000001+02:00", 0),
+    ("2026-10-18T08:49:14-05:00", 0),
+    ("2026-10-18T13:49:13Z", 6),
+])
+def test_since_is_inclusive_at_the_stored_timestamp(client, admin, auth, reviews, since, expected):
+    assert len(exported(client, admin, auth, "reviews", since=since)) == expected
+
+
+def test_since_matches_timestamps_stored_with_fractions(client, db, admin, auth, reviews):
+    since = datetime.fromisoformat(SHARED_TIMESTAMP) + timedelta(microseconds=500000)
+    db.execute(update(ReviewModel).where(ReviewModel.id == reviews[0]).values(created_at=since))
+    db.commit()
+
+    assert [row["id"] for row in exported(client, admin, auth, "reviews", since=since.isoformat())] == reviews[:1]
+
+
+def test_restaurant_export_includes_coordinates(client, admin, auth, reviews):
+    (restaurant,) = exported(client, admin, auth, "restaurants")
+
+    assert (restaurant["latitude"], restaurant["longitude"]) == (53.8, -1.55)
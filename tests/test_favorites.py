@@ -0,0 +1,48 @@
+import pytest
+from sqlalchemy import literal, update
+
+from models import FavoriteModel, RestaurantModel, RoleEnum
+from utils.pagination import encode_cursor
+
+# SQLite stores CURRENT_TIMESTAMP defaults like this, without fractional seconds
+SHARED_TIMESTAMP = "2026-10-18 13:49:13"
+
+
+@pytest.fixture
+def favorites(db, make_user):
+    owner = make_user("owner", RoleEnum.restaurant_owner)
+    user = make_user("diner")
+    restaurants = [RestaurantModel(name=f"Restaurant {n}", location="Leeds", owner_id=owner.id) for n in range(5)]
+    db.add_all(restaurants)
+    db.commit()
+    favorites = [FavoriteModel(user_id=user.id, restaurant_id=restaurant.id) for restaurant in restaurants]
+    db.add_all(favorites)
+    db.commit()
+    db.execute(update(FavoriteModel).values(created_at=literal(SHARED_TIMESTAMP)))
+    db.commit()
+    return user, [favorite.id for favorite in favorites]
+
+
+@pytest.mark.parametrize("limit", [1, 2, 3])
+def test_expanded_pages_cover_favorites_sharing_a_timestamp(client, auth, favorites, limit):
+    user, favorite_ids = favorites
+    ids, cursor = [], None
+    for _ in range(len(favorite_ids) + 1):
+        params = {"expand": "true", "limit": limit, **({"cursor": cursor} if cursor else {})}
+        page = client.get("/api/favorites", params=params, headers=auth(user)).json()
+        ids.extend(item["id"] for item in page["items"])
+        assert all(item["restaurant"]["id"] == item["restaurant_id"] for item in page["items"])
+        cursor = page["next_cursor"]
+        if cursor is None:
+            break
+
+    assert cursor is None
+    assert ids == sorted(favorite_ids, reverse=True)
+
+
+@pytest.mark.parametrize("values", [["not a timestamp", 1], [SHARED_TIMESTAMP, "1"], [SHARED_TIMESTAMP]])
+def test_tampered_cursor_is_rejected(client, auth, favorites, values):
+    user, _ = favorites
+    params = {"expand": "true", "cursor": encode_cursor(values)}
+
+    assert client.get("/api/favorites", params=params, headers=auth(user)).status_code == 400
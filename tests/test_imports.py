@@ -0,0 +1,36 @@
+import json
+
+import pytest
+
+from models import RestaurantModel, RoleEnum
+
+
+@pytest.fixture
+def admin(make_user):
+    return make_user("admin", RoleEnum.admin)
+
+
+def test_csv_fields_may_span_lines(client, db, auth, admin):
+    body = (
+        'name,location,description\r\n'
+        'Alpha,Leeds,"Two lines,\r\nwith a comma"\r\n'
+        'Beta,York\r\n'
+        '\r\n'
+        'Gamma,Hull,"He said ""hi""\nand left"\r\n'
+    )
+
+    report = client.post("/api/import/restaurants", params={"format": "csv"}, content=body, headers=auth(admin)).json()
+
+    assert (report["rows"], report["inserted"]) == (3, 2)
+    assert report["errors"] == [{"row": 4, "error": "Expected 3 columns, got 2"}]
+    descriptions = dict(db.query(RestaurantModel.name, RestaurantModel.description))
+    assert descriptions == {"Alpha": "Two lines,\r\nwith a comma", "Gamma": 'He said "hi"\nand left'}
+
+
+def test_bad_ndjson_lines_are_reported_by_line(client, auth, admin):
+    body = "\n".join([json.dumps({"name": "Alpha", "location": "Leeds"}), "not json", "", "[1]", json.dumps({"name": "Beta"})])
+
+    report = client.post("/api/import/restaurants", content=body, headers=auth(admin)).json()
+
+    assert (report["rows"], report["inserted"], report["failed"]) == (4, 1, 3)
+    assert [error["row"] for error in report["errors"]] == [2, 4, 5]
@@ -0,0 +1,121 @@
+import asyncio
+import json
+import time
+
+import pytest
+from sqlalchemy import event, literal, update
+
+from controllers import notification_stream
+from database import engine
+from models import NotificationModel, RestaurantModel, RoleEnum
+from utils.pagination import encode_cursor
+from utils.pubsub import PostgresBroker
+
+# SQLite stores CURRENT_TIMESTAMP defaults like this, without fractional seconds
+SHARED_TIMESTAMP = "2026-10-18 13:49:13"
+
+
+@pytest.fixture
+def owner(db, make_user):
+    return make_user("owner", RoleEnum.restaurant_owner)
+
+
+@pytest.fixture
+def add_notifications(db, owner, make_user):
+    reviewer = make_user("reviewer")
+    restaurants = [RestaurantModel(name=f"Restaurant {n}", location="Leeds", owner_id=owner.id) for n in range(3)]
+    db.add_all(restaurants)
+    db.commit()
+
+    def add(count):
+        notifications = [
+            NotificationModel(restaurant_id=restaurants[n % 3].id, user_id=reviewer.id, rating=n % 5 + 1, message="New review")
+            for n in range(count)
+        ]
+        db.add_all(notifications)
+        db.commit()
+        return [notification.id for notification in notifications]
+    return add
+
+
+@pytest.fixture
+def statements():
+    executed = []
+
+    def record(conn, cursor, statement, parameters, context, executemany):
+        executed.append(statement)
+
+    event.listen(engine, "after_cursor_execute", record)
+    yield executed
+    event.remove(engine, "after_cursor_execute", record)
+
+
+def test_page_statement_count_does_not_grow_with_notifications(client, auth, owner, add_notifications, statements):
+    headers = auth(owner)
+    counts = []
+    for count in (3, 30, 90):
+        add_notifications(count)
+        client.get("/api/notifications/", headers=headers)  # loads the user into the cache
+        statements.clear()
+        response = client.get("/api/notifications/", params={"limit": 100}, headers=headers)
+        assert response.status_code == 200
+        counts.append(len(statements))
+
+    assert counts == [counts[0]] * 3
+
+
+@pytest.mark.parametrize("limit", [1, 2, 5])
+def test_pages_cover_notifications_sharing_a_timestamp(client, db, auth, owner, add_notifications, limit):
+    notification_ids = add_notifications(7)
+    db.execute(update(NotificationModel).values(created_at=literal(SHARED_TIMESTAMP)))
+    db.commit()
+
+    ids, cursor = [], None
+    for _ in range(len(notification_ids) + 1):
+        params = {"limit": limit, **({"cursor": cursor} if cursor else {})}
+        page = client.get("/api/notifications/", params=params, headers=auth(owner)).json()
+        ids.extend(item["id"] for item in page["items"])
+        cursor = page["next_cursor"]
+        if cursor is None:
+            break
+
+    assert cursor is None
+    assert ids == sorted(notification_ids, reverse=True)
+
+
+@pytest.mark.parametrize("values", [["not a timestamp", 1], [SHARED_TIMESTAMP, None], [1, 2, 3]])
+def test_tampered_cursor_is_rejected(client, auth, owner, values):
+    response = client.get("/api/notifications/", params={"cursor": encode_cursor(values)}, headers=auth(owner))
+
+    assert response.status_code == 400
+
+
+def test_stream_replays_the_newest_notifications_after_a_reset(owner, add_notifications, monkeypatch):
+    monkeypatch.setattr(notification_stream, "notification_replay_limit", 3)
+    notification_ids = add_notifications(8)
+
+    async def first_messages(count):
+        events = notification_stream._notification_events(owner.id, notification_ids[0])
+        try:
+            return [await events.__anext__() for _ in range(count)]
+        finally:
+            await events.aclose()
+
+    messages = asyncio.run(first_messages(5))
+
+    assert messages[1].startswith("event: reset")
+    replayed = [json.loads(message.split("data: ", 1)[1])["id"] for message in messages[2:]]
+    assert replayed == notification_ids[-3:]
+
+
+def test_failed_pg_notify_is_retried_then_counted(caplog):
+    # SQLite has no pg_notify, so every attempt fails
+    broker = PostgresBroker(retries=2, backoff=0)
+    broker.publish("owner:1", {"id": 1, "message": "New review"})
+
+    deadline = time.monotonic() + 5
+    while broker.stats()["failed"] == 0 and time.monotonic() < deadline:
+        time.sleep(0.01)
+
+    assert broker.stats() == {"pending": 0, "sent": 0, "failed": 1}
+    assert "failed after 3 attempts" in caplog.text
@@ -0,0 +1,87 @@
+import pytest
+from sqlalchemy import literal, update
+
+from models import RoleEnum, RestaurantModel
+from utils.pagination import encode_cursor
+
+# SQLite stores CURRENT_TIMESTAMP defaults like this, without fractional seconds
+SHARED_TIMESTAMP = "2026-10-18 13:49:13"
+
+
+def walk(client, path, params, headers=None):
+    """Every id a client sees following next_cursor from the first page"""
+    ids, cursor = [], None
+    for _ in range(100):
+        response = client.get(path, params={**params, **({"cursor": cursor} if cursor else {})}, headers=headers)
+        assert response.status_code == 200, response.text
+        page = response.json()
+        ids.extend(item["id"] for item in page["items"])
+        cursor = page["next_cursor"]
+        if cursor is None:
+            return ids
+    pytest.fail(f"{path} kept returning a next_cursor")
+
+
+@pytest.fixture
+def restaurants(db, make_user):
+    owner = make_user("owner", RoleEnum.restaurant_owner)
+    restaurants = [RestaurantModel(name=f"Restaurant {n}", location="Leeds", owner_id=owner.id) for n in range(6)]
+    db.add_all(restaurants)
+    db.commit()
+    return [restaurant.id for restaurant in restaurants]
+
+
+def set_created_at(db, ids, value):
+    db.execute(update(RestaurantModel).where(RestaurantModel.id.in_(ids)).values(created_at=literal(value)))
+    db.commit()
+
+
+@pytest.mark.parametrize("order", ["desc", "asc"])
+@pytest.mark.parametrize("limit", [1, 2, 4])
+def test_created_at_pages_cover_rows_sharing_a_timestamp(client, db, restaurants, order, limit):
+    set_created_at(db, restaurants, SHARED_TIMESTAMP)
+
+    ids = walk(client, "/api/restaurants", {"order": order, "limit": limit})
+
+    assert ids == sorted(restaurants, reverse=order == "desc")
+
+
+@pytest.mark.parametrize("order", ["desc", "asc"])
+def test_created_at_pages_match_one_page_across_stored_formats(client, db, restaurants, order):
+    # Server defaults and bound datetimes side by side, some for the same second
+    for ids, value in [
+        (restaurants[:2], SHARED_TIMESTAMP),
+        (restaurants[2:4], SHARED_TIMESTAMP + ".000000"),
+        (restaurants[4:5], SHARED_TIMESTAMP + ".500000"),
+        (restaurants[5:], "2026-10-18 13:49:12"),
+    ]:
+        set_created_at(db, ids, value)
+
+    one_page = [item["id"] for item in client.get("/api/restaurants", params={"order": order}).json()["items"]]
+    ids = walk(client, "/api/restaurants", {"order": order, "limit": 1})
+
+    assert ids == one_page
+    assert sorted(ids) == restaurants
+
+
+@pytest.mark.parametrize("sort", ["name", "rating"])
+def test_other_sorts_walk_every_row(client, restaurants, sort):
+    assert sorted(walk(client, "/api/restaurants", {"sort": sort, "limit": 2})) == restaurants
+
+
+@pytest.mark.parametrize("values", [
+    ["created_at", "desc", "not a timestamp", 1],
+    ["created_at", "desc", "2026-10-18 13:49:13", "1"],
+    ["created_at", "desc", None, 1],
+    ["name", "asc", 5, 1],
+    ["name", "asc", ["Restaurant"], 1],
+    ["name", "asc", None, 1],
+    ["rating", "desc", "4.5", 1],
+    ["rating", "desc", True, 1],
+    ["rating", "desc", {"avg": 4.5}, 1],
+    ["rating", "desc", None, 1],
+])
+def test_tampered_cursor_is_rejected(client, restaurants, values):
+    response = client.get("/api/restaurants", params={"sort": values[0], "order": values[1], "cursor": encode_cursor(values)})
+
+    assert response.status_code == 400
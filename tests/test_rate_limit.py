@@ -0,0 +1,70 @@
+import pytest
+from starlette.applications import Starlette
+from starlette.responses import PlainTextResponse
+from starlette.routing import Route
+from starlette.testclient import TestClient
+
+from utils.rate_limit import MemoryRateLimitStore, RateLimitMiddleware, RateLimitRule, RateLimitStats
+
+
+class Clock:
+    now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_memory_store_takes_from_every_bucket_or_none():
+    clock = Clock()
+    store = MemoryRateLimitStore(clock=clock)
+    roomy, tight = ("roomy", 1.0, 5), ("tight", 0.5, 1)
+
+    assert store.consume([roomy, tight]) == [0.0, 0.0]
+    assert store.consume([roomy, tight]) == [0.0, 2.0]
+    assert store.consume([roomy, tight]) == [0.0, 2.0]
+    # The refused requests left roomy's tokens alone: 4 of 5 are still there
+    assert [store.consume([roomy])[0] for _ in range(5)] == [0.0] * 4 + [1.0]
+
+    clock.now = 2.0
+    assert store.consume([tight]) == [0.0]
+
+
+@pytest.fixture
+def limited_client():
+    async def ok(request):
+        return PlainTextResponse("ok")
+
+    rules = [
+        RateLimitRule("POST", "/reviews", per="user", rate=1, period=3600, burst=3),
+        RateLimitRule("POST", "/reviews", per="ip", rate=1, period=3600, burst=1),
+    ]
+    stats = RateLimitStats()
+    app = RateLimitMiddleware(
+        Starlette(routes=[Route("/reviews", ok, methods=["POST"])]),
+        rules=rules, store=MemoryRateLimitStore(), trust_forwarded_for=True, stats=stats,
+    )
+    return TestClient(app), rules, stats
+
+
+def test_request_refused_by_one_rule_spends_no_other_tokens(limited_client, make_user, auth):
+    client, rules, stats = limited_client
+    headers = auth(make_user("diner"))
+
+    def post(ip):
+        return client.post("/reviews", headers={**headers, "X-Forwarded-For": ip}).status_code
+
+    assert post("10.0.0.1") == 200
+    assert [post("10.0.0.1") for _ in range(3)] == [429] * 3
+    # Still two of the user's three tokens left, from another address
+    assert [post("10.0.0.2"), post("10.0.0.3"), post("10.0.0.4")] == [200, 200, 429]
+    assert stats.limited == {rules[1].name: 3, rules[0].name: 1}
+
+
+def test_refusal_sets_retry_after_from_the_longest_wait(limited_client):
+    client, _, _ = limited_client
+
+    client.post("/reviews")
+    response = client.post("/reviews")
+
+    assert response.status_code == 429
+    assert response.headers["retry-after"] == "3600"
@@ -0,0 +1,57 @@
+from starlette.requests import Request
+
+from database import SessionLocal
+from models import CategoryModel
+from utils.response_cache import cache_key
+
+
+def request(query_string: bytes) -> Request:
+    return Request({"type": "http", "method": "GET", "path": "/api/restaurants", "query_string": query_string, "headers": []})
+
+
+def test_cache_key_escapes_values_that_look_like_parameters():
+    smuggled = cache_key(request(b"location=Foo%26owner_id%3D1"))
+    separate = cache_key(request(b"location=Foo&owner_id=1"))
+
+    assert smuggled != separate
+    assert cache_key(request(b"owner_id=1&location=Foo")) == separate
+
+
+def category_names(client):
+    return [category["category"] for category in client.get("/api/categories").json()]
+
+
+def test_category_change_is_evicted_on_commit_not_flush(client, db):
+    category = CategoryModel(category="Thai")
+    db.add(category)
+    db.commit()
+    assert category_names(client) == ["Thai"]
+
+    editor = SessionLocal()
+    try:
+        editor.get(CategoryModel, category.id).category = "Vietnamese"
+        editor.flush()
+        # A request between the flush and the commit caches the committed row again
+        assert category_names(client) == ["Thai"]
+
+        editor.commit()
+    finally:
+        editor.close()
+
+    assert category_names(client) == ["Vietnamese"]
+
+
+def test_rolled_back_category_change_evicts_nothing(client, db):
+    db.add(CategoryModel(category="Thai"))
+    db.commit()
+    category_names(client)
+
+    editor = SessionLocal()
+    try:
+        editor.add(CategoryModel(category="Greek"))
+        editor.flush()
+        editor.rollback()
+    finally:
+        editor.close()
+
+    assert client.get("/api/categories").headers["X-Cache"] == "HIT"
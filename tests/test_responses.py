@@ -0,0 +1,15 @@
+from utils import responses
+
+
+def test_fast_json_warns_when_fastapi_ignores_it(monkeypatch, caplog):
+    monkeypatch.setattr(responses, "PYDANTIC_WRITES_JSON", True)
+
+    assert responses.default_response_class(True) is not responses.FastJSONResponse
+    assert "FAST_JSON is ignored" in caplog.text
+
+
+def test_fast_json_uses_orjson_where_fastapi_would_use_json_dumps(monkeypatch, caplog):
+    monkeypatch.setattr(responses, "PYDANTIC_WRITES_JSON", False)
+
+    assert responses.default_response_class(True) is responses.FastJSONResponse
+    assert caplog.text == ""
@@ -0,0 +1,46 @@
+from controllers import users
+from database import engine
+from models import UserModel
+from utils.passwords import hash_password_async, verify_password_async
+
+
+def test_register_then_login(client, db):
+    registered = client.post("/api/register", json={
+        "username": "diner", "email": "diner@example.com", "password": "correct horse", "role": "user",
+    })
+    assert registered.status_code == 200, registered.text
+    assert db.query(UserModel).filter_by(username="diner").one().password_hash.startswith("$2")
+
+    assert client.post("/api/register", json={
+        "username": "diner", "email": "other@example.com", "password": "correct horse", "role": "user",
+    }).status_code == 409
+    assert client.post("/api/login", json={"username": "diner", "password": "wrong"}).status_code == 400
+    logged_in = client.post("/api/login", json={"username": "diner", "password": "correct horse"})
+    assert logged_in.status_code == 200
+    assert logged_in.json()["token"]
+
+
+def test_bcrypt_runs_without_a_checked_out_connection(client, db, monkeypatch):
+    in_use = []
+
+    async def hash_password(password):
+        in_use.append(engine.pool.checkedout())
+        return await hash_password_async(password)
+
+    async def verify_password(password, password_hash):
+        in_use.append(engine.pool.checkedout())
+        is_valid, _ = await verify_password_async(password, password_hash)
+        # Pretend the bcrypt cost changed so the login writes a rehash
+        return is_valid, "rehashed"
+
+    monkeypatch.setattr(users, "hash_password_async", hash_password)
+    monkeypatch.setattr(users, "verify_password_async", verify_password)
+    db.close()
+
+    assert client.post("/api/register", json={
+        "username": "diner", "email": "diner@example.com", "password": "correct horse", "role": "user",
+    }).status_code == 200
+    assert client.post("/api/login", json={"username": "diner", "password": "correct horse"}).status_code == 200
+
+    assert in_use == [0, 0]
+    assert db.query(UserModel).filter_by(username="diner").one().password_hash == "rehashed"
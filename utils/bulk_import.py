@@ -0,0 +1,384 @@
+import csv
+import json
+from collections import defaultdict
+
+from pydantic import ValidationError
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from models.category import CategoryModel, restaurant_categories
+from models.restaurant import RestaurantModel
+from models.review import ReviewModel
+from models.user import UserModel
+from serializers.restaurant import RestaurantCreateSchema
+from serializers.review import ReviewCreateSchema
+from utils.geo import geohash_for
+from utils.ratings import apply_rating_counts
+from utils.search import refresh_search_documents, reindex_all
+from utils.sql import dialect_insert
+from utils.response_cache import response_cache
+
+BATCH_SIZE = 1000
+MAX_REPORTED_ERRORS = 1000
+FORMATS = ("ndjson", "csv")
+KINDS = ("restaurants", "categories", "reviews")
+
+
+class ImportReport:
+    """Running totals for one import; only the first MAX_REPORTED_ERRORS errors are kept"""
+
+    def __init__(self):
+        self.rows = 0
+        self.inserted = 0
+        self.failed = 0
+        self.errors = []
+
+    def error(self, row: int, message: str):
+        self.failed += 1
+        if len(self.errors) < MAX_REPORTED_ERRORS:
+            self.errors.append({"row": row, "error": message})
+
+    def as_dict(self):
+        return {"rows": self.rows, "inserted": self.inserted, "failed": self.failed, "errors": self.errors}
+
+
+class RecordParser:
+    """Turns input text into dicts: one record per line for NDJSON, one per CSV record.
+
+    A CSV record may span several lines inside a quoted field, so the whole
+    input goes through one csv.reader; its header is the first record.
+    """
+
+    def __init__(self, fmt: str):
+        if fmt not in FORMATS:
+            raise ValueError(f"Unsupported format: {fmt}")
+        self.fmt = fmt
+
+    def records(self, lines):
+        """Yield (line number, dict) for each record of lines, or (line number, ValueError) for a bad one.
+
+        Blank lines are skipped; line numbers are where each record starts.
+        """
+        if self.fmt == "ndjson":
+            yield from self._ndjson_records(lines)
+        else:
+            yield from self._csv_records(lines)
+
+    def _ndjson_records(self, lines):
+        for line_number, line in enumerate(lines, 1):
+            if not line.strip():
+                continue
+            try:
+                record = json.loads(line)
+            except ValueError as e:
+                yield line_number, e
+                continue
+            if not isinstance(record, dict):
+                yield line_number, ValueError("Expected a JSON object")
+                continue
+            yield line_number, record
+
+    def _csv_records(self, lines):
+        reader = csv.reader(lines)
+        header = None
+        while True:
+            line_number = reader.line_num + 1
+            try:
+                values = next(reader)
+            except StopIteration:
+                return
+            except csv.Error as e:
+                yield line_number, ValueError(str(e))
+                continue
+            if not any(value.strip() for value in values):
+                continue
+            if header is None:
+                header = [name.strip() for name in values]
+                continue
+            if len(values) != len(header):
+                yield line_number, ValueError(f"Expected {len(header)} columns, got {len(values)}")
+                continue
+            yield line_number, {name: value for name, value in zip(header, values) if value != ""}
+
+
+def _validation_message(error: ValidationError) -> str:
+    first = error.errors()[0]
+    field = ".".join(str(part) for part in first["loc"])
+    return f"{field}: {first['msg']}" if field else first["msg"]
+
+
+def _split(value):
+    """List fields arrive as JSON arrays (NDJSON) or ';'-separated strings (CSV)"""
+    if value is None:
+        return []
+    if isinstance(value, list):
+        return value
+    return [part.strip() for part in str(value).split(";") if part.strip()]
+
+
+def ensure_categories(db: Session, names):
+    """Map category names to ids, creating the missing ones in one statement"""
+    names = set(names)
+    if not names:
+        return {}
+    db.execute(
+        dialect_insert(db, CategoryModel.__table__).on_conflict_do_nothing(index_elements=["category"]),
+        [{"category": name} for name in names],
+    )
+    rows = db.execute(select(CategoryModel.category, CategoryModel.id).where(CategoryModel.category.in_(names)))
+    return dict(rows.all())
+
+
+def import_categories(db: Session, records, report: ImportReport):
+    names = {}
+    for row, record in records:
+        name = str(record.get("category") or record.get("name") or "").strip()
+        if not name:
+            report.error(row, "Missing category name")
+        elif name in names:
+            report.error(row, f"Duplicate category in input: {name}")
+        else:
+            names[name] = row
+
+    if not names:
+        return
+
+    existing = set(db.execute(select(CategoryModel.category).where(CategoryModel.category.in_(names))).scalars())
+    for name in existing:
+        report.error(names.pop(name), f"Category already exists: {name}")
+
+    ensure_categories(db, names)
+    report.inserted += len(names)
+
+
+def import_restaurants(db: Session, records, report: ImportReport, owner_id: int, allow_owner_override: bool = False):
+    valid = []
+    for row, record in records:
+        record = dict(record)
+        category_names = _split(record.pop("categories", None))
+        record["category_ids"] = _split(record.get("category_ids"))
+        try:
+            restaurant = RestaurantCreateSchema(**record)
+        except ValidationError as e:
+            report.error(row, _validation_message(e))
+            continue
+
+        restaurant_owner = owner_id
+        if allow_owner_override and record.get("owner_id"):
+            try:
+                restaurant_owner = int(record["owner_id"])
+            except (TypeError, ValueError):
+                report.error(row, "Invalid owner_id")
+                continue
+
+        valid.append((row, restaurant, category_names, restaurant_owner))
+
+    if not valid:
+        return
+
+    # Resolve every category reference in the batch with two queries
+    category_ids_by_name = ensure_categories(db, [name for _, _, names, _ in valid for name in names])
+    referenced_ids = {category_id for _, restaurant, _, _ in valid for category_id in restaurant.category_ids}
+    known_ids = set()
+    if referenced_ids:
+        known_ids = set(db.execute(select(CategoryModel.id).where(CategoryModel.id.in_(referenced_ids))).scalars())
+
+    owner_ids = {restaurant_owner for *_, restaurant_owner in valid}
+    known_owners = set(db.execute(select(UserModel.id).where(UserModel.id.in_(owner_ids))).scalars())
+
+    rows_by_name = {}
+    values = []
+    for row, restaurant, category_names, restaurant_owner in valid:
+        unknown = set(restaurant.category_ids) - known_ids
+        if unknown:
+            report.error(row, f"Unknown category ids: {sorted(unknown)}")
+            continue
+        if restaurant_owner not in known_owners:
+            report.error(row, f"Unknown owner_id: {restaurant_owner}")
+            continue
+        if restaurant.name in rows_by_name:
+            report.error(row, f"Duplicate restaurant in input: {restaurant.name}")
+            continue
+
+        category_ids = set(restaurant.category_ids) | {category_ids_by_name[name] for name in category_names}
+        rows_by_name[restaurant.name] = (row, category_ids)
+        values.append({
+            **restaurant.dict(exclude={"category_ids"}),
+            "owner_id": restaurant_owner,
+            "geohash": geohash_for(restaurant.latitude, restaurant.longitude),
+        })
+
+    if not values:
+        return
+
+    inserted = db.execute(
+        dialect_insert(db, RestaurantModel.__table__)
+        .on_conflict_do_nothing(index_elements=["name"])
+        .returning(RestaurantModel.id, RestaurantModel.name),
+        values,
+    ).all()
+    ids_by_name = {name: restaurant_id for restaurant_id, name in inserted}
+
+    links = []
+    for name, (row, category_ids) in rows_by_name.items():
+        restaurant_id = ids_by_name.get(name)
+        if restaurant_id is None:
+            report.error(row, f"Restaurant already exists: {name}")
+            continue
+        links.extend({"restaurant_id": restaurant_id, "category_id": category_id} for category_id in category_ids)
+
+    if links:
+        db.execute(restaurant_categories.insert(), links)
+
+    refresh_search_documents(db, list(ids_by_name.values()))
+    report.inserted += len(ids_by_name)
+
+
+def import_reviews(db: Session, records, report: ImportReport):
+    valid = []
+    for row, record in records:
+        try:
+            review = ReviewCreateSchema(**record)
+        except ValidationError as e:
+            report.error(row, _validation_message(e))
+            continue
+        valid.append((row, record, review))
+
+    if not valid:
+        return
+
+    # Restaurants and users may be referenced by id or by name
+    restaurant_names = {str(r["restaurant"]) for _, r, _ in valid if "restaurant" in r and "restaurant_id" not in r}
+    usernames = {str(r["username"]) for _, r, _ in valid if "username" in r and "user_id" not in r}
+    restaurant_ids_by_name = dict(db.execute(
+        select(RestaurantModel.name, RestaurantModel.id).where(RestaurantModel.name.in_(restaurant_names))
+    ).all()) if restaurant_names else {}
+    user_ids_by_name = dict(db.execute(
+        select(UserModel.username, UserModel.id).where(UserModel.username.in_(usernames))
+    ).all()) if usernames else {}
+
+    resolved = []
+    for row, record, review in valid:
+        try:
+            restaurant_id = int(record["restaurant_id"]) if "restaurant_id" in record else restaurant_ids_by_name.get(str(record.get("restaurant")))
+            user_id = int(record["user_id"]) if "user_id" in record else user_ids_by_name.get(str(record.get("username")))
+        except (TypeError, ValueError):
+            report.error(row, "Invalid restaurant_id or user_id")
+            continue
+        if restaurant_id is None or user_id is None:
+            report.error(row, "Unknown restaurant or user")
+            continue
+        resolved.append((row, restaurant_id, user_id, review))
+
+    known_restaurants = set(db.execute(
+        select(RestaurantModel.id).where(RestaurantModel.id.in_({r for _, r, _, _ in resolved}))
+    ).scalars()) if resolved else set()
+    known_users = set(db.execute(
+        select(UserModel.id).where(UserModel.id.in_({u for _, _, u, _ in resolved}))
+    ).scalars()) if resolved else set()
+
+    rows_by_key = {}
+    values = []
+    for row, restaurant_id, user_id, review in resolved:
+        if restaurant_id not in known_restaurants or user_id not in known_users:
+            report.error(row, "Unknown restaurant or user")
+            continue
+        if (user_id, restaurant_id) in rows_by_key:
+            report.error(row, "Duplicate review in input")
+            continue
+        rows_by_key[(user_id, restaurant_id)] = row
+        values.append({**review.dict(), "user_id": user_id, "restaurant_id": restaurant_id})
+
+    if not values:
+        return
+
+    inserted = db.execute(
+        dialect_insert(db, ReviewModel.__table__)
+        .on_conflict_do_nothing(index_elements=["user_id", "restaurant_id"])
+        .returning(ReviewModel.user_id, ReviewModel.restaurant_id, ReviewModel.rating),
+        values,
+    ).all()
+
+    inserted_keys = set()
+    counts = defaultdict(lambda: defaultdict(int))
+    for user_id, restaurant_id, rating in inserted:
+        inserted_keys.add((user_id, restaurant_id))
+        counts[restaurant_id][rating] += 1
+
+    for key, row in rows_by_key.items():
+        if key not in inserted_keys:
+            report.error(row, "User has already reviewed this restaurant")
+
+    for restaurant_id, restaurant_counts in counts.items():
+        apply_rating_counts(db, restaurant_id, restaurant_counts)
+
+    report.inserted += len(inserted)
+
+
+def import_batch(db: Session, kind: str, records, report: ImportReport, owner_id: int = None, allow_owner_override: bool = False):
+    """Validate and insert one batch of (row_number, record) pairs in its own transaction"""
+    inserted, failed, reported = report.inserted, report.failed, len(report.errors)
+    try:
+        if kind == "restaurants":
+            import_restaurants(db, records, report, owner_id, allow_owner_override)
+        elif kind == "categories":
+            import_categories(db, records, report)
+        elif kind == "reviews":
+            import_reviews(db, records, report)
+        else:
+            raise ValueError(f"Unsupported import kind: {kind}")
+        db.commit()
+    except ValueError:
+        db.rollback()
+        raise
+    except Exception as e:
+        db.rollback()
+        # Nothing from this batch was kept, so report every row of it as failed
+        report.inserted, report.failed = inserted, failed
+        del report.errors[reported:]
+        for row, _ in records:
+            report.error(row, f"Batch failed: {e.__class__.__name__}")
+
+
+class StreamImporter:
+    """Parses input lines with RecordParser and imports them BATCH_SIZE records at a time"""
+
+    def __init__(self, kind: str, fmt: str, owner_id: int = None, allow_owner_override: bool = False, batch_size: int = BATCH_SIZE):
+        if kind not in KINDS:
+            raise ValueError(f"Unsupported import kind: {kind}")
+        self.kind = kind
+        self.parser = RecordParser(fmt)
+        self.owner_id = owner_id
+        self.allow_owner_override = allow_owner_override
+        self.batch_size = batch_size
+        self.report = ImportReport()
+        self.pending = []
+
+    def run(self, db: Session, lines, on_batch=None):
+        """Import every record of lines (an iterable of text lines, with their line endings).
+
+        on_batch(report) is called after each full batch is written.
+        """
+        for line_number, record in self.parser.records(lines):
+            self.report.rows += 1
+            if isinstance(record, ValueError):
+                self.report.error(line_number, str(record))
+                continue
+            self.pending.append((line_number, record))
+            if len(self.pending) >= self.batch_size:
+                self.flush(db)
+                if on_batch is not None:
+                    on_batch(self.report)
+        return self.finish(db)
+
+    def flush(self, db: Session):
+        if self.pending:
+            import_batch(db, self.kind, self.pending, self.report, self.owner_id, self.allow_owner_override)
+            self.pending = []
+
+    def finish(self, db: Session):
+        """Import the last partial batch and drop in-process state the import made stale"""
+        self.flush(db)
+        reindex_all(db)
+        response_cache.clear()
+        return self.report
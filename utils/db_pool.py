@@ -0,0 +1,91 @@
+import threading
+import time
+from weakref import WeakKeyDictionary
+
+from sqlalchemy import event
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+from sqlalchemy.pool import QueuePool
+
+# Checkout stats of each instrumented engine; kept off the pool so they survive engine.dispose()
+_checkout_stats = WeakKeyDictionary()
+
+
+class PoolStats:
+    """Checkout counters for one pool"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.checkouts = 0
+        self.timeouts = 0
+        self.connections_opened = 0
+        self.wait_total = 0.0
+        self.wait_max = 0.0
+        self.wait_last = 0.0
+
+    def record(self, waited: float, timed_out: bool = False):
+        with self._lock:
+            if timed_out:
+                self.timeouts += 1
+            else:
+                self.checkouts += 1
+            self.wait_total += waited
+            self.wait_last = waited
+            if waited > self.wait_max:
+                self.wait_max = waited
+
+    def opened(self):
+        with self._lock:
+            self.connections_opened += 1
+
+    def snapshot(self):
+        with self._lock:
+            attempts = self.checkouts + self.timeouts
+            return {
+                "checkouts": self.checkouts,
+                "timeouts": self.timeouts,
+                "connections_opened": self.connections_opened,
+                "wait_avg_ms": self.wait_total / attempts * 1000 if attempts else 0.0,
+                "wait_max_ms": self.wait_max * 1000,
+                "wait_last_ms": self.wait_last * 1000,
+            }
+
+
+def instrument_engine(engine):
+    """Time how long each engine.connect() waits for a pooled connection, using only public hooks
+
+    Sessions and AsyncEngines check connections out through engine.connect() too, so wrapping it on
+    this engine covers every checkout; the pool's connect event counts connections newly opened.
+    """
+    stats = PoolStats()
+    connect = engine.connect
+
+    def timed_connect():
+        start = time.perf_counter()
+        try:
+            connection = connect()
+        except PoolTimeoutError:
+            stats.record(time.perf_counter() - start, timed_out=True)
+            raise
+        stats.record(time.perf_counter() - start)
+        return connection
+
+    engine.connect = timed_connect
+    event.listen(engine, "connect", lambda dbapi_connection, connection_record: stats.opened())
+    _checkout_stats[engine] = stats
+    return engine
+
+
+def describe_pool(engine):
+    """Live occupancy of an engine's pool plus its checkout wait stats"""
+    pool = engine.pool
+    stats = {"pool": type(pool).__name__}
+    if isinstance(pool, QueuePool):
+        stats.update({
+            "size": pool.size(),
+            "checked_in": pool.checkedin(),
+            "in_use": pool.checkedout(),
+            "overflow": max(pool.overflow(), 0),
+        })
+    if engine in _checkout_stats:
+        stats.update(_checkout_stats[engine].snapshot())
+    return stats
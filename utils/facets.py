@@ -0,0 +1,119 @@
+import json
+
+from sqlalchemy import String, and_, case, cast, func, literal, null, select, union_all
+
+from models.category import CategoryModel, restaurant_categories
+from models.restaurant import RestaurantModel
+from serializers.restaurant import RestaurantFacetsSchema
+from utils.response_cache import response_cache, render
+
+# Only the most common locations are returned; free-form addresses would otherwise make one facet per row
+LOCATION_FACET_LIMIT = 20
+
+
+def category_filter(category, match: str = "any"):
+    """WHERE clause for restaurants in any (OR) or all (AND) of the category ids"""
+    category_ids = sorted(set(category))
+
+    def in_category(*ids):
+        return (
+            select(restaurant_categories)
+            .where(
+                restaurant_categories.c.restaurant_id == RestaurantModel.id,
+                restaurant_categories.c.category_id.in_(ids)
+            )
+            .exists()
+        )
+
+    if match == "all":
+        # One primary-key probe per category and candidate row
+        return and_(*(in_category(category_id) for category_id in category_ids))
+    return in_category(*category_ids)
+
+
+def rating_bucket(average, review_count):
+    return case(
+        (review_count == 0, "unrated"),
+        (average >= 5, "5"),
+        (average >= 4, "4"),
+        (average >= 3, "3"),
+        (average >= 2, "2"),
+        else_="1",
+    )
+
+
+def facets_statement(clauses):
+    """One aggregate query counting the restaurants matching clauses by category, rating bucket and location.
+
+    Rows are (facet, value, label, count); facet is "total", "category",
+    "rating" or "location".
+    """
+    matched = (
+        select(RestaurantModel.id, RestaurantModel.avg_rating, RestaurantModel.review_count, RestaurantModel.location)
+        .where(*clauses)
+        .cte("matched")
+    )
+    count = func.count().label("count")
+
+    total = select(literal("total").label("facet"), null().label("value"), null().label("label"), count).select_from(matched)
+
+    categories = (
+        select(
+            literal("category"),
+            cast(restaurant_categories.c.category_id, String),
+            CategoryModel.category,
+            count,
+        )
+        .select_from(matched)
+        .join(restaurant_categories, restaurant_categories.c.restaurant_id == matched.c.id)
+        .join(CategoryModel, CategoryModel.id == restaurant_categories.c.category_id)
+        .group_by(restaurant_categories.c.category_id, CategoryModel.category)
+    )
+
+    bucket = rating_bucket(matched.c.avg_rating, matched.c.review_count)
+    ratings = select(literal("rating"), bucket, null(), count).select_from(matched).group_by(bucket)
+
+    # Compound members cannot carry their own LIMIT on every database, so the top locations go in a subquery
+    top_locations = (
+        select(matched.c.location, count)
+        .group_by(matched.c.location)
+        .order_by(count.desc(), matched.c.location)
+        .limit(LOCATION_FACET_LIMIT)
+        .subquery()
+    )
+    locations = select(literal("location"), top_locations.c.location, null(), top_locations.c.count)
+
+    return union_all(total, categories, ratings, locations)
+
+
+def facet_counts(rows):
+    """Shape facets_statement rows as RestaurantFacetsSchema data"""
+    facets = {"total": 0, "categories": [], "ratings": {}, "locations": []}
+    for facet, value, label, count in rows:
+        if facet == "total":
+            facets["total"] = count
+        elif facet == "category":
+            facets["categories"].append({"id": int(value), "category": label, "count": count})
+        elif facet == "rating":
+            facets["ratings"][value] = count
+        else:
+            facets["locations"].append({"location": value, "count": count})
+    facets["categories"].sort(key=lambda item: (-item["count"], item["category"]))
+    facets["locations"].sort(key=lambda item: (-item["count"], item["location"]))
+    return facets
+
+
+def facets_cache_key(location, owner_id, category, match) -> str:
+    """Facets depend on the filters only, so every page and sort order of one browse shares them"""
+    category_ids = ",".join(str(category_id) for category_id in sorted(set(category or ())))
+    return f"facets?category={category_ids}&location={location or ''}&match={match}&owner_id={owner_id or ''}"
+
+
+def get_cached_facets(key: str):
+    body = response_cache.get(key)
+    return json.loads(body) if body is not None else None
+
+
+def cache_facets(key: str, facets: dict):
+    # Review writes move rating buckets and restaurant writes move every count; both evict "restaurants"
+    response_cache.set(key, render(RestaurantFacetsSchema, facets), ["restaurants", "categories"])
@@ -0,0 +1,67 @@
+from functools import lru_cache
+from typing import List
+
+from fastapi import HTTPException
+from pydantic import create_model
+from sqlalchemy import select
+
+from models.category import restaurant_categories
+from models.restaurant import RestaurantModel
+from serializers.restaurant import RestaurantSchema, RestaurantPageSchema
+
+# Fields computed from several columns; every other RestaurantSchema field is the column of the same name
+DERIVED_FIELDS = {
+    "rating_histogram": tuple(f"rating_{star}_count" for star in range(1, 6)),
+}
+
+
+def parse_fields(fields):
+    """RestaurantSchema field names from a comma-separated fields= value, in schema order.
+
+    id is always included: cursors and cache tags are built from it.
+    """
+    if fields is None:
+        return None
+    requested = {name.strip() for name in fields.split(",") if name.strip()}
+    unknown = requested - RestaurantSchema.model_fields.keys()
+    if unknown:
+        raise HTTPException(status_code=400, detail=f"Unknown fields: {', '.join(sorted(unknown))}")
+    requested.add("id")
+    return tuple(name for name in RestaurantSchema.model_fields if name in requested)
+
+
+def restaurant_columns(fields):
+    """The RestaurantModel columns needed to build fields"""
+    names = []
+    for field in fields:
+        names.extend(DERIVED_FIELDS.get(field, (field,)))
+    return [getattr(RestaurantModel, name) for name in names]
+
+
+def category_restaurants_statement(category_id, fields):
+    """Only the columns behind fields, for the restaurants in a category"""
+    return (
+        select(*restaurant_columns(fields))
+        .join(restaurant_categories, restaurant_categories.c.restaurant_id == RestaurantModel.id)
+        .where(restaurant_categories.c.category_id == category_id)
+    )
+
+
+def project_restaurant(row, fields) -> dict:
+    """A column row as the requested fields, without building a RestaurantModel"""
+    values = row._mapping
+    item = {field: values[field] for field in fields if field not in DERIVED_FIELDS}
+    if "rating_histogram" in fields:
+        item["rating_histogram"] = {star: values[f"rating_{star}_count"] or 0 for star in range(1, 6)}
+    return item
+
+
+@lru_cache(maxsize=256)
+def fieldset_schemas(fields):
+    """RestaurantSchema narrowed to fields, and the RestaurantPageSchema whose items use it"""
+    item = create_model(
+        "RestaurantFieldsSchema",
+        **{name: (RestaurantSchema.model_fields[name].annotation, RestaurantSchema.model_fields[name]) for name in fields},
+    )
+    page = create_model("RestaurantFieldsPageSchema", __base__=RestaurantPageSchema, items=(List[item], ...))
+    return item, page
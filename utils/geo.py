@@ -0,0 +1,176 @@
+import math
+
+from sqlalchemy import and_, func, or_, select
+from sqlalchemy.orm import Session
+
+from config.environment import geo_index
+from models.restaurant import RestaurantModel
+from utils.facets import category_filter
+
+EARTH_RADIUS_KM = 6371.0088
+KM_PER_DEGREE = math.pi * EARTH_RADIUS_KM / 180
+
+GEOHASH_ALPHABET = "0123456789bcdefghjkmnpqrstuvwxyz"
+# Stored precision: 9 characters is a cell of roughly 5 m x 5 m
+GEOHASH_PRECISION = 9
+
+
+def encode_geohash(latitude: float, longitude: float, precision: int = GEOHASH_PRECISION) -> str:
+    lat_range, lng_range = [-90.0, 90.0], [-180.0, 180.0]
+    chars, bits, value, even = [], 0, 0, True
+    while len(chars) < precision:
+        interval, coordinate = (lng_range, longitude) if even else (lat_range, latitude)
+        middle = (interval[0] + interval[1]) / 2
+        value <<= 1
+        if coordinate >= middle:
+            value |= 1
+            interval[0] = middle
+        else:
+            interval[1] = middle
+        even = not even
+        bits += 1
+        if bits == 5:
+            chars.append(GEOHASH_ALPHABET[value])
+            bits, value = 0, 0
+    return "".join(chars)
+
+
+def cell_size(precision: int):
+    """(latitude, longitude) extent in degrees of one geohash cell"""
+    bits = 5 * precision
+    return 180.0 / 2 ** (bits // 2), 360.0 / 2 ** ((bits + 1) // 2)
+
+
+def geohash_for(latitude, longitude):
+    if latitude is None or longitude is None:
+        return None
+    return encode_geohash(latitude, longitude)
+
+
+def haversine_km(lat1: float, lng1: float, lat2: float, lng2: float) -> float:
+    phi1, phi2 = math.radians(lat1), math.radians(lat2)
+    d_phi, d_lambda = phi2 - phi1, math.radians(lng2 - lng1)
+    a = math.sin(d_phi / 2) ** 2 + math.cos(phi1) * math.cos(phi2) * math.sin(d_lambda / 2) ** 2
+    return 2 * EARTH_RADIUS_KM * math.asin(min(1.0, math.sqrt(a)))
+
+
+def bounding_box(latitude: float, longitude: float, radius_km: float):
+    """(min_lat, max_lat, lng_half_width) enclosing the circle; half width 180 when it wraps a pole"""
+    lat_delta = radius_km / KM_PER_DEGREE
+    min_lat, max_lat = max(latitude - lat_delta, -90.0), min(latitude + lat_delta, 90.0)
+    widest = max(abs(min_lat), abs(max_lat))
+    if widest >= 90.0:
+        return min_lat, max_lat, 180.0
+    return min_lat, max_lat, min(radius_km / (KM_PER_DEGREE * math.cos(math.radians(widest))), 180.0)
+
+
+def covering_cells(latitude: float, longitude: float, radius_km: float):
+    """Geohash prefixes whose cells together cover the search circle.
+
+    The precision is the finest whose cells are at least as large as the
+    bounding box in both directions, so the box overlaps at most four cells
+    and the index range scans stay few and short.
+    """
+    min_lat, max_lat, lng_half = bounding_box(latitude, longitude, radius_km)
+    if lng_half >= 180.0:
+        return [""]
+
+    precision = 0
+    while precision < GEOHASH_PRECISION:
+        lat_size, lng_size = cell_size(precision + 1)
+        if lat_size < max_lat - min_lat or lng_size < 2 * lng_half:
+            break
+        precision += 1
+    if precision == 0:
+        return [""]
+
+    lat_size, lng_size = cell_size(precision)
+    cells = set()
+    lat = min_lat
+    while True:
+        lng = longitude - lng_half
+        while True:
+            wrapped = (lng + 180.0) % 360.0 - 180.0
+            cells.add(encode_geohash(min(lat, 90.0 - 1e-9), wrapped, precision))
+            if lng >= longitude + lng_half:
+                break
+            lng = min(lng + lng_size, longitude + lng_half)
+        if lat >= max_lat:
+            break
+        lat = min(lat + lat_size, max_lat)
+    return sorted(cells)
+
+
+def _with_categories(statement, category):
+    if category:
+        statement = statement.where(category_filter(category))
+    return statement
+
+
+def uses_earthdistance(db: Session) -> bool:
+    return geo_index == 'earthdistance' and db.get_bind().dialect.name == 'postgresql'
+
+
+def nearby_candidates_statement(latitude: float, longitude: float, radius_km: float, category=None):
+    """id and coordinates of restaurants in the geohash cells around the point, for exact filtering in Python"""
+    cells = covering_cells(latitude, longitude, radius_km)
+    statement = select(RestaurantModel.id, RestaurantModel.latitude, RestaurantModel.longitude)
+    if cells != [""]:
+        # Range scans on the geohash index; every hash in a cell sorts between prefix and prefix + "zzz..."
+        statement = statement.where(or_(*(
+            and_(
+                RestaurantModel.geohash >= cell,
+                RestaurantModel.geohash <= cell + "z" * (GEOHASH_PRECISION - len(cell)),
+            )
+            for cell in cells
+        )))
+    else:
+        statement = statement.where(RestaurantModel.geohash.is_not(None))
+    return _with_categories(statement, category)
+
+
+def nearest(candidates, latitude: float, longitude: float, radius_km: float, limit: int):
+    """[(restaurant_id, distance_km)] of the closest candidates inside the radius"""
+    within = []
+    for restaurant_id, lat, lng in candidates:
+        distance = haversine_km(latitude, longitude, lat, lng)
+        if distance <= radius_km:
+            within.append((distance, restaurant_id))
+    within.sort()
+    return [(restaurant_id, distance) for distance, restaurant_id in within[:limit]]
+
+
+def earthdistance_statement(latitude: float, longitude: float, radius_km: float, limit: int, category=None):
+    """Nearest restaurants by the cube/earthdistance GiST index (see add_restaurant_coordinates.py)"""
+    radius_m = float(radius_km) * 1000
+    origin = func.ll_to_earth(latitude, longitude)
+    point = func.ll_to_earth(RestaurantModel.latitude, RestaurantModel.longitude)
+    distance = func.earth_distance(origin, point)
+    statement = (
+        select(RestaurantModel.id, (distance / 1000.0).label("distance_km"))
+        .where(RestaurantModel.latitude.is_not(None), RestaurantModel.longitude.is_not(None))
+        .where(func.earth_box(origin, radius_m).op("@>")(point))
+        .where(distance <= radius_m)
+        .order_by(distance, RestaurantModel.id)
+        .limit(limit)
+    )
+    return _with_categories(statement, category)
+
+
+def find_nearby(db: Session, latitude: float, longitude: float, radius_km: float, limit: int, category=None):
+    """Restaurants within radius_km of the point, closest first, as [(restaurant, distance_km)]"""
+    if uses_earthdistance(db):
+        ranked = [tuple(row) for row in db.execute(earthdistance_statement(latitude, longitude, radius_km, limit, category))]
+    else:
+        candidates = db.execute(nearby_candidates_statement(latitude, longitude, radius_km, category)).all()
+        ranked = nearest(candidates, latitude, longitude, radius_km, limit)
+    if not ranked:
+        return []
+
+    restaurants = {
+        restaurant.id: restaurant
+        for restaurant in db.execute(
+            select(RestaurantModel).where(RestaurantModel.id.in_([restaurant_id for restaurant_id, _ in ranked]))
+        ).scalars()
+    }
+    return [(restaurants[restaurant_id], distance) for restaurant_id, distance in ranked if restaurant_id in restaurants]
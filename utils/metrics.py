@@ -0,0 +1,231 @@
+import glob
+import json
+import os
+import threading
+import time
+from bisect import bisect_left
+
+from utils.profiling import route_template
+
+# Upper bounds (seconds) of the request latency histogram buckets
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+# name -> (type, help) for everything /metrics can expose
+METRICS = {
+    "http_requests_total": ("counter", "HTTP requests handled, by method, route template and status"),
+    "http_request_duration_seconds": ("histogram", "HTTP request latency, by method and route template"),
+    "http_requests_in_flight": ("gauge", "HTTP requests currently being handled"),
+    "db_pool_size": ("gauge", "Configured connection pool size"),
+    "db_pool_checked_out": ("gauge", "Connections currently checked out of the pool"),
+    "db_pool_overflow": ("gauge", "Overflow connections currently open"),
+    "db_pool_checkouts_total": ("counter", "Successful connection checkouts"),
+    "db_pool_timeouts_total": ("counter", "Connection checkouts that timed out"),
+    "db_pool_connections_opened_total": ("counter", "New database connections opened by the pool"),
+    "cache_hits_total": ("counter", "In-process cache hits"),
+    "cache_misses_total": ("counter", "In-process cache misses"),
+    "cache_evictions_total": ("counter", "Entries evicted from the response cache to stay within its byte budget"),
+    "cache_entries": ("gauge", "Entries currently cached"),
+    "cache_bytes": ("gauge", "Bytes of cached response bodies"),
+    "cache_hit_ratio": ("gauge", "Hits over lookups since start, across all workers"),
+    "password_hash_queue_depth": ("gauge", "bcrypt hash/verify calls running or waiting in the process pool"),
+    "background_tasks_pending": ("gauge", "Background tasks waiting to run or to be retried"),
+    "background_tasks_failed_total": ("counter", "Background tasks that failed on every attempt"),
+    "background_tasks_dropped_total": ("counter", "Background tasks dropped because the queue was full"),
+    "notification_push_pending": ("gauge", "Notification events waiting to be sent with pg_notify"),
+    "notification_push_failed_total": ("counter", "Notification events dropped after every pg_notify attempt failed"),
+    "rate_limited_total": ("counter", "Requests refused with 429 by a rate limit rule, by rule"),
+    "requests_shed_total": ("counter", "Requests refused with 503 because too many were in flight"),
+}
+
+
+class RequestMetrics:
+    """Per-process request counters and latency histograms.
+
+    Only the event loop thread records (from MetricsMiddleware), so observe()
+    needs no lock: a dict lookup, a bisect and two list updates.
+    """
+
+    def __init__(self, buckets=LATENCY_BUCKETS):
+        self.buckets = buckets
+        self.in_flight = 0
+        # (method, route, status) -> [count per bucket..., count over the last bucket, sum of seconds]
+        self._series = {}
+
+    def observe(self, method: str, route: str, status: int, seconds: float):
+        key = (method, route, status)
+        series = self._series.get(key)
+        if series is None:
+            series = self._series[key] = [0] * (len(self.buckets) + 1) + [0.0]
+        series[bisect_left(self.buckets, seconds)] += 1
+        series[-1] += seconds
+
+    def series(self):
+        # dict.items() is copied in one step under the GIL, so readers on other threads are safe
+        return [[*key, list(values)] for key, values in list(self._series.items())]
+
+
+request_metrics = RequestMetrics()
+_collectors = []
+
+
+def register_collector(collector):
+    """collector() returns [(name, labels_dict, value), ...] for METRICS entries, sampled at export time"""
+    _collectors.append(collector)
+
+
+def snapshot():
+    """Everything this process contributes to /metrics, as JSON-serializable data"""
+    samples = []
+    for collector in _collectors:
+        samples.extend([name, labels, value] for name, labels, value in collector())
+    return {
+        "pid": os.getpid(),
+        "in_flight": request_metrics.in_flight,
+        "requests": request_metrics.series(),
+        "samples": samples,
+    }
+
+
+def write_snapshot(directory: str):
+    path = os.path.join(directory, f"metrics-{os.getpid()}.json")
+    temporary = f"{path}.tmp"
+    with open(temporary, "w") as f:
+        json.dump(snapshot(), f)
+    os.replace(temporary, path)
+
+
+def start_snapshot_writer(directory: str, interval: float):
+    """Multi-worker mode: each worker publishes its snapshot to directory every interval seconds"""
+    os.makedirs(directory, exist_ok=True)
+
+    def run():
+        while True:
+            try:
+                write_snapshot(directory)
+            except OSError:
+                pass
+            time.sleep(interval)
+
+    threading.Thread(target=run, name="metrics-snapshot-writer", daemon=True).start()
+
+
+def _is_alive(pid: int) -> bool:
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+def _read_snapshots(directory: str):
+    own = snapshot()
+    snapshots = [own]
+    for path in glob.glob(os.path.join(directory, "metrics-*.json")):
+        try:
+            with open(path) as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            continue
+        if data["pid"] != own["pid"]:
+            snapshots.append(data)
+    return snapshots
+
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace("\"", "\\\"").replace("\n", "\\n")
+
+
+def _labels(labels: dict) -> str:
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{name}="{_escape(value)}"' for name, value in sorted(labels.items())) + "}"
+
+
+def render_metrics(directory: str = None) -> str:
+    """Prometheus text exposition of this process, or of every worker sharing directory.
+
+    Counters and histograms from workers that have exited are kept so totals
+    never go backwards; gauges only count live workers.
+    """
+    snapshots = _read_snapshots(directory) if directory else [snapshot()]
+    live = {data["pid"] for data in snapshots if data["pid"] == os.getpid() or _is_alive(data["pid"])}
+
+    values = {}  # name -> {label tuple: value}
+    histograms = {}  # (method, route) -> [bucket counts..., sum]
+    for data in snapshots:
+        for method, route, status, series in data["requests"]:
+            requests = values.setdefault("http_requests_total", {})
+            key = (("method", method), ("route", route), ("status", str(status)))
+            requests[key] = requests.get(key, 0) + sum(series[:-1])
+            histogram = histograms.setdefault((method, route), [0] * len(series))
+            for index, value in enumerate(series):
+                histogram[index] += value
+        for name, labels, value in data["samples"]:
+            if METRICS[name][0] == "gauge" and data["pid"] not in live:
+                continue
+            series_values = values.setdefault(name, {})
+            key = tuple(sorted(labels.items()))
+            series_values[key] = series_values.get(key, 0) + value
+    values["http_requests_in_flight"] = {(): sum(data["in_flight"] for data in snapshots if data["pid"] in live)}
+
+    hits, misses = values.get("cache_hits_total", {}), values.get("cache_misses_total", {})
+    for key in hits:
+        lookups = hits[key] + misses.get(key, 0)
+        values.setdefault("cache_hit_ratio", {})[key] = hits[key] / lookups if lookups else 0.0
+
+    lines = []
+    for name, (kind, help_text) in METRICS.items():
+        if kind == "histogram":
+            if not histograms:
+                continue
+            lines += [f"# HELP {name} {help_text}", f"# TYPE {name} histogram"]
+            for (method, route), series in sorted(histograms.items()):
+                labels = {"method": method, "route": route}
+                cumulative = 0
+                for bound, count in zip(LATENCY_BUCKETS, series):
+                    cumulative += count
+                    lines.append(f"{name}_bucket{_labels({**labels, 'le': repr(bound)})} {cumulative}")
+                cumulative += series[len(LATENCY_BUCKETS)]
+                lines.append(f"{name}_bucket{_labels({**labels, 'le': '+Inf'})} {cumulative}")
+                lines.append(f"{name}_sum{_labels(labels)} {series[-1]}")
+                lines.append(f"{name}_count{_labels(labels)} {cumulative}")
+            continue
+        if name not in values:
+            continue
+        lines += [f"# HELP {name} {help_text}", f"# TYPE {name} {kind}"]
+        for key, value in sorted(values[name].items()):
+            lines.append(f"{name}{_labels(dict(key))} {value}")
+    return "\n".join(lines) + "\n"
+
+
+class MetricsMiddleware:
+    """Counts requests and records their latency under the matched route template"""
+
+    def __init__(self, app, metrics: RequestMetrics = request_metrics):
+        self.app = app
+        self.metrics = metrics
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        metrics = self.metrics
+        metrics.in_flight += 1
+        start = time.perf_counter()
+        status = 500
+
+        async def send_with_status(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            metrics.in_flight -= 1
+            # Unmatched paths share one label so scanners cannot blow up the series count
+            metrics.observe(scope["method"], route_template(scope) or "unmatched", status, time.perf_counter() - start)
@@ -0,0 +1,102 @@
+import base64
+import binascii
+import json
+from datetime import datetime, timezone
+
+from fastapi import HTTPException
+from sqlalchemy import DateTime, String, and_, or_, type_coerce
+from sqlalchemy.types import TypeDecorator
+
+
+class CursorTimestamp(TypeDecorator):
+    """A DateTime sort key read, carried in cursors and bound back exactly as the database stores it.
+
+    SQLite keeps DATETIME as text: rows defaulted with CURRENT_TIMESTAMP hold
+    'YYYY-MM-DD HH:MM:SS' while bound datetimes become 'YYYY-MM-DD HH:MM:SS.ffffff',
+    so a parsed-and-rebound cursor value neither equals nor sorts next to the
+    row it came from. There the raw text goes round trip untouched; elsewhere
+    it is an ISO timestamp.
+    """
+
+    impl = DateTime
+    cache_ok = True
+
+    def load_dialect_impl(self, dialect):
+        if dialect.name == "sqlite":
+            return dialect.type_descriptor(String())
+        return dialect.type_descriptor(DateTime())
+
+    def process_bind_param(self, value, dialect):
+        if isinstance(value, datetime):
+            # A range bound rather than a cursor value. Columns hold naive UTC, so an
+            # aware bound is converted first; on SQLite, text that orders correctly
+            # against both stored forms (no fraction when it is zero)
+            if value.tzinfo is not None:
+                value = value.astimezone(timezone.utc).replace(tzinfo=None)
+            return value.isoformat(sep=" ") if dialect.name == "sqlite" else value
+        if value is None or dialect.name == "sqlite":
+            return value
+        return datetime.fromisoformat(value)
+
+    def process_result_value(self, value, dialect):
+        if value is None or isinstance(value, str):
+            return value
+        return value.isoformat()
+
+
+def encode_cursor(values: list) -> str:
+    """Pack the last row's sort key into an opaque, URL-safe cursor"""
+    raw = json.dumps(values, separators=(",", ":"), default=str).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> list:
+    """Unpack a cursor produced by encode_cursor"""
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        values = json.loads(base64.urlsafe_b64decode(padded))
+    except (ValueError, binascii.Error):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+    if not isinstance(values, list):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+    return values
+
+
+def timestamp_key(column):
+    """column as a CursorTimestamp, for selecting a sort key and comparing a cursor or a datetime against it.
+
+    No CAST is emitted, so the column's index still serves the comparison.
+    """
+    return type_coerce(column, CursorTimestamp())
+
+
+def timestamp_cursor_value(value):
+    """A timestamp taken from a cursor, rejected with a 400 unless it parses"""
+    try:
+        datetime.fromisoformat(value)
+    except (TypeError, ValueError):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    return value
+
+
+def cursor_id(value) -> int:
+    """The last row id taken from a cursor"""
+    if type(value) is not int:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    return value
+
+
+def typed_cursor_value(value, *types):
+    """A sort key taken from a cursor, rejected with a 400 unless it is one of types (a bool is never a number)"""
+    if isinstance(value, bool) or not isinstance(value, types):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    return value
+
+
+def keyset_after(sort_column, id_column, value, last_id: int, descending: bool):
+    """Rows strictly after (value, last_id) in (sort_column, id_column) order"""
+    if descending:
+        return or_(sort_column < value, and_(sort_column == value, id_column < last_id))
+    return or_(sort_column > value, and_(sort_column == value, id_column > last_id))
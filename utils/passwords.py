@@ -0,0 +1,102 @@
+import asyncio
+import threading
+from concurrent.futures import ProcessPoolExecutor
+
+from fastapi import HTTPException
+from passlib.context import CryptContext
+
+from config.environment import bcrypt_rounds, password_hash_workers, password_hash_queue, password_hash_retry_after
+
+# Hashes made with a different cost are flagged by verify_and_update, so they get rehashed on login
+pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto", bcrypt__rounds=bcrypt_rounds)
+
+_pool = None
+_pool_lock = threading.Lock()
+# Calls submitted to the pool, running or queued; beyond password_hash_queue callers get a 503
+_pending = 0
+_pending_lock = threading.Lock()
+
+
+def _hash(password: str) -> str:
+    return pwd_context.hash(password)
+
+
+def _verify_and_update(password: str, password_hash: str):
+    return pwd_context.verify_and_update(password, password_hash)
+
+
+def _get_pool():
+    global _pool
+    if _pool is None:
+        with _pool_lock:
+            if _pool is None:
+                _pool = ProcessPoolExecutor(max_workers=password_hash_workers)
+    return _pool
+
+
+def _acquire_slot():
+    global _pending
+    with _pending_lock:
+        if _pending >= password_hash_queue:
+            raise HTTPException(
+                status_code=503,
+                detail="Authentication is busy, please retry shortly",
+                headers={"Retry-After": str(password_hash_retry_after)},
+            )
+        _pending += 1
+
+
+def _release_slot():
+    global _pending
+    with _pending_lock:
+        _pending -= 1
+
+
+def _run(fn, *args):
+    """Run fn in the bcrypt process pool, or reject straight away if it is saturated.
+
+    Blocks the calling thread until the hash is done, so it is for scripts:
+    request handlers await _run_async rather than park a threadpool thread.
+    """
+    if password_hash_workers <= 0:
+        return fn(*args)
+
+    _acquire_slot()
+    try:
+        return _get_pool().submit(fn, *args).result()
+    finally:
+        _release_slot()
+
+
+async def _run_async(fn, *args):
+    """Like _run, but awaits the pool instead of blocking the calling thread"""
+    if password_hash_workers <= 0:
+        return await asyncio.to_thread(fn, *args)
+
+    _acquire_slot()
+    try:
+        return await asyncio.wrap_future(_get_pool().submit(fn, *args))
+    finally:
+        _release_slot()
+
+
+def queue_depth() -> int:
+    """Number of hash/verify calls currently running or waiting in the pool"""
+    return _pending
+
+
+def hash_password(password: str) -> str:
+    return _run(_hash, password)
+
+
+def verify_password(password: str, password_hash: str):
+    """Return (is_valid, new_hash); new_hash is set when the stored hash should be upgraded"""
+    return _run(_verify_and_update, password, password_hash)
+
+
+async def hash_password_async(password: str) -> str:
+    return await _run_async(_hash, password)
+
+
+async def verify_password_async(password: str, password_hash: str):
+    return await _run_async(_verify_and_update, password, password_hash)
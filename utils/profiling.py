@@ -0,0 +1,134 @@
+import json
+import logging
+import re
+import time
+from collections import Counter
+from contextvars import ContextVar
+
+from sqlalchemy import event
+
+logger = logging.getLogger(__name__)
+
+# The profile of the request being handled; copied into threadpool workers and greenlets with the context
+current_profile = ContextVar("current_profile", default=None)
+
+_WHITESPACE = re.compile(r"\s+")
+_LITERALS = re.compile(r"'(?:[^']|'')*'|\b\d+(?:\.\d+)?\b")
+_PLACEHOLDER_LISTS = re.compile(r"\((?:\s*(?:\?|%\(\w+\)s|%s|:\w+|\$\d+)\s*,)+\s*(?:\?|%\(\w+\)s|%s|:\w+|\$\d+)\s*\)")
+
+
+def statement_shape(statement: str) -> str:
+    """Statement text with literals and expanded IN lists folded, so repeats of one query compare equal"""
+    shape = _WHITESPACE.sub(" ", statement).strip()
+    shape = _LITERALS.sub("?", shape)
+    return _PLACEHOLDER_LISTS.sub("(...)", shape)
+
+
+def route_template(scope):
+    """The matched route's path template including router prefixes (/api/restaurants/{restaurant_id}), or None"""
+    route = scope.get("route")
+    template = getattr(route, "path_format", None)
+    if template is None:
+        return None
+    # Routes of included routers may only know their own part of the path; recover the prefix from the URL
+    try:
+        concrete = template.format(**scope.get("path_params", {}))
+    except (KeyError, IndexError, ValueError):
+        return template
+    path = scope["path"]
+    if concrete and path.endswith(concrete):
+        return path[:len(path) - len(concrete)] + template
+    return template
+
+
+class RequestProfile:
+    """SQL statements and time spent in the database while handling one request"""
+
+    def __init__(self):
+        self.start = time.perf_counter()
+        self.queries = 0
+        self.db_time = 0.0
+        self.shapes = Counter()
+
+    def record(self, statement: str, duration: float):
+        self.queries += 1
+        self.db_time += duration
+        self.shapes[statement_shape(statement)] += 1
+
+    def repeated(self, threshold: int):
+        """Statement shapes run more than threshold times - the signature of an N+1 loop"""
+        return [(shape, count) for shape, count in self.shapes.most_common() if count > threshold]
+
+    def server_timing(self) -> str:
+        total = (time.perf_counter() - self.start) * 1000
+        db = self.db_time * 1000
+        return f'db;dur={db:.1f};desc="{self.queries} queries", app;dur={total - db:.1f}, total;dur={total:.1f}'
+
+
+def install_query_hooks(engine):
+    """Attribute every cursor execution on engine to the current request's profile"""
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        context._profiling_start = time.perf_counter()
+
+    @event.listens_for(engine, "after_cursor_execute")
+    def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        profile = current_profile.get()
+        if profile is not None:
+            profile.record(statement, time.perf_counter() - context._profiling_start)
+
+
+class ProfilingMiddleware:
+    """Adds a Server-Timing header (db vs. app time and query count) and logs one line per request.
+
+    Requests that run the same statement shape more than n_plus_one_threshold
+    times are logged as warnings with the offending statements.
+    """
+
+    def __init__(self, app, n_plus_one_threshold: int = 10, server_timing: bool = True):
+        self.app = app
+        self.n_plus_one_threshold = n_plus_one_threshold
+        self.server_timing = server_timing
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        profile = RequestProfile()
+        token = current_profile.set(profile)
+        status = 500
+
+        async def send_with_timing(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+                if self.server_timing:
+                    # Streaming bodies keep querying after this point; the log line has the final numbers
+                    headers = list(message.get("headers", []))
+                    headers.append((b"server-timing", profile.server_timing().encode("latin-1")))
+                    message = {**message, "headers": headers}
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_timing)
+        finally:
+            current_profile.reset(token)
+            self._log(scope, status, profile)
+
+    def _log(self, scope, status, profile):
+        record = {
+            "method": scope["method"],
+            "path": route_template(scope) or scope["path"],
+            "status": status,
+            "duration_ms": round((time.perf_counter() - profile.start) * 1000, 1),
+            "db_ms": round(profile.db_time * 1000, 1),
+            "queries": profile.queries,
+        }
+        repeated = profile.repeated(self.n_plus_one_threshold)
+        if repeated:
+            record["n_plus_one"] = [{"count": count, "statement": shape} for shape, count in repeated]
+            logger.warning(json.dumps(record))
+        else:
+            logger.info(json.dumps(record))
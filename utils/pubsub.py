@@ -0,0 +1,241 @@
+import asyncio
+import importlib
+import json
+import logging
+import queue
+import threading
+import time
+
+from sqlalchemy import text
+from sqlalchemy.engine import make_url
+
+from config.environment import (
+    db_URI, notification_broker, notification_queue_size, task_retries, task_retry_backoff,
+)
+
+logger = logging.getLogger(__name__)
+
+# Channel carrying every event between workers when the PostgreSQL broker is used
+PG_CHANNEL = "rateorant_events"
+# NOTIFY payloads must stay below 8000 bytes
+PG_PAYLOAD_LIMIT = 7900
+# Longest pause between attempts to reconnect the LISTEN connection
+PG_LISTEN_MAX_BACKOFF = 30
+
+
+class Subscription:
+    """One listener's bounded queue of messages, fed from any thread.
+
+    A listener that falls queue_size messages behind is cut off: get() then
+    returns None and the client is expected to reconnect and resume.
+    """
+
+    def __init__(self, broker, channel: str, queue_size: int):
+        self.broker = broker
+        self.channel = channel
+        self.overflowed = False
+        self._loop = asyncio.get_running_loop()
+        self._queue = asyncio.Queue(queue_size)
+
+    def deliver(self, message):
+        try:
+            self._loop.call_soon_threadsafe(self._put, message)
+        except RuntimeError:
+            # The subscriber's event loop has shut down
+            self.broker.unsubscribe(self)
+
+    def _put(self, message):
+        if self.overflowed:
+            return
+        try:
+            self._queue.put_nowait(message)
+        except asyncio.QueueFull:
+            self.overflowed = True
+            while not self._queue.empty():
+                self._queue.get_nowait()
+            self._queue.put_nowait(None)
+
+    async def get(self):
+        return await self._queue.get()
+
+    def close(self):
+        self.broker.unsubscribe(self)
+
+
+class Broker:
+    """Pub/sub interface for pushing events to connected clients.
+
+    publish() may be called from any thread (sync handlers run in the
+    threadpool) and must not block; subscribe() is called on the event loop.
+    """
+
+    def publish(self, channel: str, message: dict):
+        raise NotImplementedError
+
+    def subscribe(self, channel: str) -> Subscription:
+        raise NotImplementedError
+
+    def unsubscribe(self, subscription: Subscription):
+        raise NotImplementedError
+
+    def stats(self) -> dict:
+        """Delivery counters for /metrics; brokers with nothing to report return {}"""
+        return {}
+
+
+class InProcessBroker(Broker):
+    """Fans messages out to the subscribers of this worker process only"""
+
+    def __init__(self, queue_size: int = notification_queue_size):
+        self.queue_size = queue_size
+        self._lock = threading.Lock()
+        self._subscribers = {}  # channel -> set of Subscription
+
+    def publish(self, channel: str, message: dict):
+        with self._lock:
+            subscribers = list(self._subscribers.get(channel, ()))
+        for subscription in subscribers:
+            subscription.deliver(message)
+
+    def subscribe(self, channel: str) -> Subscription:
+        subscription = Subscription(self, channel, self.queue_size)
+        with self._lock:
+            self._subscribers.setdefault(channel, set()).add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription):
+        with self._lock:
+            subscribers = self._subscribers.get(subscription.channel)
+            if subscribers is not None:
+                subscribers.discard(subscription)
+                if not subscribers:
+                    del self._subscribers[subscription.channel]
+
+
+class PostgresBroker(InProcessBroker):
+    """Fans out across workers with LISTEN/NOTIFY on the application database.
+
+    publish() hands the message to a sender thread that issues pg_notify; every
+    worker (including the publishing one) LISTENs on one asyncpg connection and
+    relays what arrives to its local subscribers. Overlong messages have their
+    text truncated; clients re-read the full row from the notifications list.
+    A failed NOTIFY is retried on a fresh connection with exponential backoff,
+    then logged, counted and dropped.
+    """
+
+    def __init__(self, url: str = db_URI, queue_size: int = notification_queue_size,
+                 retries: int = task_retries, backoff: float = task_retry_backoff):
+        super().__init__(queue_size)
+        self.dsn = make_url(url).set(drivername="postgresql").render_as_string(hide_password=False)
+        self.retries = retries
+        self.backoff = backoff
+        self._outbox = queue.Queue()
+        self._sender = None
+        self._listener = None
+        self.sent = 0
+        self.failed = 0
+
+    def publish(self, channel: str, message: dict):
+        with self._lock:
+            if self._sender is None:
+                self._sender = threading.Thread(target=self._send_forever, name="pg-notify-sender", daemon=True)
+                self._sender.start()
+        self._outbox.put((channel, message))
+
+    def subscribe(self, channel: str) -> Subscription:
+        if self._listener is None or self._listener.done():
+            self._listener = asyncio.get_running_loop().create_task(self._listen_forever())
+        return super().subscribe(channel)
+
+    def _payload(self, channel: str, message: dict) -> str:
+        payload = json.dumps({"channel": channel, "message": message})
+        overflow = len(payload.encode()) - PG_PAYLOAD_LIMIT
+        if overflow > 0 and isinstance(message.get("message"), str):
+            text_bytes = message["message"].encode()
+            truncated = text_bytes[:max(len(text_bytes) - overflow - 3, 0)].decode(errors="ignore") + "..."
+            payload = json.dumps({"channel": channel, "message": {**message, "message": truncated}})
+        return payload
+
+    def _send_forever(self):
+        from database import engine
+
+        while True:
+            channel, message = self._outbox.get()
+            payload = self._payload(channel, message)
+            for attempt in range(self.retries + 1):
+                try:
+                    # Each attempt checks out a fresh pooled connection; broken ones are invalidated
+                    with engine.begin() as connection:
+                        connection.execute(
+                            text("SELECT pg_notify(:channel, :payload)"),
+                            {"channel": PG_CHANNEL, "payload": payload},
+                        )
+                except Exception:
+                    if attempt < self.retries:
+                        time.sleep(self.backoff * 2 ** attempt)
+                        continue
+                    # Push is best effort; clients recover missed events on reconnect
+                    logger.exception("pg_notify on %s failed after %d attempts, dropping the event", channel, attempt + 1)
+                    self.failed += 1
+                else:
+                    self.sent += 1
+                break
+
+    def stats(self) -> dict:
+        return {"pending": self._outbox.qsize(), "sent": self.sent, "failed": self.failed}
+
+    def _on_notify(self, connection, pid, channel, payload):
+        try:
+            data = json.loads(payload)
+        except ValueError:
+            return
+        InProcessBroker.publish(self, data["channel"], data["message"])
+
+    async def _listen_forever(self):
+        import asyncpg
+
+        delay = self.backoff
+        while True:
+            try:
+                connection = await asyncpg.connect(self.dsn)
+                try:
+                    await connection.add_listener(PG_CHANNEL, self._on_notify)
+                    delay = self.backoff
+                    while not connection.is_closed():
+                        await asyncio.sleep(5)
+                finally:
+                    await connection.close()
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                logger.exception("LISTEN connection failed, reconnecting in %.1fs", delay)
+                await asyncio.sleep(delay)
+                delay = min(delay * 2, PG_LISTEN_MAX_BACKOFF)
+
+
+BROKERS = {"memory": InProcessBroker, "postgres": PostgresBroker}
+_broker = None
+_broker_lock = threading.Lock()
+
+
+def get_broker() -> Broker:
+    """The configured broker: memory, postgres, or a "module:factory" path to a custom Broker"""
+    global _broker
+    with _broker_lock:
+        if _broker is None:
+            if notification_broker in BROKERS:
+                factory = BROKERS[notification_broker]
+            else:
+                module_name, _, attribute = notification_broker.partition(":")
+                factory = getattr(importlib.import_module(module_name), attribute)
+            _broker = factory()
+        return _broker
+
+
+def owner_channel(owner_id: int) -> str:
+    return f"owner:{owner_id}"
+
+
+def publish_notification(owner_id: int, event: dict):
+    """Push a NotificationSchema-shaped dict to the owner's connected dashboards"""
+    get_broker().publish(owner_channel(owner_id), event)
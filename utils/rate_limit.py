@@ -0,0 +1,276 @@
+import importlib
+import json
+import math
+import re
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass, field
+
+import jwt
+from sqlalchemy import text
+from starlette.concurrency import run_in_threadpool
+
+from config.environment import secret, rate_limit_store, rate_limit_rules
+
+# Long-lived or internal endpoints that never count towards, or get refused by, the concurrency limit
+SHED_EXEMPT_PATHS = ("/", "/health", "/health/db", "/health/cache", "/metrics", "/api/notifications/stream")
+
+
+@dataclass(frozen=True)
+class RateLimitRule:
+    """Allow rate requests per period seconds, in bursts of up to burst, per client.
+
+    per is "ip" or "user"; user buckets fall back to the IP when the request
+    carries no valid token. path is a route template such as
+    /api/restaurants/{restaurant_id}/reviews.
+    """
+    method: str
+    path: str
+    per: str
+    rate: float
+    period: float
+    burst: int
+    pattern: re.Pattern = field(init=False, repr=False, compare=False)
+
+    def __post_init__(self):
+        regex = re.sub(r"\\{\w+\\}", "[^/]+", re.escape(self.path))
+        object.__setattr__(self, "pattern", re.compile(f"^{regex}/?$"))
+
+    @property
+    def name(self) -> str:
+        return f"{self.method} {self.path} per {self.per}"
+
+    def matches(self, method: str, path: str) -> bool:
+        return method == self.method and self.pattern.match(path) is not None
+
+
+DEFAULT_RULES = (
+    # bcrypt-bound: a handful of attempts per minute is plenty for a person
+    RateLimitRule("POST", "/api/login", per="ip", rate=10, period=60, burst=10),
+    RateLimitRule("POST", "/api/register", per="ip", rate=20, period=3600, burst=5),
+    RateLimitRule("POST", "/api/restaurants/{restaurant_id}/reviews", per="user", rate=30, period=3600, burst=10),
+    RateLimitRule("POST", "/api/restaurants/{restaurant_id}/reviews", per="ip", rate=120, period=3600, burst=30),
+)
+
+
+def configured_rules():
+    """RATE_LIMIT_RULES (a JSON list of RateLimitRule fields) when set, else DEFAULT_RULES"""
+    if not rate_limit_rules:
+        return DEFAULT_RULES
+    return tuple(RateLimitRule(**rule) for rule in json.loads(rate_limit_rules))
+
+
+class RateLimitStore:
+    """Token-bucket state, keyed by rule and client.
+
+    consume() takes one token from every bucket of a request, or from none
+    of them: it returns one wait per bucket, all 0.0 when the tokens were
+    taken, otherwise the seconds until each bucket has a token again (0.0
+    for those that have one now). Stores shared between worker processes
+    do I/O, so they leave blocking = True and run in the threadpool.
+    """
+
+    blocking = True
+
+    def consume(self, buckets) -> list:
+        """buckets is a list of (key, rate per second, burst)"""
+        raise NotImplementedError
+
+
+def _waits(tokens, rates):
+    return [0.0 if available >= 1 else (1 - available) / rate for available, rate in zip(tokens, rates)]
+
+
+class MemoryRateLimitStore(RateLimitStore):
+    """Buckets for this worker process only; with N workers a client gets up to N times the rate"""
+
+    blocking = False
+
+    def __init__(self, max_keys: int = 100_000, clock=time.monotonic):
+        self.max_keys = max_keys
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._buckets = OrderedDict()  # key -> (tokens, updated_at), least recently used first
+
+    def consume(self, buckets) -> list:
+        now = self._clock()
+        with self._lock:
+            tokens = []
+            for key, rate, burst in buckets:
+                available, updated_at = self._buckets.pop(key, (burst, now))
+                tokens.append(min(burst, available + (now - updated_at) * rate))
+            waits = _waits(tokens, [rate for _, rate, _ in buckets])
+            taken = 0 if any(waits) else 1
+            for (key, _, _), available in zip(buckets, tokens):
+                self._buckets[key] = (available - taken, now)
+            while len(self._buckets) > self.max_keys:
+                self._buckets.popitem(last=False)
+            return waits
+
+
+class PostgresRateLimitStore(RateLimitStore):
+    """Buckets shared by every worker, refilled and taken from in one transaction on an UNLOGGED table"""
+
+    CREATE_SQL = text("""
+        CREATE UNLOGGED TABLE IF NOT EXISTS rate_limit_buckets (
+            key TEXT PRIMARY KEY,
+            tokens DOUBLE PRECISION NOT NULL,
+            updated_at DOUBLE PRECISION NOT NULL
+        )
+    """)
+    # Refill and lock the row in one statement; tokens are then taken within the same transaction
+    REFILL_SQL = text("""
+        INSERT INTO rate_limit_buckets AS b (key, tokens, updated_at)
+        VALUES (:key, :burst, extract(epoch FROM clock_timestamp()))
+        ON CONFLICT (key) DO UPDATE SET
+            tokens = LEAST(:burst, b.tokens + (extract(epoch FROM clock_timestamp()) - b.updated_at) * :rate),
+            updated_at = extract(epoch FROM clock_timestamp())
+        RETURNING tokens
+    """)
+    TAKE_SQL = text("UPDATE rate_limit_buckets SET tokens = tokens - 1 WHERE key = :key")
+
+    def __init__(self):
+        self._created = False
+
+    def consume(self, buckets) -> list:
+        from database import engine
+
+        with engine.begin() as connection:
+            if not self._created:
+                connection.execute(self.CREATE_SQL)
+                self._created = True
+            # Rows are locked in key order so concurrent requests sharing buckets cannot deadlock
+            refilled = {
+                key: connection.execute(self.REFILL_SQL, {"key": key, "rate": rate, "burst": burst}).scalar_one()
+                for key, rate, burst in sorted(buckets)
+            }
+            waits = _waits([refilled[key] for key, _, _ in buckets], [rate for _, rate, _ in buckets])
+            if not any(waits):
+                connection.execute(self.TAKE_SQL, [{"key": key} for key, _, _ in buckets])
+        return waits
+
+
+STORES = {"memory": MemoryRateLimitStore, "postgres": PostgresRateLimitStore}
+
+
+def get_store() -> RateLimitStore:
+    """The configured store: memory, postgres, or a "module:factory" path to a custom RateLimitStore"""
+    if rate_limit_store in STORES:
+        return STORES[rate_limit_store]()
+    module_name, _, attribute = rate_limit_store.partition(":")
+    return getattr(importlib.import_module(module_name), attribute)()
+
+
+class RateLimitStats:
+    """Per-process counters; like RequestMetrics, only the event loop thread updates them"""
+
+    def __init__(self):
+        self.in_flight = 0
+        self.shed = 0
+        self.limited = {}  # rule name -> requests refused
+
+    def as_dict(self):
+        return {"in_flight": self.in_flight, "shed": self.shed, "limited": dict(self.limited)}
+
+
+rate_limit_stats = RateLimitStats()
+
+
+class RateLimitMiddleware:
+    """Per-route token buckets (429) and a per-worker concurrency limit (503), both with Retry-After.
+
+    Requests over max_concurrent in flight are refused straight away, before
+    they queue for threads and connections and drag every other request's
+    latency up with them. max_concurrent=0 disables shedding.
+    """
+
+    def __init__(self, app, rules=DEFAULT_RULES, store: RateLimitStore = None, max_concurrent: int = 0,
+                 shed_retry_after: int = 1, trust_forwarded_for: bool = False, stats: RateLimitStats = rate_limit_stats):
+        self.app = app
+        self.rules = tuple(rules)
+        self.store = store if store is not None else MemoryRateLimitStore()
+        self.max_concurrent = max_concurrent
+        self.shed_retry_after = shed_retry_after
+        self.trust_forwarded_for = trust_forwarded_for
+        self.stats = stats
+
+    def _client_ip(self, scope) -> str:
+        if self.trust_forwarded_for:
+            for name, value in scope.get("headers", ()):
+                if name == b"x-forwarded-for":
+                    return value.decode("latin-1").split(",")[0].strip()
+        client = scope.get("client")
+        return client[0] if client else "unknown"
+
+    def _user_id(self, scope):
+        for name, value in scope.get("headers", ()):
+            if name == b"authorization":
+                scheme, _, token = value.decode("latin-1").partition(" ")
+                if scheme.lower() != "bearer" or not token:
+                    return None
+                try:
+                    return jwt.decode(token, secret, algorithms=["HS256"]).get("sub")
+                except jwt.PyJWTError:
+                    return None
+        return None
+
+    async def _consume(self, buckets) -> list:
+        if self.store.blocking:
+            return await run_in_threadpool(self.store.consume, buckets)
+        return self.store.consume(buckets)
+
+    async def _reject(self, send, status: int, detail: str, retry_after: int):
+        body = json.dumps({"detail": detail}).encode()
+        await send({
+            "type": "http.response.start",
+            "status": status,
+            "headers": [
+                (b"content-type", b"application/json"),
+                (b"content-length", str(len(body)).encode()),
+                (b"retry-after", str(retry_after).encode()),
+            ],
+        })
+        await send({"type": "http.response.body", "body": body})
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        method, path = scope["method"], scope["path"]
+        counted = self.max_concurrent > 0 and path not in SHED_EXEMPT_PATHS
+        stats = self.stats
+        if counted and stats.in_flight >= self.max_concurrent:
+            stats.shed += 1
+            await self._reject(send, 503, "Server is busy, please retry shortly", self.shed_retry_after)
+            return
+
+        rules, buckets = [], []
+        for rule in self.rules:
+            if not rule.matches(method, path):
+                continue
+            client = self._client_ip(scope)
+            if rule.per == "user":
+                user_id = self._user_id(scope)
+                client = f"user:{user_id}" if user_id is not None else f"ip:{client}"
+            rules.append(rule)
+            buckets.append((f"{rule.name}|{client}", rule.rate / rule.period, rule.burst))
+
+        # All or nothing, so a request refused by one rule does not spend the others' tokens
+        waits = await self._consume(buckets) if buckets else ()
+        if any(waits):
+            for rule, wait in zip(rules, waits):
+                if wait > 0:
+                    stats.limited[rule.name] = stats.limited.get(rule.name, 0) + 1
+            await self._reject(send, 429, "Too many requests, please slow down", math.ceil(max(waits)))
+            return
+
+        if not counted:
+            await self.app(scope, receive, send)
+            return
+        stats.in_flight += 1
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            stats.in_flight -= 1
@@ -0,0 +1,87 @@
+from sqlalchemy import case, func
+from sqlalchemy.orm import Session
+
+from models.restaurant import RestaurantModel
+from models.review import ReviewModel
+
+STARS = range(1, 6)
+AGGREGATE_FIELDS = ['review_count', 'rating_sum'] + [f'rating_{star}_count' for star in STARS]
+
+
+def apply_review_rating(db: Session, restaurant_id: int, rating: int, delta: int = 1):
+    """Add (delta=1) or remove (delta=-1) one review's rating from a restaurant's aggregates.
+
+    Runs as a single UPDATE inside the caller's transaction, so the aggregates
+    commit or roll back together with the review row itself.
+    """
+    apply_rating_counts(db, restaurant_id, {rating: delta})
+
+
+def apply_rating_counts(db: Session, restaurant_id: int, counts: dict):
+    """Apply per-star count changes ({star: delta}) to a restaurant in one UPDATE"""
+    count_delta = sum(counts.values())
+    sum_delta = sum(star * delta for star, delta in counts.items())
+    new_count = RestaurantModel.review_count + count_delta
+    new_sum = RestaurantModel.rating_sum + sum_delta
+
+    values = {
+        RestaurantModel.review_count: new_count,
+        RestaurantModel.rating_sum: new_sum,
+        RestaurantModel.avg_rating: case(
+            (new_count > 0, new_sum * 1.0 / new_count),
+            else_=0,
+        ),
+    }
+    for star, delta in counts.items():
+        star_column = getattr(RestaurantModel, f'rating_{star}_count')
+        values[star_column] = star_column + delta
+
+    db.query(RestaurantModel).filter(RestaurantModel.id == restaurant_id).update(
+        values, synchronize_session=False
+    )
+
+
+def rebuild_rating_aggregates(db: Session, verify_only: bool = False):
+    """Recompute aggregates from the reviews table and fix any drift.
+
+    Returns the ids of the restaurants whose stored aggregates were wrong.
+    With verify_only the drift is reported but nothing is written.
+    """
+    actual_rows = (
+        db.query(
+            ReviewModel.restaurant_id,
+            func.count(ReviewModel.id),
+            func.sum(ReviewModel.rating),
+            *[func.sum(case((ReviewModel.rating == star, 1), else_=0)) for star in STARS],
+        )
+        .group_by(ReviewModel.restaurant_id)
+        .all()
+    )
+    actual = {row[0]: [int(value or 0) for value in row[1:]] for row in actual_rows}
+
+    stored_rows = db.query(
+        RestaurantModel.id,
+        RestaurantModel.avg_rating,
+        *[getattr(RestaurantModel, field) for field in AGGREGATE_FIELDS],
+    ).all()
+
+    drifted = []
+    for row in stored_rows:
+        restaurant_id, stored_avg, stored = row[0], row[1], list(row[2:])
+        values = dict(zip(AGGREGATE_FIELDS, actual.get(restaurant_id, [0] * len(AGGREGATE_FIELDS))))
+        values['avg_rating'] = values['rating_sum'] / values['review_count'] if values['review_count'] else 0
+        if stored == [values[field] for field in AGGREGATE_FIELDS] and abs(stored_avg - values['avg_rating']) < 1e-9:
+            continue
+
+        drifted.append(restaurant_id)
+        if verify_only:
+            continue
+
+        db.query(RestaurantModel).filter(RestaurantModel.id == restaurant_id).update(
+            values, synchronize_session=False
+        )
+
+    if not verify_only:
+        db.commit()
+
+    return drifted
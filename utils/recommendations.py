@@ -0,0 +1,259 @@
+import time
+
+import numpy as np
+from scipy import sparse
+from sqlalchemy import delete, insert, select
+
+from models.favorite import FavoriteModel
+from models.recommendation import RestaurantSimilarityModel, RestaurantSimilarityStateModel
+from models.review import ReviewModel
+
+TOP_K = 20
+# Restaurants per sparse product; bounds memory when popular restaurants co-occur with nearly everything
+BLOCK_SIZE = 2000
+PARTITION_SIZE = 100_000
+WRITE_CHUNK = 5000
+# Past this share of changed restaurants, patching costs more than rebuilding
+FULL_REBUILD_RATIO = 0.25
+
+# Implicit feedback: a favorite is a strong signal, a review counts in proportion to its rating
+FAVORITE_WEIGHT = 1.0
+REVIEW_WEIGHT_PER_STAR = 0.2
+
+_FINGERPRINT_MASK = np.uint64((1 << 62) - 1)
+_USER_MIX = np.uint64(0x9E3779B97F4A7C15)
+_WEIGHT_MIX = np.uint64(0xC2B2AE3D27D4EB4F)
+
+
+def _load(connection, statement, columns: int):
+    result = connection.execution_options(yield_per=PARTITION_SIZE).execute(statement)
+    # NumPy converts plain tuples far faster than Row objects
+    chunks = [np.array([tuple(row) for row in partition], dtype=np.int64) for partition in result.partitions()]
+    return np.concatenate(chunks) if chunks else np.empty((0, columns), dtype=np.int64)
+
+
+def load_interactions(connection):
+    """(user_ids, restaurant_ids, weights) over every favorite and review, as NumPy arrays"""
+    favorites = _load(connection, select(FavoriteModel.user_id, FavoriteModel.restaurant_id), 2)
+    reviews = _load(connection, select(ReviewModel.user_id, ReviewModel.restaurant_id, ReviewModel.rating), 3)
+    user_ids = np.concatenate([favorites[:, 0], reviews[:, 0]])
+    restaurant_ids = np.concatenate([favorites[:, 1], reviews[:, 1]])
+    weights = np.concatenate([
+        np.full(len(favorites), FAVORITE_WEIGHT),
+        reviews[:, 2] * REVIEW_WEIGHT_PER_STAR,
+    ])
+    return user_ids, restaurant_ids, weights
+
+
+class InteractionMatrix:
+    """Sparse restaurant x user matrix of interaction weights, with unit-length rows for cosine similarity"""
+
+    def __init__(self, user_ids, restaurant_ids, weights):
+        self.user_ids, user_index = np.unique(user_ids, return_inverse=True)
+        self.restaurant_ids, restaurant_index = np.unique(restaurant_ids, return_inverse=True)
+        # Duplicate (restaurant, user) entries - a favorite plus a review - are summed
+        self.weights = sparse.csr_matrix(
+            (weights, (restaurant_index, user_index)),
+            shape=(len(self.restaurant_ids), len(self.user_ids)),
+        )
+        self.weights.sum_duplicates()
+        norms = np.sqrt(np.asarray(self.weights.multiply(self.weights).sum(axis=1)).ravel())
+        norms[norms == 0] = 1.0
+        self.normalized = sparse.diags(1.0 / norms) @ self.weights
+        self.normalized_t = self.normalized.T.tocsr()
+
+    def __len__(self):
+        return len(self.restaurant_ids)
+
+    def fingerprints(self):
+        """Per restaurant 62-bit hash of who interacted with what weight; changes when any interaction does"""
+        users = self.user_ids[self.weights.indices].astype(np.uint64)
+        weights = np.round(self.weights.data * 1000).astype(np.uint64)
+        mixed = users * _USER_MIX ^ weights * _WEIGHT_MIX
+        # Every row has at least one entry, so reduceat never sees an empty slice
+        return (np.add.reduceat(mixed, self.weights.indptr[:-1]) & _FINGERPRINT_MASK).astype(np.int64)
+
+    def similarities(self, rows):
+        """(restaurant_id, similar_restaurant_id, score) for every non-zero cosine similarity of the given rows"""
+        block = (self.normalized[rows] @ self.normalized_t).tocoo()
+        keep = block.col != rows[block.row]
+        return self.restaurant_ids[rows[block.row[keep]]], self.restaurant_ids[block.col[keep]], block.data[keep]
+
+    def rows_of(self, restaurant_ids):
+        return np.searchsorted(self.restaurant_ids, restaurant_ids)
+
+
+def best_neighbours(owner, neighbour, score, k: int):
+    """The k best (owner, neighbour, score) entries per owner plus their 1-based rank; ties go to the lower id"""
+    order = np.lexsort((neighbour, -score, owner))
+    owner, neighbour, score = owner[order], neighbour[order], score[order]
+    rank = np.arange(len(owner)) - np.searchsorted(owner, owner, side="left")
+    keep = rank < k
+    return owner[keep], neighbour[keep], score[keep], rank[keep] + 1
+
+
+def _chunks(values, size: int = WRITE_CHUNK):
+    for start in range(0, len(values), size):
+        yield values[start:start + size]
+
+
+def _pair_keys(owner, neighbour):
+    # Restaurant ids are 32-bit, so one int64 identifies an (owner, neighbour) pair
+    return owner.astype(np.int64) << 32 | neighbour.astype(np.int64)
+
+
+def _lookup(keys, values, queries):
+    """The value for each query in sorted keys, 0.0 where it is absent"""
+    if not len(keys):
+        return np.zeros(len(queries))
+    position = np.minimum(np.searchsorted(keys, queries), len(keys) - 1)
+    return np.where(keys[position] == queries, values[position], 0.0)
+
+
+class NeighbourWriter:
+    def __init__(self, connection, log):
+        self.connection = connection
+        self.log = log
+        self.written = 0
+
+    def write(self, owner, neighbour, score, rank):
+        values = [
+            {"restaurant_id": a, "similar_restaurant_id": b, "score": s, "rank": r}
+            for a, b, s, r in zip(owner.tolist(), neighbour.tolist(), score.tolist(), rank.tolist())
+        ]
+        for chunk in _chunks(values):
+            self.connection.execute(insert(RestaurantSimilarityModel.__table__), chunk)
+        self.written += len(values)
+        self.log(f"... {self.written} neighbours written", end="\r")
+
+    def replace(self, restaurant_ids):
+        table = RestaurantSimilarityModel.__table__
+        for chunk in _chunks(restaurant_ids):
+            self.connection.execute(delete(table).where(table.c.restaurant_id.in_(chunk)))
+
+
+def _save_fingerprints(connection, matrix: InteractionMatrix, fingerprints, rows, removed=()):
+    table = RestaurantSimilarityStateModel.__table__
+    for chunk in _chunks(matrix.restaurant_ids[rows].tolist() + list(removed)):
+        connection.execute(delete(table).where(table.c.restaurant_id.in_(chunk)))
+    values = [
+        {"restaurant_id": restaurant_id, "fingerprint": fingerprint}
+        for restaurant_id, fingerprint in zip(matrix.restaurant_ids[rows].tolist(), fingerprints[rows].tolist())
+    ]
+    for chunk in _chunks(values):
+        connection.execute(insert(table), chunk)
+
+
+def _rebuild(connection, matrix: InteractionMatrix, fingerprints, k: int, block_size: int, writer: NeighbourWriter):
+    connection.execute(delete(RestaurantSimilarityModel.__table__))
+    connection.execute(delete(RestaurantSimilarityStateModel.__table__))
+    rows = np.arange(len(matrix))
+    for start in range(0, len(rows), block_size):
+        writer.write(*best_neighbours(*matrix.similarities(rows[start:start + block_size]), k))
+    _save_fingerprints(connection, matrix, fingerprints, rows)
+    return len(rows)
+
+
+def _stored_lists(connection, restaurant_ids):
+    """(restaurant_id, similar_restaurant_id, score) arrays of the stored lists of restaurant_ids"""
+    owner, neighbour, score = [], [], []
+    for chunk in _chunks(restaurant_ids):
+        for row in connection.execute(
+            select(RestaurantSimilarityModel.restaurant_id, RestaurantSimilarityModel.similar_restaurant_id, RestaurantSimilarityModel.score)
+            .where(RestaurantSimilarityModel.restaurant_id.in_(chunk))
+        ):
+            owner.append(row[0])
+            neighbour.append(row[1])
+            score.append(row[2])
+    return np.array(owner, dtype=np.int64), np.array(neighbour, dtype=np.int64), np.array(score, dtype=np.float64)
+
+
+def _refresh(connection, matrix: InteractionMatrix, fingerprints, changed, removed, k: int, block_size: int, writer: NeighbourWriter):
+    """Recompute the changed restaurants and patch everyone else's lists with their new scores.
+
+    Similarity is symmetric, so the changed rows' products already hold the
+    new score of every (other, changed) pair. Merging those into a stored
+    top-k list is exact unless a changed neighbour's score fell while the list
+    was full - then an unseen restaurant could move up, so that list is
+    recomputed from scratch instead.
+    """
+    dirty_ids = np.union1d(matrix.restaurant_ids[changed], np.array(removed, dtype=np.int64))
+
+    owner, neighbour, score = [np.empty(0, np.int64)], [np.empty(0, np.int64)], [np.empty(0)]
+    for start in range(0, len(changed), block_size):
+        for values, part in zip((owner, neighbour, score), matrix.similarities(changed[start:start + block_size])):
+            values.append(part)
+    owner, neighbour, score = np.concatenate(owner), np.concatenate(neighbour), np.concatenate(score)
+
+    fresh = ~np.isin(neighbour, dirty_ids)
+    fresh_owner, fresh_neighbour, fresh_score = neighbour[fresh], owner[fresh], score[fresh]
+
+    listing = set()
+    for chunk in _chunks(dirty_ids.tolist()):
+        listing.update(connection.execute(
+            select(RestaurantSimilarityModel.restaurant_id)
+            .where(RestaurantSimilarityModel.similar_restaurant_id.in_(chunk))
+            .distinct()
+        ).scalars())
+    affected = np.setdiff1d(np.union1d(fresh_owner, np.array(sorted(listing), dtype=np.int64)), dirty_ids)
+
+    old_owner, old_neighbour, old_score = _stored_lists(connection, affected.tolist())
+    old_dirty = np.isin(old_neighbour, dirty_ids)
+    fresh_keys = _pair_keys(fresh_owner, fresh_neighbour)
+    order = np.argsort(fresh_keys)
+    new_score = _lookup(fresh_keys[order], fresh_score[order], _pair_keys(old_owner, old_neighbour))
+
+    owners, counts = np.unique(old_owner, return_counts=True)
+    full_lists = owners[counts >= k]
+    fell = old_dirty & (new_score < old_score) & np.isin(old_owner, full_lists)
+    unresolved = np.unique(old_owner[fell])
+
+    keep_old = ~old_dirty & ~np.isin(old_owner, unresolved)
+    keep_fresh = ~np.isin(fresh_owner, unresolved)
+    writer.replace(np.union1d(affected, dirty_ids).tolist())
+    writer.write(*best_neighbours(
+        np.concatenate([old_owner[keep_old], fresh_owner[keep_fresh]]),
+        np.concatenate([old_neighbour[keep_old], fresh_neighbour[keep_fresh]]),
+        np.concatenate([old_score[keep_old], fresh_score[keep_fresh]]),
+        k,
+    ))
+    writer.write(*best_neighbours(owner, neighbour, score, k))
+    unresolved_rows = matrix.rows_of(unresolved)
+    for start in range(0, len(unresolved_rows), block_size):
+        writer.write(*best_neighbours(*matrix.similarities(unresolved_rows[start:start + block_size]), k))
+
+    _save_fingerprints(connection, matrix, fingerprints, changed, removed)
+    return len(changed) + len(unresolved), len(affected)
+
+
+def build_similarities(connection, top_k: int = TOP_K, full: bool = False, block_size: int = BLOCK_SIZE, log=print):
+    """Bring restaurant_similarities up to date inside connection's transaction.
+
+    Returns (restaurants recomputed from scratch, neighbour rows written).
+    """
+    started = time.perf_counter()
+    user_ids, restaurant_ids, weights = load_interactions(connection)
+    log(f"... loaded {len(weights)} interactions in {time.perf_counter() - started:.1f}s")
+
+    matrix = InteractionMatrix(user_ids, restaurant_ids, weights)
+    fingerprints = matrix.fingerprints()
+    log(f"... {len(matrix.user_ids)} users x {len(matrix)} restaurants")
+
+    stored = {}
+    if not full:
+        stored = dict(connection.execute(
+            select(RestaurantSimilarityStateModel.restaurant_id, RestaurantSimilarityStateModel.fingerprint)
+        ).all())
+    previous = np.array([stored.get(restaurant_id, -1) for restaurant_id in matrix.restaurant_ids.tolist()], dtype=np.int64)
+    changed = np.flatnonzero(previous != fingerprints)
+    removed = sorted(set(stored) - set(matrix.restaurant_ids.tolist()))
+
+    writer = NeighbourWriter(connection, log)
+    if not stored or len(changed) > FULL_REBUILD_RATIO * len(matrix):
+        recomputed = _rebuild(connection, matrix, fingerprints, top_k, block_size, writer)
+        log(f"OK Rebuilt {recomputed} restaurants ({writer.written} neighbours) in {time.perf_counter() - started:.1f}s")
+    else:
+        recomputed, patched = _refresh(connection, matrix, fingerprints, changed, removed, top_k, block_size, writer)
+        log(f"OK Recomputed {recomputed} restaurants and patched {patched} lists ({writer.written} neighbours) "
+            f"in {time.perf_counter() - started:.1f}s")
+    return recomputed, writer.written
@@ -0,0 +1,78 @@
+from functools import lru_cache
+from urllib.parse import urlencode
+
+from fastapi import Request, Response
+from pydantic import TypeAdapter
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+from config.environment import response_cache_max_bytes, response_cache_ttl
+from models.category import CategoryModel
+from utils.cache import ResponseCache
+
+# Tags: "restaurants" covers every /restaurants list page, "restaurant:<id>" every
+# response containing that restaurant, "categories" the category list and
+# "category:<id>" every response containing that category or listing its restaurants.
+response_cache = ResponseCache(max_bytes=response_cache_max_bytes, ttl=response_cache_ttl)
+
+
+def cache_key(request: Request) -> str:
+    """Path plus query parameters in a canonical order, escaped so no value can pose as another parameter"""
+    return request.url.path + "?" + urlencode(sorted(request.query_params.multi_items()))
+
+
+@lru_cache(maxsize=None)
+def _adapter(schema):
+    return TypeAdapter(schema)
+
+
+def render(schema, value) -> bytes:
+    """Validate ORM objects against the response schema and serialize them once"""
+    adapter = _adapter(schema)
+    return adapter.dump_json(adapter.validate_python(value, from_attributes=True))
+
+
+def json_response(body: bytes, hit: bool) -> Response:
+    return Response(content=body, media_type="application/json", headers={"X-Cache": "HIT" if hit else "MISS"})
+
+
+def restaurant_tags(restaurants):
+    """Tags for RestaurantModel objects or the dicts of a fields= projection"""
+    return [
+        f"restaurant:{restaurant['id'] if isinstance(restaurant, dict) else restaurant.id}"
+        for restaurant in restaurants
+    ]
+
+
+def invalidate_restaurant(restaurant_id=None, category_ids=()):
+    """Evict responses made stale by a committed restaurant or review write"""
+    tags = ["restaurants"]
+    if restaurant_id is not None:
+        tags.append(f"restaurant:{restaurant_id}")
+    tags.extend(f"category:{category_id}" for category_id in category_ids)
+    response_cache.invalidate_tags(*tags)
+
+
+# Categories changed by a session are evicted once its transaction commits: evicting
+# at flush time lets another request cache the old row again before the commit
+@event.listens_for(Session, 'after_flush')
+def _track_changed_categories(session, flush_context):
+    changed = {
+        target.id for target in (*session.new, *session.dirty, *session.deleted) if isinstance(target, CategoryModel)
+    }
+    if changed:
+        session.info.setdefault('changed_category_ids', set()).update(changed)
+
+
+@event.listens_for(Session, 'after_commit')
+def _invalidate_committed_categories(session):
+    changed = session.info.pop('changed_category_ids', ())
+    if changed:
+        response_cache.invalidate_tags("categories", *(f"category:{category_id}" for category_id in changed))
+
+
+@event.listens_for(Session, 'after_soft_rollback')
+def _forget_rolled_back_categories(session, previous_transaction):
+    # Only the outermost transaction; a savepoint rollback keeps what was flushed before it
+    if previous_transaction.parent is None:
+        session.info.pop('changed_category_ids', None)
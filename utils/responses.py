@@ -0,0 +1,35 @@
+import inspect
+import logging
+
+from fastapi.datastructures import Default
+from fastapi.responses import JSONResponse
+from fastapi.routing import serialize_response
+
+# FastAPI 0.130+ writes response models straight to JSON bytes with pydantic-core, but only
+# while no custom response class is set; there a default FastJSONResponse would be slower
+PYDANTIC_WRITES_JSON = "dump_json" in inspect.signature(serialize_response).parameters
+
+logger = logging.getLogger(__name__)
+
+
+class FastJSONResponse(JSONResponse):
+    """JSONResponse rendered by orjson instead of json.dumps; orjson is only needed with FAST_JSON on"""
+
+    def render(self, content) -> bytes:
+        import orjson
+
+        return orjson.dumps(content, option=orjson.OPT_NON_STR_KEYS)
+
+
+def default_response_class(fast_json: bool):
+    """FastJSONResponse when FAST_JSON is on and FastAPI would otherwise encode with json.dumps.
+
+    Otherwise FastAPI's own default placeholder: passing JSONResponse itself
+    would count as a custom class and turn the pydantic-core path off.
+    Cached responses are replayed as stored bytes either way.
+    """
+    if fast_json and PYDANTIC_WRITES_JSON:
+        logger.warning("FAST_JSON is ignored: this FastAPI already writes response models with pydantic-core")
+    if fast_json and not PYDANTIC_WRITES_JSON:
+        return FastJSONResponse
+    return Default(JSONResponse)
@@ -0,0 +1,191 @@
+import math
+import re
+import threading
+from collections import defaultdict
+
+from sqlalchemy import func, text
+from sqlalchemy.orm import Session, selectinload
+
+from models.restaurant import RestaurantModel
+
+TOKEN_PATTERN = re.compile(r"[a-z0-9]+")
+
+# Relative weight of a term depending on which field it appears in
+FIELD_WEIGHTS = {
+    'name': 3.0,
+    'categories': 2.0,
+    'location': 1.5,
+    'description': 1.0,
+}
+
+# Keeps restaurants.search_vector in step with the row and its category names
+SEARCH_VECTOR_SQL = text("""
+    UPDATE restaurants SET search_vector =
+        setweight(to_tsvector('english', coalesce(name, '')), 'A') ||
+        setweight(to_tsvector('english', coalesce((
+            SELECT string_agg(c.category, ' ')
+            FROM categories c
+            JOIN restaurant_categories rc ON rc.category_id = c.id
+            WHERE rc.restaurant_id = restaurants.id
+        ), '')), 'B') ||
+        setweight(to_tsvector('english', coalesce(location, '')), 'C') ||
+        setweight(to_tsvector('english', coalesce(description, '')), 'D')
+    WHERE id = :restaurant_id
+""")
+
+
+def tokenize(value):
+    return TOKEN_PATTERN.findall((value or '').lower())
+
+
+def uses_postgres_search(db: Session) -> bool:
+    return db.get_bind().dialect.name == 'postgresql'
+
+
+class RestaurantSearchIndex:
+    """In-process inverted index used when the database has no full-text search.
+
+    Each worker process holds its own copy, built lazily from the database on
+    first search and then kept in step by the restaurant write handlers.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._built = False
+        self._postings = defaultdict(dict)  # term -> {restaurant_id: weighted term frequency}
+        self._documents = {}  # restaurant_id -> set of terms, used for removal
+
+    def ensure_built(self, db: Session):
+        if self._built:
+            return
+        with self._lock:
+            if self._built:
+                return
+            restaurants = db.query(RestaurantModel).options(selectinload(RestaurantModel.categories)).all()
+            for restaurant in restaurants:
+                self._add(restaurant)
+            self._built = True
+
+    def reset(self):
+        """Forget everything; the next search rebuilds from the database (used after bulk imports)"""
+        with self._lock:
+            self._postings.clear()
+            self._documents.clear()
+            self._built = False
+
+    def add(self, restaurant):
+        with self._lock:
+            if not self._built:
+                return
+            self._remove(restaurant.id)
+            self._add(restaurant)
+
+    def remove(self, restaurant_id: int):
+        with self._lock:
+            self._remove(restaurant_id)
+
+    def search(self, query: str, limit: int):
+        terms = set(tokenize(query))
+        if not terms:
+            return []
+
+        with self._lock:
+            postings = [self._postings.get(term, {}) for term in terms]
+            if not all(postings):
+                return []
+            total = len(self._documents)
+
+            # Every term must match; start from the rarest one
+            postings.sort(key=len)
+            candidates = set(postings[0])
+            for posting in postings[1:]:
+                candidates &= posting.keys()
+
+            scores = {}
+            for posting in postings:
+                idf = math.log(1 + total / len(posting))
+                for restaurant_id in candidates:
+                    scores[restaurant_id] = scores.get(restaurant_id, 0.0) + posting[restaurant_id] * idf
+
+        ranked = sorted(scores.items(), key=lambda item: (-item[1], item[0]))
+        return [restaurant_id for restaurant_id, _ in ranked[:limit]]
+
+    def _add(self, restaurant):
+        fields = {
+            'name': restaurant.name,
+            'categories': ' '.join(category.category for category in restaurant.categories),
+            'location': restaurant.location,
+            'description': restaurant.description,
+        }
+        weights = defaultdict(float)
+        for field, value in fields.items():
+            for term in tokenize(value):
+                weights[term] += FIELD_WEIGHTS[field]
+
+        for term, weight in weights.items():
+            self._postings[term][restaurant.id] = weight
+        self._documents[restaurant.id] = set(weights)
+
+    def _remove(self, restaurant_id: int):
+        for term in self._documents.pop(restaurant_id, ()):
+            posting = self._postings.get(term)
+            if posting is None:
+                continue
+            posting.pop(restaurant_id, None)
+            if not posting:
+                del self._postings[term]
+
+
+search_index = RestaurantSearchIndex()
+
+
+def refresh_search_document(db: Session, restaurant_id: int):
+    """Recompute the stored tsvector; call before commit so it shares the write's transaction"""
+    if uses_postgres_search(db):
+        db.flush()
+        db.execute(SEARCH_VECTOR_SQL, {"restaurant_id": restaurant_id})
+
+
+def index_restaurant(db: Session, restaurant):
+    """Update the in-process index after a committed create/update"""
+    if not uses_postgres_search(db):
+        search_index.add(restaurant)
+
+
+def unindex_restaurant(db: Session, restaurant_id: int):
+    """Drop a committed delete from the in-process index"""
+    if not uses_postgres_search(db):
+        search_index.remove(restaurant_id)
+
+
+def search_restaurants(db: Session, query: str, limit: int):
+    """Restaurants matching every term of query, most relevant first"""
+    if uses_postgres_search(db):
+        tsquery = func.websearch_to_tsquery('english', query)
+        rank = func.ts_rank_cd(RestaurantModel.search_vector, tsquery)
+        return (
+            db.query(RestaurantModel)
+            .filter(RestaurantModel.search_vector.op('@@')(tsquery))
+            .order_by(rank.desc(), RestaurantModel.id)
+            .limit(limit)
+            .all()
+        )
+
+    search_index.ensure_built(db)
+    ids = search_index.search(query, limit)
+    if not ids:
+        return []
+    restaurants = {r.id: r for r in db.query(RestaurantModel).filter(RestaurantModel.id.in_(ids))}
+    return [restaurants[restaurant_id] for restaurant_id in ids if restaurant_id in restaurants]
+
+
+def refresh_search_documents(db: Session, restaurant_ids):
+    """Bulk form of refresh_search_document for freshly imported rows"""
+    if restaurant_ids and uses_postgres_search(db):
+        db.execute(SEARCH_VECTOR_SQL, [{"restaurant_id": restaurant_id} for restaurant_id in restaurant_ids])
+
+
+def reindex_all(db: Session):
+    """After a committed bulk write, have the in-process index rebuild on next search"""
+    if not uses_postgres_search(db):
+        search_index.reset()
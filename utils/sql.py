@@ -0,0 +1,9 @@
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+
+
+def dialect_insert(db, table):
+    """INSERT supporting ON CONFLICT DO NOTHING on the session's dialect (Session or AsyncSession)"""
+    if db.get_bind().dialect.name == "postgresql":
+        return pg_insert(table)
+    return sqlite_insert(table)
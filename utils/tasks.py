@@ -0,0 +1,79 @@
+import heapq
+import logging
+import threading
+import time
+
+from config.environment import task_queue_size, task_retries, task_retry_backoff
+
+logger = logging.getLogger(__name__)
+
+
+class TaskQueue:
+    """Runs non-critical side effects (push fan-out and the like) after the response, off the request path.
+
+    One daemon worker thread per process; a failing task is retried up to
+    retries times with exponential backoff, then logged and dropped. When
+    maxsize tasks are waiting, submit() drops the new task and returns False.
+    """
+
+    def __init__(self, maxsize: int = task_queue_size, retries: int = task_retries, backoff: float = task_retry_backoff):
+        self.maxsize = maxsize
+        self.retries = retries
+        self.backoff = backoff
+        self._condition = threading.Condition()
+        self._scheduled = []  # heap of (run_at, sequence, fn, args, attempt)
+        self._sequence = 0
+        self._worker = None
+        self.completed = 0
+        self.failed = 0
+        self.dropped = 0
+
+    def submit(self, fn, *args) -> bool:
+        return self._schedule(time.monotonic(), fn, args, 0)
+
+    def _schedule(self, run_at: float, fn, args, attempt: int) -> bool:
+        with self._condition:
+            if len(self._scheduled) >= self.maxsize:
+                self.dropped += 1
+                logger.warning("Background task queue full, dropping %s", getattr(fn, "__name__", fn))
+                return False
+            self._sequence += 1
+            heapq.heappush(self._scheduled, (run_at, self._sequence, fn, args, attempt))
+            if self._worker is None:
+                self._worker = threading.Thread(target=self._run_forever, name="background-tasks", daemon=True)
+                self._worker.start()
+            self._condition.notify()
+            return True
+
+    def _next(self):
+        with self._condition:
+            while True:
+                if self._scheduled:
+                    delay = self._scheduled[0][0] - time.monotonic()
+                    if delay <= 0:
+                        return heapq.heappop(self._scheduled)
+                    self._condition.wait(delay)
+                else:
+                    self._condition.wait()
+
+    def _run_forever(self):
+        while True:
+            _, _, fn, args, attempt = self._next()
+            try:
+                fn(*args)
+            except Exception:
+                if attempt < self.retries:
+                    self._schedule(time.monotonic() + self.backoff * 2 ** attempt, fn, args, attempt + 1)
+                else:
+                    self.failed += 1
+                    logger.exception("Background task %s failed after %d attempts", getattr(fn, "__name__", fn), attempt + 1)
+            else:
+                self.completed += 1
+
+    def stats(self):
+        with self._condition:
+            pending = len(self._scheduled)
+        return {"pending": pending, "completed": self.completed, "failed": self.failed, "dropped": self.dropped}
+
+
+background_tasks = TaskQueue()